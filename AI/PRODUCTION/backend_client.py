@@ -0,0 +1,146 @@
+"""
+백엔드 정책 API 클라이언트
+CSV에 없는 정책을 /api/summary에서 조회할 때 사용
+- 서버 수명 동안 하나의 httpx.AsyncClient 재사용 (keep-alive 연결 풀, h2 패키지가 있으면 HTTP/2)
+- 조회한 정책은 TTL 캐시에 보관하고, 같은 정책 동시 조회는 한 번의 요청으로 병합
+- prefetch: 여러 정책을 미리 가져와 캐시에 채움 (요약 요청 시 Gemini 호출 시간만 남도록)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+
+from cache import TTLCache
+from metrics import UPSTREAM_SECONDS, record
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class BackendPolicyClient:
+    """
+    Args:
+        base_url: 백엔드 API URL
+        cache: 조회한 정책 캐시 (None이면 프로세스 내 TTL 캐시)
+        timeout: 요청 타임아웃(초)
+        max_connections: 연결 풀 최대 연결 수 (prefetch 동시 요청 수도 이 값으로 제한)
+        max_keepalive: 유지할 idle 연결 수 (None이면 max_connections)
+    """
+
+    def __init__(self, base_url, cache=None, timeout=10.0, max_connections=20, max_keepalive=None):
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache if cache is not None else TTLCache('backend_policies', max_entries=10000, default_ttl=600)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_connections if max_keepalive is None else max_keepalive
+
+        self._client = None
+        self._flight = SingleFlight()
+        self.requests = 0
+        self.errors = 0
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive
+                ),
+                http2=HTTP2_AVAILABLE
+            )
+        return self
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_policy(self, policy_id: str) -> Optional[Dict[str, Any]]:
+        """백엔드 정책 응답 (없거나 실패하면 None)"""
+        policy_id = str(policy_id)
+        cached = self.cache.get(policy_id)
+        if cached is not None:
+            return cached
+        return await self._flight.do(policy_id, lambda: self._fetch(policy_id))
+
+    async def prefetch(self, policy_ids: Iterable[str]) -> int:
+        """
+        캐시에 없는 정책을 동시에 조회해 캐시에 채움
+        백엔드에 일괄 조회 API가 없으므로 연결 풀 크기만큼 동시 요청 (keep-alive 연결 재사용)
+
+        Returns:
+            새로 가져온 정책 수
+        """
+        missing = list(dict.fromkeys(
+            str(policy_id) for policy_id in policy_ids if str(policy_id) not in self.cache
+        ))
+        if not missing:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def fetch(policy_id):
+            async with semaphore:
+                return await self.get_policy(policy_id)
+
+        results = await asyncio.gather(*(fetch(policy_id) for policy_id in missing))
+        return sum(result is not None for result in results)
+
+    async def _fetch(self, policy_id):
+        await self.start()
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await self._client.get(f"/api/policies/{policy_id}")
+        except Exception as e:
+            self.errors += 1
+            self._record(start, 'error')
+            logger.error("Failed to fetch policy from backend: %s", e)
+            return None
+
+        if response.status_code == 200:
+            try:
+                policy_data = response.json()
+            except ValueError as e:
+                # JSON이 아닌 본문은 캐시하지 않고 요청 정보로 대체하도록 None
+                self.errors += 1
+                self._record(start, 'error')
+                logger.error("Backend API returned invalid JSON for policy %s: %s", policy_id, e)
+                return None
+            self._record(start, 'ok')
+            self.cache.set(policy_id, policy_data)
+            logger.debug("Fetched policy %s from backend", policy_id)
+            return policy_data
+        if response.status_code == 404:
+            self._record(start, 'not_found')
+            logger.warning("Policy %s not found in backend", policy_id)
+            return None
+
+        self.errors += 1
+        self._record(start, 'error')
+        logger.error("Backend API returned status %s", response.status_code)
+        return None
+
+    @staticmethod
+    def _record(start, outcome):
+        record(UPSTREAM_SECONDS, 'backend', time.perf_counter() - start, upstream='backend', outcome=outcome)
+
+    def stats(self):
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "requests": self.requests,
+            "errors": self.errors,
+            "coalesced": self._flight.shared,
+            "cache": self.cache.stats()
+        }
@@ -0,0 +1,547 @@
+"""
+AI 서버 성능 벤치마크
+핵심 경로(카탈로그 로딩, 단일/일괄 추천, API 캐시 적중/미스, 요약)와 HTTP 부하 테스트를 측정해 JSON으로 저장
+커밋 간 결과 파일을 비교해 성능 회귀 확인
+
+스위트:
+    load       load_real_data 콜드(빈 임베딩 캐시)/웜(캐시 적중) 시간
+    recommend  get_recommendations 지연시간 (쿼리 임베딩 캐시 미스/적중), get_recommendations_batch 배치 크기별 처리량
+    api        main.py 엔드포인트 캐시 미스/적중 (추천, 일괄 추천, 요약 - 로컬 Gemini/백엔드 스텁 사용)
+    http       비동기 HTTP 부하 생성기 (기본은 프로세스 내 FastAPI 앱, --url로 실행 중인 서버)
+
+카탈로그 크기는 --scales로 실제 CSV를 N배 복제한 합성 카탈로그로 조절
+(복제 정책은 ID만 다르고 텍스트가 같으므로 임베딩 캐시 덕분에 인코딩은 원본 정책 수만큼만 수행)
+
+사용법:
+    python benchmark.py --output bench.json
+    python benchmark.py --suites load,recommend --scales 1,10,100 --output bench.json
+    python benchmark.py --suites http --url http://localhost:8000 --concurrency 32 --duration 30
+    python benchmark.py --compare bench_old.json bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from retrieval_report import build_profiles, percentile_ms
+from yuno_ai_system_clean import YunoAI
+
+SUITES = ('load', 'recommend', 'api', 'http')
+BATCH_SIZES = (1, 32, 256)
+
+# 회귀 비교 시 표시할 변화율 (지연시간/소요 시간 지표)
+REGRESSION_THRESHOLD = 0.10
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """측정 중 추천/로딩 로그 출력 숨김"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def latency_stats(latencies):
+    """지연시간(초) 리스트 -> ms 백분위 요약"""
+    return {
+        "count": len(latencies),
+        "mean_ms": float(np.mean(latencies) * 1000) if latencies else 0.0,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "max_ms": float(np.max(latencies) * 1000) if latencies else 0.0
+    }
+
+
+def api_profiles():
+    """UserProfile 형식 프로필 (user_id 포함)"""
+    return [dict(profile, user_id=f"bench_{i}") for i, profile in enumerate(build_profiles())]
+
+
+def scale_csv(csv_path, factor, output_dir):
+    """
+    실제 CSV를 factor배 복제한 합성 카탈로그 CSV (복제본 ID에 _s<번호> 접미사)
+
+    Returns:
+        합성 CSV 경로 (factor == 1이면 원본 경로)
+    """
+    if factor == 1:
+        return csv_path
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    copies = []
+    for k in range(factor):
+        copy = df.copy()
+        if k > 0:
+            copy['id'] = copy['id'].astype(str) + f"_s{k}"
+        copies.append(copy)
+    path = os.path.join(output_dir, f"policies_x{factor}.csv")
+    pd.concat(copies, ignore_index=True).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 로컬 스텁 (api/http 스위트)
+# ---------------------------------------------------------------------------
+
+class GeminiStub:
+    """google-genai 비동기 클라이언트 스텁 (client.aio.models.generate_content, 고정 지연 후 요약 반환)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.aio = types.SimpleNamespace(models=self)
+
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return types.SimpleNamespace(text=f"벤치마크 요약 {self.calls}")
+
+
+class BackendStub:
+    """백엔드 정책 API 스텁 (GET /api/policies/<id>, 고정 지연 후 정책 JSON)"""
+
+    def __init__(self, delay):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.delay)
+                policy_id = self.path.rsplit('/', 1)[-1]
+                body = json.dumps({
+                    "success": True,
+                    "data": {
+                        "plcyNm": f"백엔드 정책 {policy_id}",
+                        "plcyExplnCn": "벤치마크용 정책 설명",
+                        "bscPlanPlcyWayNoNm": "일자리",
+                        "plcySprtCn": "벤치마크용 지원 내용"
+                    }
+                }, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.delay = delay
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# 스위트
+# ---------------------------------------------------------------------------
+
+def run_load_suite(csv_path, cache_dir, verbose=False):
+    """빈 임베딩 캐시에서 콜드 로딩 후, 새 인스턴스로 같은 캐시를 사용하는 웜 로딩"""
+    result = {}
+    for phase in ('cold', 'warm'):
+        start = time.perf_counter()
+        with quiet(not verbose):
+            ai = YunoAI(cache_dir=cache_dir)
+        init_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with quiet(not verbose):
+            ai.load_real_data(csv_path)
+        result[phase] = {"model_init_s": init_s, "load_real_data_s": time.perf_counter() - start}
+
+    result["policies"] = ai.policy_count
+    result["has_embeddings"] = ai.catalog.normalized_embeddings is not None
+    return result, ai
+
+
+def run_recommend_suite(ai, repeat=1, verbose=False):
+    """단일 추천 (첫 호출: 쿼리 인코딩 포함, 이후: 쿼리 임베딩 캐시 적중), 배치 크기별 일괄 추천"""
+    profiles = build_profiles()
+    ai.query_cache.clear()
+
+    def measure():
+        latencies = []
+        for profile in profiles:
+            start = time.perf_counter()
+            with quiet(not verbose):
+                ai.get_recommendations(profile, top_k=5, serialized=True)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    result = {"profiles": len(profiles), "single_query_miss": latency_stats(measure())}
+    warm = []
+    for _ in range(repeat):
+        warm.extend(measure())
+    result["single_query_hit"] = latency_stats(warm)
+
+    batches = {}
+    for batch_size in BATCH_SIZES:
+        batch = [profiles[i % len(profiles)] for i in range(batch_size)]
+        latencies = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            with quiet(not verbose):
+                ai.get_recommendations_batch(batch, top_k=5, serialized=True)
+            latencies.append(time.perf_counter() - start)
+        stats = latency_stats(latencies)
+        stats["per_profile_ms"] = stats["mean_ms"] / batch_size
+        batches[str(batch_size)] = stats
+    result["batch"] = batches
+    return result
+
+
+def import_main(csv_path, cache_dir, backend_url):
+    """벤치마크 설정으로 main 모듈 import (환경 변수는 import 시점에 읽힘)"""
+    os.environ.update({
+        "AI_CACHE_DIR": cache_dir,
+        "POLICY_CSV_PATH": csv_path,
+        "BACKEND_API_URL": backend_url,
+        "CACHE_BACKEND": "memory",
+        "SHARED_CATALOG": "false",
+        "POLICY_RELOAD_INTERVAL": "0"
+    })
+    import main
+    return main
+
+
+async def timed_request(client, method, url, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return time.perf_counter() - start, response
+
+
+async def run_api_suite(client, policy_ids, requests=100):
+    """엔드포인트별 캐시 미스 -> 같은 요청 반복(적중) 지연시간"""
+    profiles = api_profiles()[:requests]
+    result = {}
+
+    async def measure(name, method, url, bodies, **kwargs):
+        latencies, statuses = [], {}
+        for body in bodies:
+            elapsed, response = await timed_request(client, method, url, json=body, **kwargs)
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        result[name] = dict(latency_stats(latencies), statuses=statuses)
+
+    await client.delete('/api/cache')
+    await measure('recommendations_miss', 'POST', '/api/recommendations', profiles)
+    await measure('recommendations_hit', 'POST', '/api/recommendations', profiles)
+
+    await client.delete('/api/cache')
+    batch = {"profiles": profiles}
+    await measure('batch_miss', 'POST', '/api/recommendations/batch', [batch])
+    await measure('batch_hit', 'POST', '/api/recommendations/batch', [batch] * 5)
+
+    # 요약: CSV 정책 (Gemini 스텁 호출), 같은 요청 반복 (요약 캐시 적중)
+    summaries = [
+        {"policy_id": policy_ids[i % len(policy_ids)], "user_age": 15 + i % 25, "user_major": f"전공{i}"}
+        for i in range(requests)
+    ]
+    await measure('summary_miss', 'POST', '/api/summary', summaries)
+    await measure('summary_hit', 'POST', '/api/summary', summaries)
+
+    # CSV에 없는 정책: 백엔드 스텁 조회 + Gemini 스텁, 다른 사용자 조건으로 반복 (백엔드 정책 캐시 적중)
+    backend_summaries = [{"policy_id": f"bench-backend-{i}", "user_age": 20} for i in range(requests)]
+    await measure('summary_backend_miss', 'POST', '/api/summary', backend_summaries)
+    await measure('summary_backend_cached_policy', 'POST', '/api/summary',
+                  [dict(body, user_age=30) for body in backend_summaries])
+    return result
+
+
+async def run_load_generator(client, duration, concurrency, mix, policy_ids, seed=0):
+    """
+    비동기 HTTP 부하 생성기: concurrency개 작업자가 duration초 동안 요청을 보냄 (닫힌 루프)
+
+    Args:
+        mix: 엔드포인트 -> 가중치 (recommend, batch, summary, health)
+    """
+    profiles = api_profiles()
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    records = {name: {"latencies": [], "statuses": {}} for name in names}
+    errors = []
+
+    def build_request(name, rng):
+        if name == 'recommend':
+            return 'POST', '/api/recommendations', {"json": rng.choice(profiles)}
+        if name == 'batch':
+            return 'POST', '/api/recommendations/batch', {"json": {"profiles": rng.sample(profiles, 32)}}
+        if name == 'summary':
+            return 'POST', '/api/summary', {"json": {
+                "policy_id": rng.choice(policy_ids), "user_age": rng.randint(15, 39)
+            }}
+        return 'GET', '/health', {}
+
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, url, kwargs = build_request(name, rng)
+            try:
+                elapsed, response = await timed_request(client, method, url, **kwargs)
+            except Exception as e:
+                errors.append(type(e).__name__)
+                continue
+            record = records[name]
+            record["latencies"].append(elapsed)
+            status = str(response.status_code)
+            record["statuses"][status] = record["statuses"].get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(record["latencies"]) for record in records.values())
+    return {
+        "duration_s": elapsed,
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput_rps": total / elapsed if elapsed > 0 else 0.0,
+        "errors": len(errors),
+        "endpoints": {
+            name: dict(latency_stats(record["latencies"]), statuses=record["statuses"])
+            for name, record in records.items()
+        }
+    }
+
+
+async def run_server_suites(args, csv_path, cache_dir, suites):
+    """api/http 스위트 (--url이 없으면 스텁을 연결한 프로세스 내 FastAPI 앱)"""
+    import httpx
+
+    mix = dict((item.split('=')[0], float(item.split('=')[1])) for item in args.mix.split(',') if '=' in item)
+    results = {}
+
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+            policy_ids = [f"bench-{i}" for i in range(100)]
+            if 'api' in suites:
+                results['api'] = await run_api_suite(client, policy_ids, args.requests)
+            if 'http' in suites:
+                results['http'] = await run_load_generator(client, args.duration, args.concurrency, mix, policy_ids)
+        return results
+
+    backend = BackendStub(args.backend_delay)
+    try:
+        with quiet(not args.verbose):
+            server = import_main(csv_path, cache_dir, backend.url)
+        gemini = GeminiStub(args.gemini_delay)
+        server.gemini_client = gemini
+
+        with quiet(not args.verbose):
+            lifespan = server.lifespan(server.app)
+            await lifespan.__aenter__()
+        try:
+            policy_ids = server.ai_model.catalog.policy_ids[:1000]
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=60) as client:
+                with quiet(not args.verbose):
+                    if 'api' in suites:
+                        results['api'] = await run_api_suite(client, policy_ids, args.requests)
+                    if 'http' in suites:
+                        await client.delete('/api/cache')
+                        results['http'] = await run_load_generator(
+                            client, args.duration, args.concurrency, mix, policy_ids
+                        )
+        finally:
+            with quiet(not args.verbose):
+                await lifespan.__aexit__(None, None, None)
+
+        results['stubs'] = {
+            "gemini_delay_s": args.gemini_delay,
+            "gemini_calls": gemini.calls,
+            "backend_delay_s": args.backend_delay,
+            "backend_requests": backend.requests
+        }
+    finally:
+        backend.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 결과 비교
+# ---------------------------------------------------------------------------
+
+def flatten(data, prefix=''):
+    """중첩 결과 -> {'a.b.c': 숫자}"""
+    items = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            items.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        items[prefix[:-1]] = data
+    return items
+
+
+def compare_results(base_path, new_path, threshold=REGRESSION_THRESHOLD):
+    """두 결과 파일의 시간 지표 비교 (threshold 이상 변화만 표시)"""
+    with open(base_path, encoding='utf-8') as f:
+        base = flatten(json.load(f)['results'])
+    with open(new_path, encoding='utf-8') as f:
+        new = flatten(json.load(f)['results'])
+
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        if not (key.endswith('_ms') or key.endswith('_s') or key.endswith('_rps')):
+            continue
+        old_value, new_value = base[key], new[key]
+        if old_value <= 0:
+            continue
+        change = (new_value - old_value) / old_value
+        if abs(change) >= threshold:
+            # 처리량은 커질수록, 시간은 작아질수록 개선
+            improved = change > 0 if key.endswith('_rps') else change < 0
+            rows.append((key, old_value, new_value, change, improved))
+
+    print("=" * 96)
+    print(f"비교: {base_path} -> {new_path} (변화 {threshold:.0%} 이상)")
+    print("-" * 96)
+    for key, old_value, new_value, change, improved in rows:
+        print(f"{key:<60} {old_value:>10.3f} {new_value:>10.3f} {change:>+7.1%} {'개선' if improved else '회귀'}")
+    if not rows:
+        print("변화 없음")
+    print("=" * 96)
+    return rows
+
+
+def print_summary(report):
+    print("=" * 78)
+    print(f"커밋: {report['meta']['commit']}, 시각: {report['meta']['timestamp']}")
+    results = report['results']
+    for scale, scale_result in results.get('scales', {}).items():
+        print(f"[{scale}] 정책 {scale_result.get('policies', '-')}개")
+        if 'load' in scale_result:
+            load = scale_result['load']
+            print(f"  load_real_data: 콜드 {load['cold']['load_real_data_s']:.2f}s, 웜 {load['warm']['load_real_data_s']:.2f}s")
+        if 'recommend' in scale_result:
+            rec = scale_result['recommend']
+            print(f"  추천 (쿼리 캐시 미스): p50 {rec['single_query_miss']['p50_ms']:.2f}ms, "
+                  f"p95 {rec['single_query_miss']['p95_ms']:.2f}ms")
+            print(f"  추천 (쿼리 캐시 적중): p50 {rec['single_query_hit']['p50_ms']:.2f}ms, "
+                  f"p95 {rec['single_query_hit']['p95_ms']:.2f}ms")
+            for size, stats in rec['batch'].items():
+                print(f"  일괄 추천 {size}명: {stats['mean_ms']:.2f}ms ({stats['per_profile_ms']:.3f}ms/명)")
+    for name, stats in results.get('api', {}).items():
+        print(f"  API {name:<32} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  {stats['statuses']}")
+    if 'http' in results:
+        http = results['http']
+        print(f"  부하: {http['requests']}건 / {http['duration_s']:.1f}s = {http['throughput_rps']:.1f} rps "
+              f"(동시 {http['concurrency']}, 오류 {http['errors']})")
+        for name, stats in http['endpoints'].items():
+            print(f"    {name:<10} p50 {stats['p50_ms']:>8.2f}ms  p99 {stats['p99_ms']:>8.2f}ms  {stats['statuses']}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 서버 성능 벤치마크")
+    parser.add_argument('--suites', default='load,recommend,api,http', help=f"실행할 스위트 (쉼표 구분, {', '.join(SUITES)})")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로")
+    parser.add_argument('--scales', default='1', help="합성 카탈로그 배율 목록 (쉼표 구분, 예: 1,10,100)")
+    parser.add_argument('--repeat', type=int, default=1, help="추천 측정 반복 횟수")
+    parser.add_argument('--requests', type=int, default=100, help="api 스위트 엔드포인트별 요청 수")
+    parser.add_argument('--url', default=None, help="실행 중인 서버 URL (없으면 프로세스 내 앱 + 스텁)")
+    parser.add_argument('--duration', type=float, default=10.0, help="http 부하 테스트 시간(초)")
+    parser.add_argument('--concurrency', type=int, default=16, help="http 부하 테스트 동시 작업자 수")
+    parser.add_argument('--mix', default='recommend=8,summary=1,health=1', help="http 요청 비율 (엔드포인트=가중치)")
+    parser.add_argument('--gemini-delay', type=float, default=0.2, help="Gemini 스텁 응답 지연(초)")
+    parser.add_argument('--backend-delay', type=float, default=0.02, help="백엔드 스텁 응답 지연(초)")
+    parser.add_argument('--output', default=None, help="JSON 결과 저장 경로")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help="두 결과 파일 비교")
+    parser.add_argument('--verbose', action='store_true', help="측정 중 서버/모델 로그 출력")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"알 수 없는 스위트: {', '.join(sorted(unknown))}")
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "suites": suites,
+            "scales": scales,
+            "args": vars(args)
+        },
+        "results": {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix='yuno_bench_') as work_dir:
+        if 'load' in suites or 'recommend' in suites:
+            report['results']['scales'] = {}
+            for scale in scales:
+                print(f"[x{scale}] 카탈로그 준비 중...")
+                csv_path = scale_csv(args.csv, scale, work_dir)
+                cache_dir = os.path.join(work_dir, f"cache_x{scale}")
+                load_result, ai = run_load_suite(csv_path, cache_dir, args.verbose)
+                scale_result = {"policies": load_result["policies"]}
+                if 'load' in suites:
+                    scale_result['load'] = load_result
+                if 'recommend' in suites:
+                    print(f"[x{scale}] 추천 지연시간 측정 중...")
+                    scale_result['recommend'] = run_recommend_suite(ai, args.repeat, args.verbose)
+                report['results']['scales'][f"x{scale}"] = scale_result
+                del ai
+
+        server_suites = [suite for suite in suites if suite in ('api', 'http')]
+        if server_suites:
+            print("API/HTTP 부하 측정 중...")
+            csv_path = scale_csv(args.csv, scales[0], work_dir)
+            cache_dir = os.path.join(work_dir, f"cache_x{scales[0]}")
+            report['results'].update(asyncio.run(run_server_suites(args, csv_path, cache_dir, server_suites)))
+
+    print_summary(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+LRU + TTL 캐시
+추천 결과/정책 요약/쿼리 임베딩 캐시에서 공통으로 사용
+- 메모리 크기(추정 바이트) 또는 항목 수 기준 LRU 제거
+- 항목별 TTL
+- 태그 단위 무효화 (예: 정책이 바뀌면 해당 정책 요약만 삭제)
+- 캐시별 hit/miss/eviction 통계
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def estimate_size(value):
+    """캐시 값의 대략적인 메모리 크기 (바이트)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at', 'tags')
+
+    def __init__(self, value, size, expires_at, tags):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class TTLCache:
+    """
+    LRU + TTL 캐시
+
+    Args:
+        name: 통계 표시용 이름
+        max_bytes: 최대 메모리 크기 (추정 바이트, None이면 제한 없음)
+        max_entries: 최대 항목 수 (None이면 제한 없음)
+        default_ttl: 기본 만료 시간(초, None이면 만료 없음)
+    """
+
+    def __init__(self, name, max_bytes=None, max_entries=None, default_ttl=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict()
+        self._tags = {}  # 태그 -> 키 집합
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return False
+            return True
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key, value, ttl=None, tags=()):
+        """
+        Args:
+            ttl: 만료 시간(초, None이면 default_ttl)
+            tags: 무효화용 태그 (예: "policy:<id>")
+        """
+        if self.max_entries is not None and self.max_entries <= 0:
+            return
+
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # 캐시 전체보다 큰 값은 저장하지 않음
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            tags = frozenset(tags)
+            self._entries[key] = _Entry(value, size, expires_at, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+            return False
+
+    def invalidate_tag(self, tag):
+        """태그가 붙은 항목 전체 삭제, 삭제 개수 반환"""
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """전체 삭제, 삭제 개수 반환"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+            self.invalidations += count
+            return count
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self):
+        """크기 제한을 넘으면 가장 오래 사용하지 않은 항목부터 제거"""
+        while self._over_limit():
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _over_limit(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
@@ -0,0 +1,544 @@
+"""
+워커 간 공유 캐시 백엔드
+uvicorn 워커 여러 개가 같은 노드에서 Gemini 요약/쿼리 임베딩/추천 결과를 함께 쓰도록 저장소를 교체 가능하게 함
+- memory: 프로세스 내 TTLCache (기본값, 워커마다 따로)
+- sqlite: 캐시 볼륨의 SQLite 파일 (같은 노드의 모든 워커가 공유)
+- redis: Redis 프로토콜(RESP) 서버 (노드 간 공유, 로컬 대체 서버로도 동작)
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ('memory', 'sqlite', 'redis')
+
+# SQLite LRU 순서용 accessed_at 갱신 기준 (적중마다 쓰기가 생기지 않도록 오래된 경우에만 갱신)
+# 마지막 갱신 후 ACCESS_TOUCH_INTERVAL초 또는 남은 수명의 ACCESS_TOUCH_FRACTION 중 짧은 쪽이 지나면 갱신
+ACCESS_TOUCH_INTERVAL = 60.0
+ACCESS_TOUCH_FRACTION = 0.1
+
+
+# 값 직렬화 (JSON + NumPy 배열)
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return {
+            "__ndarray__": base64.b64encode(np.ascontiguousarray(value).tobytes()).decode('ascii'),
+            "dtype": str(value.dtype),
+            "shape": list(value.shape)
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj):
+    if "__ndarray__" in obj:
+        data = base64.b64decode(obj["__ndarray__"])
+        return np.frombuffer(data, dtype=obj["dtype"]).reshape(obj["shape"])
+    return obj
+
+
+def encode_value(value):
+    return json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def decode_value(data):
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+class SharedCache:
+    """
+    공유 저장소 기반 캐시 (TTLCache와 같은 인터페이스)
+    저장소 오류는 캐시 미스로 처리하고 요청은 계속 진행
+    """
+
+    def __init__(self, name, store, default_ttl=None):
+        self.name = name
+        self.store = store
+        self.default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        try:
+            return self.store.count()
+        except Exception:
+            return 0
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def _count(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def get(self, key, default=None):
+        try:
+            data = self.store.get(key)
+        except Exception as e:
+            self._count('errors')
+            logger.warning("%s cache read failed: %s", self.name, e)
+            data = None
+
+        if data is None:
+            self._count('misses')
+            return default
+
+        try:
+            value = decode_value(data)
+        except ValueError as e:
+            # 손상되었거나 형식이 다른 항목은 삭제하고 미스로 처리
+            self._count('errors')
+            self._count('misses')
+            logger.warning("%s cache entry %s is corrupt, dropping: %s", self.name, key, e)
+            self.delete(key)
+            return default
+
+        self._count('hits')
+        return value
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            self.store.set(key, encode_value(value), ttl, tuple(tags))
+        except Exception as e:
+            self._count('errors')
+            logger.warning("%s cache write failed: %s", self.name, e)
+
+    def delete(self, key):
+        try:
+            return self.store.delete(key)
+        except Exception as e:
+            self._count('errors')
+            logger.warning("%s cache delete failed: %s", self.name, e)
+            return False
+
+    def invalidate_tag(self, tag):
+        try:
+            count = self.store.invalidate_tag(tag)
+        except Exception as e:
+            self._count('errors')
+            logger.warning("%s cache invalidation failed: %s", self.name, e)
+            return 0
+        self._count('invalidations', count)
+        return count
+
+    def clear(self):
+        try:
+            count = self.store.clear()
+        except Exception as e:
+            self._count('errors')
+            logger.warning("%s cache clear failed: %s", self.name, e)
+            return 0
+        self._count('invalidations', count)
+        return count
+
+    def stats(self):
+        try:
+            store_stats = self.store.stats()
+        except Exception:
+            store_stats = {}
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": self.store.backend,
+                "entries": store_stats.get("entries"),
+                "bytes": store_stats.get("bytes"),
+                "max_bytes": store_stats.get("max_bytes"),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": store_stats.get("evictions"),
+                "invalidations": self.invalidations,
+                "errors": self.errors
+            }
+
+
+class SQLiteStore:
+    """
+    SQLite 파일 저장소 (WAL 모드, 같은 노드의 여러 프로세스가 동시에 사용)
+    namespace별로 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path, namespace, max_bytes=None, max_entries=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_tags (
+                    namespace TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (namespace, tag, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (namespace, accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (namespace, expires_at)")
+
+    def _conn(self):
+        """스레드별 연결"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        if expires_at is not None and expires_at <= now:
+            self.delete(key)
+            return None
+        if now - accessed_at >= self._touch_interval(expires_at, accessed_at):
+            self._touch(conn, key, accessed_at, now)
+        return bytes(value)
+
+    @staticmethod
+    def _touch_interval(expires_at, accessed_at):
+        if expires_at is None:
+            return ACCESS_TOUCH_INTERVAL
+        return min(ACCESS_TOUCH_INTERVAL, (expires_at - accessed_at) * ACCESS_TOUCH_FRACTION)
+
+    def _touch(self, conn, key, accessed_at, now):
+        """accessed_at 갱신 (LRU 순서용이라 실패하거나 다른 워커가 먼저 갱신했으면 건너뜀)"""
+        try:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ? AND accessed_at = ?",
+                (now, self.namespace, key, accessed_at)
+            )
+        except sqlite3.OperationalError as e:
+            logger.debug("%s access time update skipped: %s", self.namespace, e)
+
+    def set(self, key, data, ttl, tags):
+        conn = self._conn()
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_tags WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, sqlite3.Binary(data), len(data), expires_at, now)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tags (namespace, tag, key) VALUES (?, ?, ?)",
+                [(self.namespace, tag, key) for tag in tags]
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """만료 항목 삭제 후 크기 제한을 넘으면 LRU 순서로 삭제 (트랜잭션 안에서 호출)"""
+        # 만료 항목의 태그를 먼저 삭제 (남겨 두면 날짜별로 바뀌는 키의 태그가 계속 쌓임)
+        conn.execute(
+            "DELETE FROM cache_tags WHERE namespace = ? AND key IN "
+            "(SELECT key FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?)",
+            (self.namespace, self.namespace, now)
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+
+        over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+        over_entries = self.max_entries is not None and count > self.max_entries
+        if not (over_bytes or over_entries):
+            return
+
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at",
+            (self.namespace,)
+        ).fetchall():
+            if not ((self.max_bytes is not None and total_bytes > self.max_bytes) or
+                    (self.max_entries is not None and count > self.max_entries)):
+                break
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.execute("DELETE FROM cache_tags WHERE namespace = ? AND key = ?", (self.namespace, key))
+            total_bytes -= size
+            count -= 1
+            evicted += 1
+        self.evictions += evicted
+
+    def delete(self, key):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.execute("DELETE FROM cache_tags WHERE namespace = ? AND key = ?", (self.namespace, key))
+        return cursor.rowcount > 0
+
+    def invalidate_tag(self, tag):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN "
+                "(SELECT key FROM cache_tags WHERE namespace = ? AND tag = ?)",
+                (self.namespace, self.namespace, tag)
+            )
+            conn.execute(
+                "DELETE FROM cache_tags WHERE namespace = ? AND key IN "
+                "(SELECT key FROM cache_tags WHERE namespace = ? AND tag = ?)",
+                (self.namespace, self.namespace, tag)
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            conn.execute("DELETE FROM cache_tags WHERE namespace = ?", (self.namespace,))
+        return cursor.rowcount
+
+    def count(self):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def stats(self):
+        count, total_bytes = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions
+        }
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisClient:
+    """
+    최소 Redis(RESP2) 클라이언트 (redis 패키지 의존성 없이 소켓으로 직접 통신)
+    URL 형식: redis://[:password@]host:port/db
+    """
+
+    def __init__(self, url, timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        if self.password:
+            self._send(('AUTH', self.password))
+        if self.db:
+            self._send(('SELECT', self.db))
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._reader = None
+
+    def execute(self, *args):
+        """명령 실행 (연결이 끊겼으면 한 번 재연결 후 재시도)"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(args)
+                except (OSError, EOFError):
+                    self.close()
+                    if attempt == 1:
+                        raise
+
+    def _send(self, args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode())
+            parts.append(data)
+            parts.append(b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise EOFError("Connection closed by Redis server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            raise RedisError(payload.decode())
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unknown reply prefix: {line!r}")
+
+
+class RedisStore:
+    """
+    Redis 저장소 (키: <namespace>:<key>, 태그: <namespace>:tag:<tag> SET)
+    크기 제한은 Redis 서버의 maxmemory/LRU 정책에 맡김
+    """
+
+    backend = 'redis'
+
+    def __init__(self, client, namespace):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _tag_key(self, tag):
+        return f"{self.namespace}:tag:{tag}"
+
+    def get(self, key):
+        return self.client.execute('GET', self._key(key))
+
+    def set(self, key, data, ttl, tags):
+        if ttl is not None:
+            self.client.execute('SET', self._key(key), data, 'PX', max(1, int(ttl * 1000)))
+        else:
+            self.client.execute('SET', self._key(key), data)
+        for tag in tags:
+            self.client.execute('SADD', self._tag_key(tag), key)
+            if ttl is not None:
+                self.client.execute('EXPIRE', self._tag_key(tag), max(1, int(ttl)))
+
+    def delete(self, key):
+        return self.client.execute('DEL', self._key(key)) > 0
+
+    def invalidate_tag(self, tag):
+        keys = self.client.execute('SMEMBERS', self._tag_key(tag)) or []
+        count = 0
+        if keys:
+            count = self.client.execute('DEL', *[self._key(key.decode('utf-8')) for key in keys])
+        self.client.execute('DEL', self._tag_key(tag))
+        return count
+
+    def _scan(self):
+        cursor = '0'
+        while True:
+            cursor, keys = self.client.execute('SCAN', cursor, 'MATCH', f"{self.namespace}:*", 'COUNT', 500)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else str(cursor)
+            for key in keys:
+                yield key
+            if cursor == '0':
+                break
+
+    def clear(self):
+        keys = list(self._scan())
+        count = sum(1 for key in keys if not key.startswith(f"{self.namespace}:tag:".encode()))
+        for i in range(0, len(keys), 500):
+            self.client.execute('DEL', *keys[i:i + 500])
+        return count
+
+    def count(self):
+        return sum(1 for key in self._scan() if not key.startswith(f"{self.namespace}:tag:".encode()))
+
+    def stats(self):
+        return {"entries": self.count(), "bytes": None, "max_bytes": None, "evictions": None}
+
+
+def create_cache(name, backend='memory', max_bytes=None, max_entries=None, default_ttl=None,
+                 sqlite_path=None, redis_client=None, namespace='yuno'):
+    """
+    설정에 맞는 캐시 생성
+
+    Args:
+        backend: 'memory' | 'sqlite' | 'redis'
+        sqlite_path: sqlite 백엔드 DB 파일 경로
+        redis_client: redis 백엔드 RedisClient (캐시끼리 연결 공유)
+        namespace: 공유 저장소 키 접두사
+    """
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend} (choose from {CACHE_BACKENDS})")
+
+    if backend == 'memory':
+        return TTLCache(name, max_bytes=max_bytes, max_entries=max_entries, default_ttl=default_ttl)
+
+    if backend == 'sqlite':
+        store = SQLiteStore(sqlite_path, f"{namespace}:{name}", max_bytes=max_bytes, max_entries=max_entries)
+    else:
+        store = RedisStore(redis_client, f"{namespace}:{name}")
+    return SharedCache(name, store, default_ttl=default_ttl)
@@ -0,0 +1,300 @@
+"""
+암묵적 피드백 협업 필터링 (사용자-정책 상호작용: 조회/클릭/북마크/신청 등)
+- InteractionLog: 사용자 x 정책 희소 행렬 (행동별 가중치 누적, 백엔드 interactions JSONL 내보내기 파일 이어 읽기)
+- CollaborativeModel: TruncatedSVD 정책 요인 + 사용자 요인 스냅샷 (둘 다 정규화, 추천 시 후보별 내적 한 번)
+- 새 이벤트가 들어온 사용자는 기존 정책 요인으로 사용자 요인만 다시 투영(fold-in)하고,
+  이벤트가 일정 수 이상 쌓이면 정책 요인까지 전체 재학습
+
+이벤트 형식 (JSONL 한 줄에 하나, backend interactions 테이블 열 이름):
+    {"user_id": "user_001", "policy_id": "20240703005400200002", "action": "bookmark"}
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# 행동별 가중치 (unbookmark는 북마크 가중치를 상쇄, 누적 가중치가 0 이하이면 상호작용 없음으로 취급)
+ACTION_WEIGHTS = {
+    'view': 1.0,
+    'click': 1.0,
+    'share': 2.0,
+    'bookmark': 3.0,
+    'unbookmark': -3.0,
+    'apply': 4.0,
+}
+
+
+def parse_event(event):
+    """이벤트 dict -> (user_id, policy_id, 가중치), 알 수 없는 행동이나 필드 누락이면 None"""
+    try:
+        user_id = event.get('user_id')
+        policy_id = event.get('policy_id')
+        weight = event.get('weight')
+        if weight is None:
+            weight = ACTION_WEIGHTS.get(event.get('action'))
+        if user_id in (None, '') or policy_id in (None, '') or weight is None:
+            return None
+        return str(user_id), str(policy_id), float(weight)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class InteractionLog:
+    """
+    사용자 x 정책 누적 가중치 (희소)
+    사용자/정책 번호는 처음 나온 순서로 붙이고 바뀌지 않으므로, 이전에 학습한 정책 요인의 열 순서가 유지됨
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}      # 사용자 ID -> 행 번호
+        self._items = {}      # 정책 ID -> 열 번호
+        self._item_ids = []
+        self._rows = []       # 행 번호 -> {열 번호: 누적 가중치}
+        self._dirty_users = set()
+        self.events = 0
+        self.pending_events = 0  # 마지막 전체 학습 이후 이벤트 수
+        self.skipped_events = 0
+        self._file_offset = 0
+
+    def add(self, events):
+        """이벤트 추가 (반영된 이벤트 수)"""
+        accepted = 0
+        with self._lock:
+            for event in events:
+                parsed = parse_event(event)
+                if parsed is None:
+                    self.skipped_events += 1
+                    continue
+                user_id, policy_id, weight = parsed
+                row = self._users.get(user_id)
+                if row is None:
+                    row = self._users[user_id] = len(self._rows)
+                    self._rows.append({})
+                col = self._items.get(policy_id)
+                if col is None:
+                    col = self._items[policy_id] = len(self._item_ids)
+                    self._item_ids.append(policy_id)
+                weights = self._rows[row]
+                weights[col] = weights.get(col, 0.0) + weight
+                self._dirty_users.add(user_id)
+                accepted += 1
+            self.events += accepted
+            self.pending_events += accepted
+        return accepted
+
+    def ingest_file(self, path):
+        """
+        JSONL 이벤트 파일에서 마지막으로 읽은 위치 이후의 완성된 줄만 읽어 추가
+        파일이 이전보다 작아졌으면 새 내보내기 파일로 보고 처음부터 다시 읽음
+
+        Returns:
+            (반영된 이벤트 수, 다시 읽었는지)
+        """
+        if not os.path.exists(path):
+            return 0, False
+        reset = os.path.getsize(path) < self._file_offset
+        if reset:
+            self.clear()
+
+        events = []
+        with open(path, 'rb') as f:
+            f.seek(self._file_offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1  # 아직 쓰는 중인 마지막 줄은 다음에 읽음
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                self.skipped_events += 1
+        self._file_offset += end
+        return self.add(events), reset
+
+    def reset_pending(self):
+        """전체 학습 시작: 쌓인 이벤트 수를 0으로 (학습 중 들어온 이벤트는 다음 학습 대상)"""
+        with self._lock:
+            pending, self.pending_events = self.pending_events, 0
+            return pending
+
+    def restore_pending(self, pending):
+        with self._lock:
+            self.pending_events += pending
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._items.clear()
+            self._item_ids.clear()
+            self._rows.clear()
+            self._dirty_users.clear()
+            self.events = self.pending_events = 0
+            self._file_offset = 0
+
+    def take_dirty_users(self):
+        """마지막 호출 이후 이벤트가 들어온 사용자 ID (호출 시 비움)"""
+        with self._lock:
+            users, self._dirty_users = self._dirty_users, set()
+            return users
+
+    @property
+    def shape(self):
+        return len(self._users), len(self._item_ids)
+
+    def snapshot(self, user_ids=None):
+        """
+        신뢰도 행렬 log1p(누적 가중치) (가중치 0 이하는 제외)
+
+        Args:
+            user_ids: 이 사용자들의 행만 (None이면 전체 사용자)
+
+        Returns:
+            (사용자 ID 리스트, 정책 ID 리스트, CSR 행렬 float32)
+        """
+        # scipy는 협업 필터링을 쓸 때만 import (서버 시작 시간 절약)
+        from scipy import sparse
+
+        with self._lock:
+            item_ids = list(self._item_ids)
+            if user_ids is None:
+                users = list(self._users)
+            else:
+                users = [user_id for user_id in user_ids if user_id in self._users]
+            entries = [
+                (i, col, weight)
+                for i, user_id in enumerate(users)
+                for col, weight in self._rows[self._users[user_id]].items()
+                if weight > 0
+            ]
+
+        if entries:
+            rows, cols, weights = (np.asarray(values) for values in zip(*entries))
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            weights = np.zeros(0)
+        matrix = sparse.csr_matrix(
+            (np.log1p(weights).astype(np.float32), (rows, cols)), shape=(len(users), len(item_ids))
+        )
+        return users, item_ids, matrix
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class CollaborativeModel:
+    """
+    학습된 요인 스냅샷 (교체 방식으로 갱신하므로 추천 중에는 잠금 없이 읽음)
+
+    Args:
+        item_ids: 정책 ID 리스트 (item_factors 행 순서)
+        item_factors: (정책 수, k) 정규화된 정책 요인
+        components: (k, 정책 수) SVD 성분 (사용자 fold-in용)
+        user_factors: 사용자 ID -> (정규화된 사용자 요인, 버전)
+        version: 스냅샷 번호 (학습/fold-in 때마다 증가, 워커별로 다름)
+        item_digest: 정책 ID + 정책 요인 해시 (None이면 계산, fold-in 스냅샷은 학습 때 값을 그대로 사용)
+    """
+
+    def __init__(self, item_ids, item_factors, components, user_factors, version, fitted_at, item_digest=None):
+        self.item_ids = list(item_ids)
+        self.item_factors = item_factors
+        self.components = components
+        self.user_factors = user_factors
+        self.version = version
+        self.fitted_at = fitted_at
+        if item_digest is None:
+            digest = hashlib.sha1('\0'.join(self.item_ids).encode('utf-8'))
+            digest.update(np.ascontiguousarray(item_factors, dtype=np.float32).tobytes())
+            item_digest = digest.digest()
+        self.item_digest = item_digest
+        self._aligned = None  # (카탈로그 정책 ID 리스트, 카탈로그 순서 정책 요인)
+
+    @property
+    def n_components(self):
+        return self.item_factors.shape[1]
+
+    @classmethod
+    def fit(cls, log, n_components=16, version=1, random_state=0):
+        """상호작용 전체로 TruncatedSVD 학습 (사용자/정책이 2개 미만이면 None)"""
+        from sklearn.decomposition import TruncatedSVD
+
+        user_ids, item_ids, matrix = log.snapshot()
+        k = min(n_components, min(matrix.shape) - 1)
+        if k < 1 or matrix.nnz == 0:
+            return None
+        svd = TruncatedSVD(n_components=k, random_state=random_state).fit(matrix)
+        components = svd.components_.astype(np.float32)
+        user_vectors = _normalize_rows(matrix @ components.T)
+        return cls(
+            item_ids,
+            _normalize_rows(components.T),
+            components,
+            {user_id: (vector, version) for user_id, vector in zip(user_ids, user_vectors)},
+            version,
+            time.time()
+        )
+
+    def fold_in(self, log, user_ids, version):
+        """
+        user_ids의 사용자 요인만 현재 정책 요인으로 다시 투영한 새 스냅샷
+        (학습 이후 처음 나온 정책은 다음 전체 학습 때 반영)
+        """
+        users, _, matrix = log.snapshot(user_ids)
+        matrix = matrix[:, :len(self.item_ids)]
+        user_factors = dict(self.user_factors)
+        for user_id, vector in zip(users, _normalize_rows(matrix @ self.components.T)):
+            user_factors[user_id] = (vector, version)
+        model = CollaborativeModel(
+            self.item_ids, self.item_factors, self.components, user_factors, version, self.fitted_at,
+            self.item_digest
+        )
+        model._aligned = self._aligned
+        return model
+
+    def user_factor(self, user_id):
+        """(정규화된 사용자 요인, 버전), 상호작용이 없는 사용자는 None"""
+        entry = self.user_factors.get(str(user_id))
+        if entry is None or not entry[0].any():
+            return None
+        return entry
+
+    def factor_key(self, user_id):
+        """
+        사용자 요인 내용 해시 (정책 요인 + 사용자 요인, 상호작용이 없는 사용자는 None)
+        같은 요인이면 워커가 달라도 같은 값이라 공유 캐시 키로 사용 (version은 워커마다 갱신 시점이 달라 쓰지 않음)
+        """
+        entry = self.user_factor(user_id)
+        if entry is None:
+            return None
+        digest = hashlib.sha1(self.item_digest)
+        digest.update(np.ascontiguousarray(entry[0], dtype=np.float32).tobytes())
+        return digest.hexdigest()[:16]
+
+    def aligned_item_factors(self, policy_ids):
+        """카탈로그 정책 순서로 맞춘 정책 요인 (상호작용이 없는 정책은 0 벡터, 카탈로그별로 한 번 계산)"""
+        aligned = self._aligned
+        if aligned is not None and aligned[0] is policy_ids:
+            return aligned[1]
+        positions = {policy_id: i for i, policy_id in enumerate(self.item_ids)}
+        factors = np.zeros((len(policy_ids), self.n_components), dtype=np.float32)
+        rows = [(idx, positions[policy_id]) for idx, policy_id in enumerate(policy_ids) if policy_id in positions]
+        if rows:
+            catalog_rows, item_rows = (np.asarray(values) for values in zip(*rows))
+            factors[catalog_rows] = self.item_factors[item_rows]
+        self._aligned = (policy_ids, factors)
+        return factors
+
+    def scores(self, user_id, policy_ids, indices):
+        """후보별 사용자-정책 요인 코사인 (-1~1), 요인이 없는 사용자는 None"""
+        entry = self.user_factor(user_id)
+        if entry is None:
+            return None
+        return self.aligned_item_factors(policy_ids)[indices] @ entry[0]
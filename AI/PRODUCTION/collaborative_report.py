@@ -0,0 +1,222 @@
+"""
+협업 필터링 오프라인 평가 리포트 (합성 상호작용 이벤트)
+실제 정책 카탈로그 위에 선호 카테고리가 있는 합성 사용자를 만들고, 사용자별 마지막 긍정 이벤트(북마크/신청)를
+제외하고 학습한 뒤 HR@10 / NDCG@10을 인기순 기준선과 비교 (요인 차원별 학습/fold-in/점수 계산 시간 포함)
+
+사용법:
+    python collaborative_report.py
+    python collaborative_report.py --users 5000 --events 30 --components 16,32,64 --output cf_report.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from collaborative import CollaborativeModel, InteractionLog
+from policy_ingest import load_policy_csv
+
+TOP_K = 10
+# 합성 행동 분포 (조회 위주, 북마크/신청은 적게)
+ACTIONS = ('view', 'click', 'share', 'bookmark', 'apply')
+ACTION_PROBS = (0.55, 0.2, 0.05, 0.15, 0.05)
+POSITIVE_ACTIONS = ('bookmark', 'apply')
+
+
+def synthetic_events(policy_ids, categories, n_users, events_per_user, preference=0.8, seed=0):
+    """
+    합성 이벤트: 사용자마다 선호 카테고리 1~2개, 이벤트의 preference 비율은 선호 카테고리 정책에서
+    정책 인기도(Zipf)에 비례해 선택하고 나머지는 전체 정책에서 무작위
+
+    Returns:
+        사용자별 이벤트 리스트 (시간 순)
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.unique(np.asarray(categories, dtype=str), return_inverse=True)[1]
+    n_categories = int(codes.max()) + 1
+    popularity = 1.0 / (rng.permutation(len(policy_ids)) + 1.0) ** 0.8
+    by_category = [np.flatnonzero(codes == c) for c in range(n_categories)]
+    by_category = [members for members in by_category if len(members) > 0]
+
+    users = []
+    for u in range(n_users):
+        preferred = rng.choice(len(by_category), size=rng.integers(1, 3), replace=False)
+        pool = np.concatenate([by_category[c] for c in preferred])
+        weights = popularity[pool] / popularity[pool].sum()
+        events = []
+        for _ in range(events_per_user):
+            if rng.random() < preference:
+                item = pool[rng.choice(len(pool), p=weights)]
+            else:
+                item = rng.integers(len(policy_ids))
+            action = ACTIONS[rng.choice(len(ACTIONS), p=ACTION_PROBS)]
+            events.append({"user_id": f"user_{u}", "policy_id": policy_ids[item], "action": action})
+        users.append(events)
+    return users
+
+
+def split_holdout(users):
+    """사용자별 마지막 긍정 이벤트를 평가용으로 분리 (긍정 이벤트가 없는 사용자는 평가 제외)"""
+    train, holdout = [], {}
+    for events in users:
+        positives = [i for i, event in enumerate(events) if event['action'] in POSITIVE_ACTIONS]
+        if not positives:
+            train.extend(events)
+            continue
+        held = events[positives[-1]]
+        holdout[held['user_id']] = held['policy_id']
+        # 평가 정책에 대한 다른 이벤트도 학습에서 제외 (정답 유출 방지)
+        train.extend(event for event in events if event['policy_id'] != held['policy_id'])
+    return train, holdout
+
+
+def rank_metrics(ranked_lists, holdout):
+    """HR@K, NDCG@K (정답 1개)"""
+    hits, ndcg = 0, 0.0
+    for user_id, target in holdout.items():
+        ranked = ranked_lists.get(user_id, [])
+        if target in ranked:
+            hits += 1
+            ndcg += 1.0 / np.log2(ranked.index(target) + 2)
+    n = max(len(holdout), 1)
+    return {"hr_at_10": hits / n, "ndcg_at_10": ndcg / n}
+
+
+def seen_items(train):
+    seen = {}
+    for event in train:
+        seen.setdefault(event['user_id'], set()).add(event['policy_id'])
+    return seen
+
+
+def popularity_ranking(train, policy_ids, holdout):
+    """인기순 기준선: 학습 이벤트 가중치 합 상위 (이미 상호작용한 정책 제외)"""
+    counts = {}
+    for event in train:
+        counts[event['policy_id']] = counts.get(event['policy_id'], 0) + 1
+    order = sorted(policy_ids, key=lambda policy_id: -counts.get(policy_id, 0))
+    seen = seen_items(train)
+    return {
+        user_id: [policy_id for policy_id in order[:TOP_K + len(seen.get(user_id, ()))]
+                  if policy_id not in seen.get(user_id, ())][:TOP_K]
+        for user_id in holdout
+    }
+
+
+def cf_ranking(model, policy_ids, train, holdout):
+    """협업 필터링: 사용자 요인 · 정책 요인 상위 (이미 상호작용한 정책 제외)"""
+    seen = seen_items(train)
+    all_indices = np.arange(len(policy_ids))
+    ranked = {}
+    for user_id in holdout:
+        scores = model.scores(user_id, policy_ids, all_indices)
+        if scores is None:
+            ranked[user_id] = []
+            continue
+        order = np.argsort(-scores, kind='stable')
+        exclude = seen.get(user_id, ())
+        ranked[user_id] = [policy_ids[i] for i in order[:TOP_K + len(exclude)] if policy_ids[i] not in exclude][:TOP_K]
+    return ranked
+
+
+def run_report(policy_ids, categories, n_users=2000, events_per_user=20, components=(16, 32, 64), seed=0):
+    users = synthetic_events(policy_ids, categories, n_users, events_per_user, seed=seed)
+    train, holdout = split_holdout(users)
+
+    report = {
+        "policies": len(policy_ids),
+        "users": n_users,
+        "train_events": len(train),
+        "evaluated_users": len(holdout),
+        "popularity": rank_metrics(popularity_ranking(train, policy_ids, holdout), holdout),
+        "collaborative": []
+    }
+
+    for k in components:
+        log = InteractionLog()
+        log.add(train)
+        start = time.perf_counter()
+        model = CollaborativeModel.fit(log, n_components=k, random_state=seed)
+        fit_seconds = time.perf_counter() - start
+        if model is None:
+            continue
+        metrics = rank_metrics(cf_ranking(model, policy_ids, train, holdout), holdout)
+
+        # fold-in: 사용자 100명에게 이벤트 1개씩 추가 후 해당 사용자만 갱신 (5회 중앙값, 첫 회는 준비 비용 포함)
+        sample_users = list(holdout)[:100]
+        fold_in_times = []
+        for _ in range(5):
+            log.add({"user_id": user_id, "policy_id": policy_ids[0], "action": "view"} for user_id in sample_users)
+            start = time.perf_counter()
+            model.fold_in(log, log.take_dirty_users(), model.version + 1)
+            fold_in_times.append(time.perf_counter() - start)
+        fold_in_ms = float(np.median(fold_in_times)) * 1000
+
+        # 추천 시 추가 비용: 후보 전체(정책 수)와 내적
+        model.aligned_item_factors(policy_ids)
+        all_indices = np.arange(len(policy_ids))
+        start = time.perf_counter()
+        for user_id in sample_users:
+            model.scores(user_id, policy_ids, all_indices)
+        score_us = (time.perf_counter() - start) / max(len(sample_users), 1) * 1e6
+
+        report["collaborative"].append({
+            "components": model.n_components,
+            **metrics,
+            "fit_seconds": round(fit_seconds, 3),
+            "fold_in_100_users_ms": round(fold_in_ms, 3),
+            "score_all_candidates_us": round(score_us, 1)
+        })
+
+    return report
+
+
+def print_report(report):
+    print("=" * 70)
+    print(f"정책 수: {report['policies']}, 사용자: {report['users']}, 학습 이벤트: {report['train_events']}, "
+          f"평가 사용자: {report['evaluated_users']}")
+    print(f"인기순 기준선: HR@10 {report['popularity']['hr_at_10']:.3f}, "
+          f"NDCG@10 {report['popularity']['ndcg_at_10']:.3f}")
+    print("-" * 70)
+    print(f"{'k':>4} {'HR@10':>7} {'NDCG@10':>8} {'fit(s)':>7} {'fold-in 100(ms)':>16} {'score(us)':>10}")
+    for row in report['collaborative']:
+        print(f"{row['components']:>4} {row['hr_at_10']:>7.3f} {row['ndcg_at_10']:>8.3f} {row['fit_seconds']:>7.3f} "
+              f"{row['fold_in_100_users_ms']:>16.3f} {row['score_all_candidates_us']:>10.1f}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="협업 필터링 오프라인 평가 리포트 (합성 이벤트)")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로")
+    parser.add_argument('--users', type=int, default=2000, help="합성 사용자 수")
+    parser.add_argument('--events', type=int, default=20, help="사용자당 이벤트 수")
+    parser.add_argument('--components', default='16,32,64', help="비교할 요인 차원 목록 (쉼표 구분)")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    parser.add_argument('--output', default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    policies, _, _ = load_policy_csv(args.csv)
+    if not policies:
+        print("[ERROR] 정책 데이터가 없어 리포트를 생성할 수 없습니다")
+        return
+
+    components = [int(k) for k in args.components.split(',') if k.strip()]
+    report = run_report(
+        [policy['id'] for policy in policies],
+        [policy['bscPlanPlcyWayNoNm'] for policy in policies],
+        n_users=args.users,
+        events_per_user=args.events,
+        components=components,
+        seed=args.seed
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+정책 자격 조건(지역/나이/신청기간) 사전 계산 인덱스
+로딩 시 한 번 만들어 두고, 요청마다 전체 정책을 훑는 대신 비트셋 교집합으로 후보를 줄임
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+NATIONWIDE = '전국'
+
+# 로딩 시 미리 만들어 두는 지역 (광역시도)
+REGION_NAMES = [
+    '서울', '부산', '대구', '인천', '광주', '대전', '울산', '세종',
+    '경기', '강원', '충북', '충남', '전북', '전남', '경북', '경남', '제주'
+]
+
+MAX_LOCATION_MASKS = 256
+MAX_AGE = 150
+
+# 신청기간 기준 날짜는 한국 시간 (서머타임 없음)
+KST = timezone(timedelta(hours=9), 'KST')
+ALWAYS_OPEN = '상시'
+
+
+class EligibilityIndex:
+    """
+    지역 포스팅 리스트 + 나이 구간 인덱스
+
+    - 지역: 담당기관명(rgtrupInstCdNm)별 포스팅 리스트, 요청 지역 문자열별 비트셋(전국 정책 포함)을 메모이즈
+    - 나이: age_min/age_max 정렬 배열 + searchsorted로 나이별 비트셋 생성 후 메모이즈
+    반환하는 비트셋(bool 배열)은 읽기 전용 공유 객체임
+    """
+
+    def __init__(self, regions, age_min, age_max):
+        self.size = len(regions)
+
+        # 지역 포스팅 리스트 (담당기관명 -> 정책 인덱스)
+        region_names, region_codes = np.unique(np.asarray(regions, dtype=object).astype(str), return_inverse=True)
+        order = np.argsort(region_codes, kind='stable')
+        boundaries = np.searchsorted(region_codes[order], np.arange(len(region_names) + 1))
+        self._postings = {
+            name: order[boundaries[i]:boundaries[i + 1]]
+            for i, name in enumerate(region_names)
+        }
+
+        # 전국 정책은 모든 지역 비트셋에 합쳐짐
+        self._nationwide = self._bitset(np.concatenate(
+            [postings for name, postings in self._postings.items() if NATIONWIDE in name] or [np.zeros(0, dtype=np.int64)]
+        ))
+
+        # 나이 구간: 한쪽 조건만 있으면 그 조건만 적용, age_max 0은 상한 없음(온통청년 '제한없음' 표기)
+        age_min = np.asarray(age_min, dtype=np.float64)
+        age_max = np.asarray(age_max, dtype=np.float64)
+        restricted = ~np.isnan(age_min) | ~np.isnan(age_max)
+        lower = np.where(np.isnan(age_min), -np.inf, age_min)
+        upper = np.where(np.isnan(age_max) | (age_max == 0), np.inf, age_max)
+        restricted &= lower <= upper  # 역전된 구간은 잘못된 데이터로 보고 제한 없음 처리
+
+        self._unrestricted_age = self._bitset(np.flatnonzero(~restricted))
+        restricted_idx = np.flatnonzero(restricted)
+        by_lower = np.argsort(lower[restricted_idx], kind='stable')
+        by_upper = np.argsort(upper[restricted_idx], kind='stable')
+        self._lower_order = restricted_idx[by_lower]
+        self._lower_sorted = lower[restricted_idx][by_lower]
+        self._upper_order = restricted_idx[by_upper]
+        self._upper_sorted = upper[restricted_idx][by_upper]
+
+        self._all = self._freeze(np.ones(self.size, dtype=bool))
+        self._location_masks = OrderedDict()
+        self._age_masks = {}
+
+        for name in REGION_NAMES:
+            self.region_mask(name)
+
+    def _bitset(self, indices):
+        bits = np.zeros(self.size, dtype=bool)
+        bits[indices] = True
+        return self._freeze(bits)
+
+    @staticmethod
+    def _freeze(bits):
+        bits.flags.writeable = False
+        return bits
+
+    def region_mask(self, location):
+        """해당 지역 OR 전국 정책 비트셋 (지역 미지정 시 전체)"""
+        if not location:
+            return self._all
+
+        bits = self._location_masks.get(location)
+        if bits is not None:
+            self._location_masks.move_to_end(location)
+            return bits
+
+        # 담당기관명에 지역명이 포함된 포스팅 리스트 합집합 + 전국 정책
+        bits = self._nationwide.copy()
+        for name, postings in self._postings.items():
+            if location in name:
+                bits[postings] = True
+        bits = self._freeze(bits)
+
+        self._location_masks[location] = bits
+        if len(self._location_masks) > MAX_LOCATION_MASKS:
+            self._location_masks.popitem(last=False)
+        return bits
+
+    def age_mask(self, age):
+        """나이 조건을 만족하거나 나이 조건이 없는 정책 비트셋 (나이 미지정 시 전체)"""
+        if not age:
+            return self._all
+
+        bits = self._age_masks.get(age)
+        if bits is not None:
+            return bits
+
+        # age_min <= age 인 정책과 age <= age_max 인 정책의 교집합
+        lower_ok = np.zeros(self.size, dtype=bool)
+        lower_ok[self._lower_order[:np.searchsorted(self._lower_sorted, age, side='right')]] = True
+        upper_ok = np.zeros(self.size, dtype=bool)
+        upper_ok[self._upper_order[np.searchsorted(self._upper_sorted, age, side='left'):]] = True
+        bits = self._freeze((lower_ok & upper_ok) | self._unrestricted_age)
+
+        if isinstance(age, (int, np.integer)) and 0 <= age <= MAX_AGE:
+            self._age_masks[age] = bits
+        return bits
+
+    def mask(self, location, age):
+        """지역 AND 나이 조건 비트셋 (새 배열)"""
+        return self.region_mask(location) & self.age_mask(age)
+
+
+def today_kst():
+    """오늘 날짜 (한국 시간, 1970-01-01부터의 일수)"""
+    return (datetime.now(KST).date() - datetime(1970, 1, 1).date()).days
+
+
+def ymd_days(values):
+    """YYYYMMDD 문자열 리스트 -> 1970-01-01부터의 일수 float 배열 (없거나 잘못된 날짜는 NaN)"""
+    dates = pd.to_datetime(pd.Series(values, dtype=object), format='%Y%m%d', errors='coerce')
+    days = (dates - pd.Timestamp('1970-01-01')).dt.days
+    return days.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def application_windows(policies):
+    """
+    정책 리스트 -> (n, 2) 신청 시작일/마감일 (일수), 조건 없으면 NaN
+    상시 모집 정책은 날짜가 있어도 기간 제한 없음
+    """
+    always_open = np.array([policy.get('aplyPrdSeCd') == ALWAYS_OPEN for policy in policies], dtype=bool)
+    windows = np.column_stack([
+        ymd_days([policy.get('bizPrdBgngYmd') for policy in policies]),
+        ymd_days([policy.get('aplyPrdEndYmd') for policy in policies])
+    ]).reshape(-1, 2)
+    windows[always_open] = np.nan
+    return windows
+
+
+class ApplicationWindowIndex:
+    """
+    신청기간 인덱스 (시작일/마감일 정렬 배열 + searchsorted)
+
+    - open_mask(day): 신청 시작 전/마감된 정책을 뺀 비트셋 (기간 조건이 없는 정책은 항상 포함)
+    - closing_mask(day, days): day ~ day + days 사이에 마감되는 정책 비트셋
+    같은 날짜 비트셋은 메모이즈하고, 날짜가 바뀌면 첫 요청에서 새로 계산 (자정에 재로딩 불필요)
+    """
+
+    def __init__(self, start_days, end_days):
+        start_days = np.asarray(start_days, dtype=np.float64)
+        end_days = np.asarray(end_days, dtype=np.float64)
+        self.size = len(start_days)
+
+        # 한쪽 날짜만 있으면 그 조건만 적용
+        start = np.where(np.isnan(start_days), -np.inf, start_days)
+        end = np.where(np.isnan(end_days), np.inf, end_days)
+        self._start_order = np.argsort(start, kind='stable')
+        self._start_sorted = start[self._start_order]
+        self._end_order = np.argsort(end, kind='stable')
+        self._end_sorted = end[self._end_order]
+        self.dated = int(np.count_nonzero(~np.isnan(start_days) | ~np.isnan(end_days)))
+
+        # (날짜, 비트셋) - 날짜가 다르면 다시 계산 (요청 스레드끼리 날짜가 엇갈려도 다른 날 비트셋을 반환하지 않음)
+        self._open = (None, None)
+        self._closing = (None, {})
+
+    def open_mask(self, day):
+        """day에 신청 가능한 정책 비트셋 (시작일 <= day <= 마감일)"""
+        cached_day, bits = self._open
+        if cached_day != day:
+            started = np.zeros(self.size, dtype=bool)
+            started[self._start_order[:np.searchsorted(self._start_sorted, day, side='right')]] = True
+            not_closed = np.zeros(self.size, dtype=bool)
+            not_closed[self._end_order[np.searchsorted(self._end_sorted, day, side='left'):]] = True
+            bits = started & not_closed
+            bits.flags.writeable = False
+            self._open = (day, bits)
+        return bits
+
+    def closing_mask(self, day, days):
+        """day부터 days일 안에 마감되는 정책 비트셋"""
+        cached_day, masks = self._closing
+        if cached_day != day:
+            masks = {}
+            self._closing = (day, masks)
+        bits = masks.get(days)
+        if bits is None:
+            bits = np.zeros(self.size, dtype=bool)
+            lo = np.searchsorted(self._end_sorted, day, side='left')
+            hi = np.searchsorted(self._end_sorted, day + days, side='right')
+            bits[self._end_order[lo:hi]] = True
+            bits.flags.writeable = False
+            masks[days] = bits
+        return bits
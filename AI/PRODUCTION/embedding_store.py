@@ -0,0 +1,160 @@
+"""
+정책 임베딩 디스크 캐시
+정책 텍스트 해시 + 모델명을 키로 float32 벡터를 저장해 서버 재시작 시 재인코딩을 건너뜀
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    내용 주소 기반(content-addressed) 임베딩 저장소
+
+    - 벡터: <cache_dir>/embeddings_<model>.<token>.npy (memory-map으로 로딩)
+    - 인덱스: <cache_dir>/embeddings_<model>.index.json (키 -> 행 번호, 벡터 파일명)
+    인덱스 파일을 마지막에 원자적으로 교체하므로 여러 프로세스가 동시에 읽어도 안전함
+    """
+
+    def __init__(self, cache_dir, model_name):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        slug = re.sub(r'[^0-9A-Za-z._-]', '_', model_name)
+        self.prefix = f"embeddings_{slug}"
+        self.index_path = os.path.join(cache_dir, f"{self.prefix}.index.json")
+
+        self._vectors = None  # np.memmap (읽기 전용)
+        self._rows = {}       # 키 -> 행 번호
+        self._vectors_file = None
+
+    def text_key(self, text):
+        """모델명 + 정책 텍스트 해시"""
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode('utf-8')).hexdigest()
+
+    def load(self):
+        """인덱스와 벡터 파일 로딩 (없거나 손상되면 빈 저장소)"""
+        self._vectors = None
+        self._rows = {}
+        self._vectors_file = None
+
+        if not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+            if index.get('model') != self.model_name:
+                return
+
+            vectors = np.load(os.path.join(self.cache_dir, index['vectors']), mmap_mode='r')
+            keys = index['keys']
+            if vectors.ndim != 2 or vectors.shape[0] != len(keys) or vectors.dtype != np.float32:
+                print(f"[WARNING] 임베딩 캐시 형식 불일치 - 무시합니다: {self.index_path}")
+                return
+
+            self._vectors = vectors
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._vectors_file = index['vectors']
+        except Exception as e:
+            print(f"[WARNING] 임베딩 캐시 로딩 실패 - 무시합니다: {e}")
+            self._vectors = None
+            self._rows = {}
+            self._vectors_file = None
+
+    def encode(self, texts, encode_fn):
+        """
+        캐시에 있는 텍스트는 저장된 벡터를 사용하고, 새로 추가/변경된 텍스트만 encode_fn으로 인코딩
+
+        Args:
+            texts: 정책 텍스트 리스트
+            encode_fn: 텍스트 리스트 -> (n, dim) 벡터를 반환하는 함수
+
+        Returns:
+            (len(texts), dim) float32 배열 (texts 순서)
+        """
+        if self._vectors is None and not self._rows:
+            self.load()
+
+        keys = [self.text_key(text) for text in texts]
+
+        # 캐시에 없는 텍스트 (중복 제거)
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in self._rows and key not in missing:
+                missing[key] = i
+
+        new_vectors = None
+        if missing:
+            print(f"임베딩 캐시 미스: {len(missing)}개 정책 인코딩 (캐시 적중 {len(texts) - len(missing)}개)")
+            new_vectors = np.asarray(encode_fn([texts[i] for i in missing.values()]), dtype=np.float32)
+        else:
+            print(f"임베딩 캐시 적중: {len(texts)}개 정책 (인코딩 생략)")
+
+        if self._vectors is not None:
+            dim = self._vectors.shape[1]
+        elif new_vectors is not None:
+            dim = new_vectors.shape[1]
+        else:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        new_rows = {key: row for row, key in enumerate(missing)}
+        result = np.empty((len(texts), dim), dtype=np.float32)
+        for i, key in enumerate(keys):
+            if key in new_rows:
+                result[i] = new_vectors[new_rows[key]]
+            else:
+                result[i] = self._vectors[self._rows[key]]
+
+        # 새 벡터가 있거나 더 이상 쓰지 않는 벡터가 남아 있으면 현재 카탈로그 기준으로 다시 저장
+        unique_keys = list(dict.fromkeys(keys))
+        if missing or len(unique_keys) != len(self._rows):
+            first_rows = {}
+            for i, key in enumerate(keys):
+                first_rows.setdefault(key, i)
+            try:
+                self._save(unique_keys, result[[first_rows[key] for key in unique_keys]])
+            except Exception as e:
+                print(f"[WARNING] 임베딩 캐시 저장 실패: {e}")
+
+        return result
+
+    def _save(self, keys, vectors):
+        """벡터 파일을 새 이름으로 쓰고 인덱스를 원자적으로 교체"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        vectors_file = f"{self.prefix}.{uuid.uuid4().hex[:12]}.npy"
+        vectors_path = os.path.join(self.cache_dir, vectors_file)
+        tmp_vectors_path = vectors_path + '.tmp'
+        with open(tmp_vectors_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+        os.replace(tmp_vectors_path, vectors_path)
+
+        index = {
+            "model": self.model_name,
+            "dim": int(vectors.shape[1]),
+            "vectors": vectors_file,
+            "keys": keys
+        }
+        tmp_index_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_index_path, self.index_path)
+
+        # 이전 벡터 파일 정리 (이미 memory-map한 프로세스는 계속 읽을 수 있음)
+        old_vectors_file = self._vectors_file
+        self._vectors = np.load(vectors_path, mmap_mode='r')
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._vectors_file = vectors_file
+        if old_vectors_file and old_vectors_file != vectors_file:
+            try:
+                os.remove(os.path.join(self.cache_dir, old_vectors_file))
+            except OSError:
+                pass
+
+        print(f"임베딩 캐시 저장 완료: {len(keys)}개 벡터 -> {vectors_path}")
@@ -0,0 +1,174 @@
+"""
+문장 인코더 백엔드 비교 리포트
+torch(SentenceTransformer) 인코더를 기준으로 ONNX(float32 / 동적 int8) 인코더의 코사인 일치도, 쿼리 인코딩 지연시간, 메모리 비교
+
+사용법:
+    python encoder_report.py
+    python encoder_report.py --model-dir cache/onnx --threads 1,2,4 --output encoder_report.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from onnx_encoder import ONNX_MODEL_FILE, ONNX_QUANTIZED_MODEL_FILE, OnnxSentenceEncoder, onnx_model_exists
+from retrieval_report import build_profiles, percentile_ms
+from yuno_ai_system_clean import YunoAI, MODEL_NAME
+
+
+def rss_mb():
+    """현재 프로세스 RSS (MiB, /proc가 없으면 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def load_texts(csv_path, limit):
+    """리포트용 문장: 사용자 프로필 쿼리 + 정책 임베딩 텍스트 일부"""
+    queries = [YunoAI._build_user_query(profile) for profile in build_profiles()]
+    policy_texts = []
+    if csv_path and os.path.exists(csv_path):
+        df = pd.read_csv(csv_path, encoding='utf-8-sig').head(limit)
+        policy_texts = [
+            YunoAI._policy_text({
+                'plcyNm': row.get('title', ''),
+                'plcyExplnCn': row.get('description', ''),
+                'bscPlanPlcyWayNoNm': row.get('category_major', ''),
+                'category_minor': row.get('category_minor', ''),
+                'support_content': row.get('support_content', ''),
+                'keywords': row.get('keywords', '')
+            })
+            for _, row in df.iterrows()
+        ]
+    return queries, policy_texts
+
+
+def measure_latency(encoder, queries, repeat):
+    """요청 경로와 같은 단일 문장 인코딩 지연시간"""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            encoder.encode([query])
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def cosine(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.sum(a * b, axis=1)
+
+
+def run_report(model_name, model_dir, csv_path=None, threads=(0,), policy_limit=500, repeat=1):
+    queries, policy_texts = load_texts(csv_path, policy_limit)
+    report = {"model_name": model_name, "queries": len(queries), "policy_texts": len(policy_texts), "onnx": []}
+
+    # ONNX 인코더를 torch보다 먼저 로딩해야 torch import 전 메모리로 측정됨
+    onnx_results = []
+    for quantized in (False, True):
+        if not onnx_model_exists(model_dir, quantized):
+            continue
+        model_file = os.path.join(model_dir, ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        for thread_count in threads:
+            rss_before = rss_mb()
+            encoder = OnnxSentenceEncoder(model_dir, quantized=quantized, threads=thread_count)
+            encoder.encode(queries[:1])  # 워밍업
+            rss_after = rss_mb()
+            latencies = measure_latency(encoder, queries, repeat)
+            onnx_results.append({
+                "precision": 'int8' if quantized else 'float32',
+                "threads": thread_count,
+                "model_bytes": os.path.getsize(model_file),
+                "rss_increase_mb": None if rss_before is None else rss_after - rss_before,
+                "p50_ms": percentile_ms(latencies, 50),
+                "p95_ms": percentile_ms(latencies, 95),
+                "query_embeddings": encoder.encode(queries),
+                "policy_embeddings": encoder.encode(policy_texts) if policy_texts else None
+            })
+            del encoder
+
+    rss_before = rss_mb()
+    from sentence_transformers import SentenceTransformer
+    torch_encoder = SentenceTransformer(model_name, device='cpu')
+    torch_encoder.encode(queries[:1])
+    rss_after = rss_mb()
+    latencies = measure_latency(torch_encoder, queries, repeat)
+    torch_queries = np.asarray(torch_encoder.encode(queries), dtype=np.float32)
+    torch_policies = np.asarray(torch_encoder.encode(policy_texts), dtype=np.float32) if policy_texts else None
+    report["torch"] = {
+        "rss_increase_mb": None if rss_before is None else rss_after - rss_before,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95)
+    }
+    torch_p50 = report["torch"]["p50_ms"]
+
+    for result in onnx_results:
+        query_cosines = cosine(torch_queries, result.pop("query_embeddings"))
+        policy_embeddings = result.pop("policy_embeddings")
+        result["query_cosine_mean"] = float(np.mean(query_cosines))
+        result["query_cosine_min"] = float(np.min(query_cosines))
+        if policy_embeddings is not None:
+            policy_cosines = cosine(torch_policies, policy_embeddings)
+            result["policy_cosine_mean"] = float(np.mean(policy_cosines))
+            result["policy_cosine_min"] = float(np.min(policy_cosines))
+        result["speedup_p50"] = torch_p50 / result["p50_ms"] if result["p50_ms"] > 0 else None
+        report["onnx"].append(result)
+
+    return report
+
+
+def print_report(report):
+    mib = 1024 * 1024
+    torch_rss = report['torch']['rss_increase_mb']
+    print("=" * 92)
+    print(f"모델: {report['model_name']}, 쿼리: {report['queries']}, 정책 텍스트: {report['policy_texts']}")
+    print(f"torch: p50 {report['torch']['p50_ms']:.3f}ms, p95 {report['torch']['p95_ms']:.3f}ms"
+          + (f", RSS +{torch_rss:.0f}MiB" if torch_rss is not None else ""))
+    print("-" * 92)
+    print(f"{'onnx':>7} {'threads':>7} {'model MiB':>9} {'RSS MiB':>8} {'cos mean':>9} {'cos min':>8} "
+          f"{'policy min':>10} {'p50(ms)':>8} {'p95(ms)':>8} {'speedup':>8}")
+    for row in report['onnx']:
+        rss = f"{row['rss_increase_mb']:.0f}" if row['rss_increase_mb'] is not None else '-'
+        policy_min = f"{row['policy_cosine_min']:.4f}" if 'policy_cosine_min' in row else '-'
+        speedup = f"{row['speedup_p50']:.2f}x" if row['speedup_p50'] else '-'
+        print(f"{row['precision']:>7} {row['threads'] or 'auto':>7} {row['model_bytes'] / mib:>9.1f} {rss:>8} "
+              f"{row['query_cosine_mean']:>9.4f} {row['query_cosine_min']:>8.4f} {policy_min:>10} "
+              f"{row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {speedup:>8}")
+    print("=" * 92)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문장 인코더 백엔드 일치도/지연시간/메모리 리포트")
+    parser.add_argument('--model', default=MODEL_NAME, help="SentenceTransformer 모델명")
+    parser.add_argument('--model-dir', default=os.path.join('cache', 'onnx'), help="ONNX 모델 디렉토리 (onnx_encoder.py로 생성)")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로 (정책 텍스트 일치도 측정용)")
+    parser.add_argument('--policies', type=int, default=500, help="비교할 정책 텍스트 수")
+    parser.add_argument('--threads', default='0', help="비교할 ONNX intra-op 스레드 수 목록 (쉼표 구분, 0은 자동)")
+    parser.add_argument('--repeat', type=int, default=1, help="쿼리당 반복 측정 횟수")
+    parser.add_argument('--output', default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    if not onnx_model_exists(args.model_dir):
+        print(f"[ERROR] ONNX 모델이 없습니다: {args.model_dir} (python onnx_encoder.py --output {args.model_dir} --quantize)")
+        return
+
+    threads = [int(t) for t in args.threads.split(',') if t.strip()]
+    report = run_report(args.model, args.model_dir, args.csv, threads=threads,
+                        policy_limit=args.policies, repeat=args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+정책 텍스트 역색인 + BM25 어휘 검색
+한국어는 띄어쓰기/조사 변형이 많아 형태소 분석 대신 단어 경계를 포함한 음절 2-gram을 색인 단위로 사용
+('컴퓨터공학' -> ' 컴', '컴퓨', '퓨터', '터공', '공학', '학 ')
+- 로딩 시 한 번 만들고, 요청마다 쿼리 n-gram의 포스팅 리스트만 모아 점수 계산 (전체 정책을 훑지 않음)
+- 절반 이상의 정책에 나오는 n-gram('청년', '지원' 등)은 변별력이 없어 색인하지 않음
+- 배열 파일로 저장 후 memory-map으로 열어 공유 카탈로그 워커들이 함께 사용
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+NGRAM = 2
+MAX_DOC_FREQ = 0.5  # 이 비율보다 많은 정책에 나오는 n-gram은 제외
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+LEXICAL_TERMS_FILE = 'lexical_terms.json'
+LEXICAL_INDPTR_FILE = 'lexical_indptr.npy'
+LEXICAL_DOCS_FILE = 'lexical_docs.npy'
+LEXICAL_WEIGHTS_FILE = 'lexical_weights.npy'
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def char_ngrams(text, n=NGRAM):
+    """텍스트 -> 단어 경계 공백을 붙인 음절 n-gram 리스트 (문장부호 제거, 소문자)"""
+    grams = []
+    for word in _NON_WORD.sub(' ', str(text).lower()).split():
+        padded = f" {word} "
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def lexical_text(policy):
+    """정책 레코드 -> 색인 텍스트 (정책명/키워드는 두 번 넣어 가중치, 지원내용은 전체)"""
+    fields = [
+        policy.get('plcyNm', ''), policy.get('plcyNm', ''),
+        policy.get('keywords', ''), policy.get('keywords', ''),
+        policy.get('bscPlanPlcyWayNoNm', ''), policy.get('category_minor', ''),
+        policy.get('plcyExplnCn', ''), policy.get('support_content', '')
+    ]
+    return ' '.join(str(field) for field in fields if field and str(field) != 'nan')
+
+
+class LexicalIndex:
+    """
+    n-gram 역색인 (CSC 형식 포스팅 리스트에 BM25 가중치를 미리 계산해 저장)
+
+    Args:
+        terms: n-gram 리스트 (포스팅 리스트 순서)
+        indptr: n-gram별 포스팅 구간 (len = n-gram 수 + 1)
+        docs: 포스팅 정책 인덱스 (int32)
+        weights: 포스팅별 BM25 가중치 (float32)
+        size: 정책 수
+    """
+
+    def __init__(self, terms, indptr, docs, weights, size):
+        self.terms = list(terms)
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+        self.size = size
+
+    @classmethod
+    def build(cls, texts):
+        """정책 색인 텍스트 리스트 -> 역색인"""
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        size = len(texts)
+        if size == 0:
+            return cls([], np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), 0)
+
+        # 정책 수가 적으면 (MAX_DOC_FREQ 비율이 1개 미만) 빈도 제한 없이 색인
+        max_df = MAX_DOC_FREQ if size * MAX_DOC_FREQ >= 1 else 1.0
+        vectorizer = CountVectorizer(analyzer=char_ngrams, max_df=max_df, dtype=np.float32)
+        try:
+            counts = vectorizer.fit_transform(texts).tocsr()
+        except ValueError:
+            # 모든 n-gram이 빈도 제한에 걸리거나 텍스트가 비어 있음
+            return cls([], np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                       np.zeros(0, dtype=np.float32), size)
+        terms = vectorizer.get_feature_names_out().tolist()
+
+        # BM25: idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * 문서 길이 / 평균 길이))
+        doc_len = np.asarray(counts.sum(axis=1), dtype=np.float32).ravel()
+        avg_len = float(doc_len.mean()) or 1.0
+        doc_freq = np.bincount(counts.indices, minlength=len(terms)).astype(np.float32)
+        idf = np.log1p((size - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        rows = np.repeat(np.arange(size), np.diff(counts.indptr))
+        tf = counts.data
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[rows] / avg_len)
+        counts.data = (idf[counts.indices] * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+
+        postings = counts.tocsc()
+        postings.sort_indices()
+        return cls(
+            terms,
+            postings.indptr.astype(np.int64),
+            postings.indices.astype(np.int32),
+            postings.data.astype(np.float32),
+            size
+        )
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return int(self.indptr.nbytes + self.docs.nbytes + self.weights.nbytes)
+
+    def query_terms(self, query):
+        """쿼리 -> 색인에 있는 n-gram id (중복 제거)"""
+        ids = {self.term_ids.get(gram) for gram in char_ngrams(query)}
+        ids.discard(None)
+        return np.fromiter(sorted(ids), dtype=np.int64, count=len(ids))
+
+    def scores(self, query):
+        """쿼리 BM25 점수 (정책 수,) float32 - 쿼리 n-gram의 포스팅 리스트만 합산"""
+        term_ids = self.query_terms(query)
+        if self.size == 0 or len(term_ids) == 0:
+            return np.zeros(self.size, dtype=np.float32)
+        starts = self.indptr[term_ids]
+        ends = self.indptr[term_ids + 1]
+        docs = np.concatenate([self.docs[s:e] for s, e in zip(starts, ends)])
+        weights = np.concatenate([self.weights[s:e] for s, e in zip(starts, ends)])
+        return np.bincount(docs, weights=weights, minlength=self.size).astype(np.float32)
+
+    def save(self, directory):
+        with open(os.path.join(directory, LEXICAL_TERMS_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"size": self.size, "terms": self.terms}, f, ensure_ascii=False)
+        np.save(os.path.join(directory, LEXICAL_INDPTR_FILE), np.asarray(self.indptr, dtype=np.int64))
+        np.save(os.path.join(directory, LEXICAL_DOCS_FILE), np.asarray(self.docs, dtype=np.int32))
+        np.save(os.path.join(directory, LEXICAL_WEIGHTS_FILE), np.asarray(self.weights, dtype=np.float32))
+
+    @classmethod
+    def open(cls, directory):
+        """저장된 역색인 열기 (포스팅 배열은 읽기 전용 memory-map, 없으면 None)"""
+        terms_path = os.path.join(directory, LEXICAL_TERMS_FILE)
+        if not os.path.exists(terms_path):
+            return None
+        with open(terms_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(
+            meta['terms'],
+            np.load(os.path.join(directory, LEXICAL_INDPTR_FILE), mmap_mode='r'),
+            np.load(os.path.join(directory, LEXICAL_DOCS_FILE), mmap_mode='r'),
+            np.load(os.path.join(directory, LEXICAL_WEIGHTS_FILE), mmap_mode='r'),
+            meta['size']
+        )
@@ -6,54 +6,227 @@ BERT 기반 청년 정책 추천 API 서버
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 import uvicorn
 from datetime import datetime
+import base64
 import hashlib
 import json
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+from collections import Counter
 import os
+import sys
+import time
 from dotenv import load_dotenv
-from google import genai
-import httpx  # 백엔드 API 호출용
 
+from backend_client import BackendPolicyClient
+from cache_backends import RedisClient, create_cache
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, UPSTREAM_SECONDS, Gauge, record, trace
+from metrics import Counter as MetricCounter
+from shared_catalog import load_shared_catalog
+from single_flight import SingleFlight
+from summary_pregen import (
+    GEMINI_SUMMARY_MODEL, SummaryStore, all_segments, build_summary_prompt, persona_segment, policy_summary_fields, prompt_hash,
+    run_pregeneration, segment_user_info
+)
 from yuno_ai_system_clean import YunoAI
 
 # 환경 변수 로드
 load_dotenv()
 
+# 로그 레벨 (요청 경로 로그는 DEBUG, 느린 요청/타임아웃은 WARNING)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(
+    stream=sys.stdout,
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+)
+logger = logging.getLogger("yuno.api")
+# httpx는 요청마다 INFO 로그를 남기므로 백엔드 호출 로그는 경고 이상만
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# 이 시간(ms)보다 오래 걸린 요청은 구간별 시간과 함께 WARNING 로그 (0이면 끔)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
 # 전역 AI 모델 (서버 시작시 한번만 로딩)
 ai_model: Optional[YunoAI] = None
 
+# 백엔드 정책 API 클라이언트 (lifespan에서 생성, 연결 풀 재사용)
+backend_client: Optional[BackendPolicyClient] = None
+
+# 빠른 시작: 정책 카탈로그만 올리고 바로 요청을 받음 (BM25 어휘 검색으로 응답),
+# 문장 인코더/정책 임베딩과 Gemini 클라이언트는 백그라운드에서 준비 후 교체
+FAST_START = os.getenv("FAST_START", "false").lower() in ("1", "true", "yes")
+
+# AI 엔진 상태: starting(카탈로그 로딩 중) -> degraded(어휘 검색으로 응답, 인코더 준비 중) -> ready / failed
+engine_state = "starting"
+engine_error: Optional[str] = None
+# 카탈로그가 준비되면 설정 (재로딩 감시/협업 필터링/요약 사전 생성 작업은 이후 시작)
+catalog_ready = asyncio.Event()
+
+
+def create_gemini_client():
+    """Gemini 클라이언트 생성 (google.genai import에 1초 가까이 걸려 빠른 시작 모드에서는 백그라운드에서 호출)"""
+    from google import genai
+    client = genai.Client(api_key=GEMINI_API_KEY)
+    print("Gemini API configured successfully")
+    return client
+
+
 # Gemini 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    gemini_client = genai.Client(api_key=GEMINI_API_KEY)
-    print("Gemini API configured successfully")
-else:
-    gemini_client = None
+gemini_client = None
+if not GEMINI_API_KEY:
     print("WARNING: Gemini API key not found")
+elif not FAST_START:
+    gemini_client = create_gemini_client()
+
+# Gemini 호출 동시 실행 수 제한과 타임아웃(초, 제한 대기 시간 포함)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+# 같은 요약 캐시 키로 진행 중인 Gemini 호출 병합
+summary_flight = SingleFlight()
+summary_timeouts = 0
+
+summary_store: Optional[SummaryStore] = None
+# 세그먼트별 요약 요청 수 (사전 생성 시 요청이 많은 세그먼트부터)
+segment_requests = Counter()
+last_pregeneration: Optional[Dict[str, Any]] = None
 
 # 백엔드 API URL
 BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:3000")
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "10"))
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "20"))
+
+# 정책 임베딩 캐시 디렉토리 (docker-compose의 ai_cache 볼륨)
+AI_CACHE_DIR = os.getenv("AI_CACHE_DIR", "cache")
+
+# 후보 검색 백엔드 (exact: 전수 검색, ivf: 근사 검색)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "exact")
+IVF_N_LISTS = int(os.getenv("IVF_N_LISTS", "0")) or None
+IVF_N_PROBE = int(os.getenv("IVF_N_PROBE", "8"))
+
+# 정책 임베딩 저장 정밀도 (float32 / float16 / int8) 와 양자화 시 float32 재정렬 후보 수 (0이면 사용 안 함)
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "float32")
+EMBEDDING_RERANK_CANDIDATES = int(os.getenv("EMBEDDING_RERANK_CANDIDATES", "0"))
+
+# 어휘(BM25) 검색 (off / fallback: 임베딩이 없을 때만 / hybrid: 임베딩 유사도와 가중 합산) 과 hybrid BM25 가중치
+LEXICAL_MODE = os.getenv("LEXICAL_MODE", "fallback")
+LEXICAL_WEIGHT = float(os.getenv("LEXICAL_WEIGHT", "0.3"))
+
+# 문장 인코더 백엔드 (torch / onnx), ONNX 모델 디렉토리(없으면 시작 시 내보내기), 동적 int8 양자화, intra-op 스레드 수
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(AI_CACHE_DIR, "onnx"))
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "false").lower() in ("1", "true", "yes")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+
+# 사용자 쿼리 임베딩 LRU 캐시 크기 (프로필 문장 -> BERT 임베딩)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "4096"))
+
+# 멀티 워커 공유 카탈로그 (정책 테이블 + 임베딩 행렬을 파일로 만들어 모든 워커가 memory-map으로 공유)
+SHARED_CATALOG = os.getenv("SHARED_CATALOG", "false").lower() in ("1", "true", "yes")
+CATALOG_DIR = os.getenv("CATALOG_DIR", os.path.join(AI_CACHE_DIR, "catalog"))
+
+# 정책 CSV 경로와 자동 재로딩 주기(초, 0이면 사용 안 함 - 파일이 바뀌면 바뀐 정책만 다시 인코딩 후 교체)
+POLICY_CSV_PATH = os.getenv("POLICY_CSV_PATH", "real_policies_final.csv")
+POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", "0"))
+# 정책 CSV를 이 행 수씩 나눠 읽고 변환 (0이면 파일 전체를 한 번에, 10만 건 이상 대형 카탈로그용)
+POLICY_CSV_CHUNK_ROWS = int(os.getenv("POLICY_CSV_CHUNK_ROWS", "0"))
+
+# 요약 캐시 키를 페르소나 세그먼트(나이대 x 관심 분야)로 정규화 (false면 나이/전공/관심사 조합별 요약)
+SUMMARY_SEGMENTS = os.getenv("SUMMARY_SEGMENTS", "true").lower() in ("1", "true", "yes")
+# 세그먼트 요약 영속 저장소 (사전 생성 + 요청 시 생성 결과, 같은 노드의 워커 공유)
+SUMMARY_STORE_PATH = os.getenv("SUMMARY_STORE_PATH", os.path.join(AI_CACHE_DIR, "summaries.db"))
+# 조회수 상위 정책 요약 백그라운드 사전 생성 (분당 호출 예산, 회차 주기/시작 지연(초))
+SUMMARY_PREGEN_ENABLED = os.getenv("SUMMARY_PREGEN_ENABLED", "false").lower() in ("1", "true", "yes")
+SUMMARY_PREGEN_TOP_N = int(os.getenv("SUMMARY_PREGEN_TOP_N", "100"))
+SUMMARY_PREGEN_RPM = float(os.getenv("SUMMARY_PREGEN_RPM", "30"))
+SUMMARY_PREGEN_CONCURRENCY = int(os.getenv("SUMMARY_PREGEN_CONCURRENCY", "2"))
+SUMMARY_PREGEN_INTERVAL = float(os.getenv("SUMMARY_PREGEN_INTERVAL", "21600"))
+SUMMARY_PREGEN_DELAY = float(os.getenv("SUMMARY_PREGEN_DELAY", "60"))
+
+# 신청기간 필터 (한국 시간 오늘 기준 신청 시작 전/마감된 정책 제외, 자정에 자동 반영)
+# 와 마감 임박 보너스 (DEADLINE_BOOST_DAYS일 안에 마감되는 정책 점수 DEADLINE_BONUS배, 0이면 사용 안 함)
+APPLICATION_WINDOW_FILTER = os.getenv("APPLICATION_WINDOW_FILTER", "true").lower() in ("1", "true", "yes")
+DEADLINE_BOOST_DAYS = int(os.getenv("DEADLINE_BOOST_DAYS", "0"))
+DEADLINE_BONUS = float(os.getenv("DEADLINE_BONUS", "1.1"))
+
+# 협업 필터링 개인화 (북마크/조회/클릭 등 상호작용 JSONL을 주기적으로 이어 읽어 사용자/정책 요인 갱신)
+CF_ENABLED = os.getenv("CF_ENABLED", "false").lower() in ("1", "true", "yes")
+CF_EVENTS_PATH = os.getenv("CF_EVENTS_PATH", os.path.join(AI_CACHE_DIR, "interactions.jsonl"))
+CF_WEIGHT = float(os.getenv("CF_WEIGHT", "0.2"))
+CF_COMPONENTS = int(os.getenv("CF_COMPONENTS", "16"))
+CF_REFRESH_INTERVAL = float(os.getenv("CF_REFRESH_INTERVAL", "300"))
+CF_REFIT_EVENTS = int(os.getenv("CF_REFIT_EVENTS", "1000"))
 
 # 라이프사이클 관리
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """서버 시작/종료 처리"""
-    global ai_model
+    global backend_client, summary_store
+    reload_watcher = None
+    pregen_task = None
+    cf_task = None
+    engine_task = None
     # Startup
     print("=" * 70)
-    print("Yuno AI Server Starting...")
+    print("Yuno AI Server Starting..." + (" (fast start)" if FAST_START else ""))
     print("=" * 70)
 
     try:
-        ai_model = YunoAI()
-        ai_model.load_real_data('real_policies_final.csv')
-        print(f"BERT Model Loaded: {len(ai_model.policies_data)} policies")
-        print("Server Ready!")
+        model = YunoAI(
+            cache_dir=AI_CACHE_DIR,
+            retrieval=RETRIEVAL_BACKEND,
+            ivf_lists=IVF_N_LISTS,
+            ivf_probe=IVF_N_PROBE,
+            query_cache=query_embedding_cache,
+            embedding_precision=EMBEDDING_PRECISION,
+            rerank_candidates=EMBEDDING_RERANK_CANDIDATES,
+            encoder=ENCODER_BACKEND,
+            onnx_model_dir=ONNX_MODEL_DIR,
+            onnx_quantized=ONNX_QUANTIZE,
+            onnx_threads=ONNX_THREADS,
+            csv_chunk_rows=POLICY_CSV_CHUNK_ROWS,
+            lexical=LEXICAL_MODE,
+            lexical_weight=LEXICAL_WEIGHT,
+            cf_weight=CF_WEIGHT if CF_ENABLED else 0.0,
+            cf_components=CF_COMPONENTS,
+            cf_refit_events=CF_REFIT_EVENTS,
+            application_window=APPLICATION_WINDOW_FILTER,
+            deadline_boost_days=DEADLINE_BOOST_DAYS,
+            deadline_bonus=DEADLINE_BONUS,
+            load_encoder=not FAST_START
+        )
+        model.add_reload_listener(invalidate_policy_caches)
+        if FAST_START:
+            # 카탈로그/인코더 로딩을 기다리지 않고 바로 요청을 받음 (/health는 즉시, /ready는 카탈로그 준비 후 200)
+            engine_task = asyncio.create_task(load_engine(model))
+        else:
+            await load_engine(model)
+        backend_client = await BackendPolicyClient(
+            BACKEND_API_URL,
+            cache=backend_policy_cache,
+            timeout=BACKEND_TIMEOUT,
+            max_connections=BACKEND_MAX_CONNECTIONS
+        ).start()
+        if POLICY_RELOAD_INTERVAL > 0:
+            reload_watcher = asyncio.create_task(watch_policy_file())
+        if SUMMARY_SEGMENTS:
+            try:
+                summary_store = SummaryStore(SUMMARY_STORE_PATH)
+            except Exception as e:
+                logger.warning("Summary store unavailable (%s): %s", SUMMARY_STORE_PATH, e)
+        if SUMMARY_PREGEN_ENABLED and summary_store and GEMINI_API_KEY:
+            pregen_task = asyncio.create_task(pregenerate_summaries_periodically())
+        if CF_ENABLED:
+            cf_task = asyncio.create_task(refresh_collaborative_periodically())
+        print("Server Ready!" if not FAST_START else "Server accepting requests (AI engine loading in background)")
         print("=" * 70)
     except Exception as e:
         print(f"ERROR: Failed to load AI model - {e}")
@@ -65,6 +238,16 @@ async def lifespan(app: FastAPI):
     print("=" * 70)
     print("Yuno AI Server Shutting Down...")
     print("=" * 70)
+    if reload_watcher:
+        reload_watcher.cancel()
+    if pregen_task:
+        pregen_task.cancel()
+    if cf_task:
+        cf_task.cancel()
+    if engine_task:
+        engine_task.cancel()
+    if backend_client:
+        await backend_client.close()
 
 # FastAPI 앱 초기화
 app = FastAPI(
@@ -87,17 +270,110 @@ app.add_middleware(
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     body = await request.body()
-    print(f"Validation Error - Request body: {body.decode()}")
-    print(f"Validation errors: {exc.errors()}")
+    logger.warning("Validation error on %s - body: %s, errors: %s", request.url.path, body.decode(), exc.errors())
     return JSONResponse(
         status_code=422,
         content={"detail": exc.errors(), "body": body.decode()}
     )
 
-# 간단한 캐시 (메모리 기반)
-recommendation_cache: Dict[str, Any] = {}
-summary_cache: Dict[str, str] = {}
-MAX_CACHE_SIZE = 1000
+# 캐시 (LRU + TTL, 메모리 크기 제한)
+# 백엔드: memory(워커별), sqlite(같은 노드 워커 공유), redis(Redis 프로토콜 서버 공유)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(AI_CACHE_DIR, "shared_cache.db"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+RECOMMENDATION_CACHE_MAX_MB = float(os.getenv("RECOMMENDATION_CACHE_MAX_MB", "64"))
+RECOMMENDATION_CACHE_TTL = int(os.getenv("RECOMMENDATION_CACHE_TTL", "3600"))
+SUMMARY_CACHE_MAX_MB = float(os.getenv("SUMMARY_CACHE_MAX_MB", "64"))
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "86400"))
+# 프로필별 전체 후보 순위 (페이지 조회/다시 뽑기용, 정책 인덱스 int32 + 점수 float32)
+RANKING_CACHE_MAX_MB = float(os.getenv("RANKING_CACHE_MAX_MB", "32"))
+RANKING_CACHE_TTL = int(os.getenv("RANKING_CACHE_TTL", "1800"))
+# 다시 뽑기(shuffle) 시 후보로 쓰는 상위 순위 개수
+RANKING_SHUFFLE_POOL = int(os.getenv("RANKING_SHUFFLE_POOL", "30"))
+BACKEND_POLICY_CACHE_MAX_MB = float(os.getenv("BACKEND_POLICY_CACHE_MAX_MB", "16"))
+BACKEND_POLICY_CACHE_TTL = int(os.getenv("BACKEND_POLICY_CACHE_TTL", "600"))
+
+cache_options = {
+    "backend": CACHE_BACKEND,
+    "sqlite_path": CACHE_SQLITE_PATH,
+    "redis_client": RedisClient(CACHE_REDIS_URL) if CACHE_BACKEND == "redis" else None
+}
+recommendation_cache = create_cache(
+    'recommendations',
+    max_bytes=int(RECOMMENDATION_CACHE_MAX_MB * 1024 * 1024),
+    default_ttl=RECOMMENDATION_CACHE_TTL,
+    **cache_options
+)
+ranking_cache = create_cache(
+    'rankings',
+    max_bytes=int(RANKING_CACHE_MAX_MB * 1024 * 1024),
+    default_ttl=RANKING_CACHE_TTL,
+    **cache_options
+)
+summary_cache = create_cache(
+    'summaries',
+    max_bytes=int(SUMMARY_CACHE_MAX_MB * 1024 * 1024),
+    default_ttl=SUMMARY_CACHE_TTL,
+    **cache_options
+)
+backend_policy_cache = create_cache(
+    'backend_policies',
+    max_bytes=int(BACKEND_POLICY_CACHE_MAX_MB * 1024 * 1024),
+    default_ttl=BACKEND_POLICY_CACHE_TTL,
+    **cache_options
+)
+# 인코더마다 임베딩 값이 조금씩 다르므로 공유/영속 캐시에서 섞이지 않도록 이름 구분
+query_embedding_cache = create_cache(
+    'query_embeddings' if ENCODER_BACKEND == 'torch' else f"query_embeddings_onnx{'_int8' if ONNX_QUANTIZE else ''}",
+    max_entries=QUERY_CACHE_SIZE,
+    **cache_options
+)
+print(f"Cache backend: {CACHE_BACKEND}")
+
+
+def cache_metric_values(value):
+    """캐시별 메트릭 값 {(캐시 이름,): 값} (/metrics 출력 시 계산)"""
+    caches = (recommendation_cache, ranking_cache, summary_cache, backend_policy_cache, query_embedding_cache)
+    return {(cache.name,): value(cache) for cache in caches}
+
+
+CACHE_HIT_RATIO = Gauge(
+    'yuno_cache_hit_ratio', 'Cache hit ratio since process start', ['cache'],
+    callback=lambda: cache_metric_values(
+        lambda cache: cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0
+    )
+)
+CACHE_HITS = MetricCounter(
+    'yuno_cache_hits_total', 'Cache hits since process start', ['cache'],
+    callback=lambda: cache_metric_values(lambda cache: cache.hits)
+)
+CACHE_MISSES = MetricCounter(
+    'yuno_cache_misses_total', 'Cache misses since process start', ['cache'],
+    callback=lambda: cache_metric_values(lambda cache: cache.misses)
+)
+
+
+def finish_trace(request_trace, endpoint: str, cache: str, response: Response) -> Response:
+    """
+    요청 지연시간 기록 + Server-Timing 헤더, 느린 요청은 구간별 시간과 함께 로그
+    (response는 반환할 Response 또는 핸들러에 주입된 헤더 설정용 Response)
+    """
+    elapsed = request_trace.elapsed
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, cache=cache)
+    response.headers["Server-Timing"] = request_trace.server_timing()
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        logger.warning("Slow request %s (cache %s): %.1fms %s", endpoint, cache, elapsed * 1000, request_trace.as_dict())
+    return response
+
+# 일괄 추천 요청당 최대 프로필 수
+MAX_BATCH_PROFILES = 5000
+
+# 백엔드 정책 prefetch 요청당 최대 정책 수
+MAX_PREFETCH_POLICIES = 1000
+
+# 상호작용 이벤트 전송 요청당 최대 이벤트 수
+MAX_INTERACTION_EVENTS = 1000
 
 # Request/Response 모델
 class UserProfile(BaseModel):
@@ -148,12 +424,50 @@ class RecommendationResponse(BaseModel):
     data: List[Dict[str, Any]]  # 유연한 dict 타입 사용
     cached: bool = False
 
+class RecommendationPageResponse(RecommendationResponse):
+    """추천 페이지 (next_cursor로 다음 페이지/다시 뽑기 요청, 마지막 페이지면 null)"""
+    page: int
+    total_candidates: int
+    next_cursor: Optional[str] = None
+
+class RecommendationPageRequest(BaseModel):
+    """추천 페이지 요청 (첫 페이지는 cursor 없이, 다음 페이지/다시 뽑기는 이전 응답의 next_cursor)"""
+    profile: UserProfile
+    cursor: Optional[str] = Field(None, max_length=4096, description="이전 응답의 next_cursor")
+
+class BatchRecommendationRequest(BaseModel):
+    """일괄 추천 요청"""
+    profiles: List[UserProfile] = Field(..., min_length=1, max_length=MAX_BATCH_PROFILES, description="사용자 프로필 리스트")
+
+class BatchRecommendationResponse(BaseModel):
+    """일괄 추천 결과"""
+    success: bool
+    timestamp: str
+    total_users: int
+    results: List[RecommendationResponse]
+
+class PolicyPrefetchRequest(BaseModel):
+    """백엔드 정책 prefetch 요청"""
+    policy_ids: List[str] = Field(..., min_length=1, max_length=MAX_PREFETCH_POLICIES, description="정책 ID 리스트")
+
+class InteractionEvent(BaseModel):
+    """사용자-정책 상호작용 (backend interactions 테이블 행)"""
+    user_id: str = Field(..., description="사용자 ID")
+    policy_id: str = Field(..., description="정책 ID")
+    action: str = Field(..., description="행동 (view, click, share, bookmark, unbookmark, apply)")
+
+class InteractionBatchRequest(BaseModel):
+    """상호작용 이벤트 전송"""
+    events: List[InteractionEvent] = Field(..., min_length=1, max_length=MAX_INTERACTION_EVENTS, description="이벤트 리스트")
+
 class HealthResponse(BaseModel):
     """헬스 체크"""
     status: str
     model_loaded: bool
     total_policies: int
     timestamp: str
+    engine_state: Optional[str] = None
+    ranking_engine: Optional[str] = None
 
 class SummaryRequest(BaseModel):
     """정책 요약 요청"""
@@ -192,51 +506,220 @@ class SummaryResponse(BaseModel):
 
 
 # 유틸리티 함수
-def get_cache_key(user_profile: UserProfile, top_k: int) -> str:
-    """캐시 키 생성"""
-    profile_str = json.dumps({
+def get_cache_key(user_profile: UserProfile, top_k: int, catalog) -> str:
+    """캐시 키 생성 (카탈로그 지문 포함 - 다른 워커가 정책을 바꿔도 이전 순위의 추천 결과를 돌려주지 않음)"""
+    return profile_cache_key(user_profile, {
+        "top_k": top_k,
+        "catalog": catalog.fingerprint,
+        "format": "json"  # 캐시 값: {"total", "data": 직렬화된 추천 JSON 배열}
+    })
+
+
+def get_ranking_key(user_profile: UserProfile, catalog) -> str:
+    """전체 순위 캐시 키 (저장한 정책 인덱스가 유효한 카탈로그로 한정)"""
+    return profile_cache_key(user_profile, {"ranking": catalog.fingerprint})
+
+
+def profile_cache_key(user_profile: UserProfile, extra: Dict[str, Any]) -> str:
+    """프로필 캐시 키 (신청기간 필터 기준 날짜, 협업 필터링 요인이 있는 사용자는 사용자 ID + 요인 해시 포함)"""
+    key = {
         "age": user_profile.age,
         "major": user_profile.major,
         "interests": sorted(user_profile.interests),
         "location": user_profile.location,
-        "top_k": top_k
-    }, sort_keys=True)
+        **extra
+    }
+    # 신청기간 필터를 쓰면 날짜가 바뀔 때 새 키 (어제 캐시한 추천에 마감된 정책이 남지 않도록)
+    day = ai_model.ranking_day() if ai_model else None
+    if day is not None:
+        key["day"] = day
+    # 빠른 시작 중(어휘 검색) 결과가 임베딩 엔진 준비 후나 다른 워커와 공유 캐시에서 쓰이지 않도록 점수 방식 포함
+    engine = ai_model.ranking_engine() if ai_model else None
+    if engine not in (None, "embedding"):
+        key["engine"] = engine
+    personalization = ai_model.personalization_key(user_profile.user_id) if ai_model else None
+    if personalization:
+        key["user_id"] = user_profile.user_id
+        key["personalization"] = personalization
+    profile_str = json.dumps(key, sort_keys=True)
     return hashlib.md5(profile_str.encode()).hexdigest()
 
 
-def clean_cache():
-    """캐시 크기 제한"""
-    global recommendation_cache
-    if len(recommendation_cache) > MAX_CACHE_SIZE:
-        # 가장 오래된 항목 삭제 (FIFO)
-        keys_to_remove = list(recommendation_cache.keys())[:MAX_CACHE_SIZE // 2]
-        for key in keys_to_remove:
-            del recommendation_cache[key]
+def recommendation_json(user_id: str, timestamp: str, cached_result: Dict[str, Any], cached: bool) -> str:
+    """
+    RecommendationResponse 형식 JSON 본문
+    추천 정책 배열은 YunoAI가 직렬화한 JSON을 그대로 이어 붙임 (dict 변환/재검증 없음)
+    """
+    return (
+        f'{{"success":true,"user_id":{json.dumps(user_id, ensure_ascii=False)},'
+        f'"timestamp":{json.dumps(timestamp)},"total_recommendations":{cached_result["total"]},'
+        f'"data":{cached_result["data"]},"cached":{json.dumps(cached)}}}'
+    )
 
 
-async def fetch_policy_from_backend(policy_id: str) -> Optional[Dict[str, Any]]:
-    """백엔드 API에서 정책 정보 가져오기"""
+def recommendation_page_json(user_id: str, timestamp: str, result: Dict[str, Any], cached: bool,
+                             total_candidates: int, next_cursor: Optional[str]) -> str:
+    """recommendation_json + 페이지 정보 (page, total_candidates, next_cursor)"""
+    return (
+        f'{recommendation_json(user_id, timestamp, result, cached)[:-1]},'
+        f'"page":{result["page"]},"total_candidates":{total_candidates},"next_cursor":{json.dumps(next_cursor)}}}'
+    )
+
+
+def encode_cursor(ranking_key: str, offset: int = 0, seen: Optional[List[int]] = None) -> str:
+    """페이지 커서: 순위 키 + 다음 위치(더 보기) 또는 이미 보여준 순위 위치(다시 뽑기), URL-safe base64 JSON"""
+    payload = {"k": ranking_key, "o": offset}
+    if seen is not None:
+        payload["s"] = seen
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """페이지 커서 해석 (형식이 잘못되면 ValueError)"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{BACKEND_API_URL}/api/policies/{policy_id}")
-
-            if response.status_code == 200:
-                policy_data = response.json()
-                print(f"[INFO] Successfully fetched policy {policy_id} from backend")
-                print(f"[DEBUG] Backend response structure: {list(policy_data.keys()) if isinstance(policy_data, dict) else type(policy_data)}")
-                if isinstance(policy_data, dict) and 'data' in policy_data:
-                    print(f"[DEBUG] Policy data is nested under 'data' key")
-                    print(f"[DEBUG] Data keys: {list(policy_data['data'].keys())}")
-                return policy_data
-            elif response.status_code == 404:
-                print(f"[WARNING] Policy {policy_id} not found in backend")
-                return None
-            else:
-                print(f"[ERROR] Backend API returned status {response.status_code}")
-                return None
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if (not isinstance(payload, dict) or not isinstance(payload.get("k"), str)
+            or type(payload.get("o")) is not int or payload["o"] < 0
+            or not isinstance(payload.get("s", []), list)
+            or not all(type(p) is int and p >= 0 for p in payload.get("s", []))):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def to_user_dict(user_profile: UserProfile) -> Dict[str, Any]:
+    """API 요청 프로필 -> YunoAI 입력 형식"""
+    return {
+        "user_id": user_profile.user_id,
+        "age": user_profile.age,
+        "major": user_profile.major or "",
+        "interests": user_profile.interests,
+        "location": user_profile.location or ""
+    }
+
+
+def invalidate_policy_caches(changed_ids, ranking_changed=True):
+    """정책 데이터 재로딩 시 캐시 무효화 (YunoAI reload 콜백)"""
+    if not changed_ids:
+        return
+    # 정책 추가/순위 입력 변경은 카탈로그 지문이 바뀌어 추천/전체 순위 캐시가 자연히 빗나가므로
+    # 전체 삭제는 메모리 확보용. 표시 정보만 바뀌었거나 삭제된 경우는 지문이 그대로라
+    # 해당 정책이 포함된 추천 결과를 태그로 삭제. 요약은 바뀐 정책만 삭제
+    if ranking_changed:
+        removed_recommendations = recommendation_cache.clear()
+        ranking_cache.clear()
+    else:
+        removed_recommendations = sum(
+            recommendation_cache.invalidate_tag(f"policy:{policy_id}") for policy_id in changed_ids
+        )
+    removed_summaries = sum(summary_cache.invalidate_tag(f"policy:{policy_id}") for policy_id in changed_ids)
+    logger.info("Policy data changed (%d policies) - invalidated recommendations: %d, summaries: %d",
+                len(changed_ids), removed_recommendations, removed_summaries)
+
+
+def load_policy_catalog(model: Optional[YunoAI] = None) -> Optional[Dict[str, Any]]:
+    """정책 CSV 로딩/재로딩 (공유 카탈로그 모드면 워커 간 공유 카탈로그 사용), 변경 요약 반환"""
+    model = model or ai_model
+    if SHARED_CATALOG:
+        return load_shared_catalog(model, POLICY_CSV_PATH, CATALOG_DIR)
+    return model.load_real_data(POLICY_CSV_PATH)
+
+
+# 재로딩은 한 번에 하나만 (API 요청과 파일 감시가 겹치지 않도록)
+reload_lock = asyncio.Lock()
+
+
+async def reload_policies() -> Optional[Dict[str, Any]]:
+    """
+    정책 카탈로그 재로딩 - 새 카탈로그 생성(CSV 파싱, 바뀐 정책 인코딩, 인덱스 생성)은 별도 스레드에서 실행하고
+    완성된 카탈로그로 교체하므로 처리 중인 추천 요청을 막지 않음
+    """
+    async with reload_lock:
+        return await asyncio.to_thread(load_policy_catalog)
+
+
+async def load_engine(model: YunoAI):
+    """
+    AI 엔진 준비: 정책 카탈로그를 올리면 요청 처리 시작 (ai_model 설정)
+    빠른 시작이면 그 사이 추천은 BM25 어휘 검색으로 응답하고, 문장 인코더 로딩 후 같은 CSV를 다시 읽어
+    정책 임베딩(임베딩 캐시/공유 카탈로그가 있으면 인코딩 생략)을 준비한 카탈로그로 교체
+    """
+    global ai_model, gemini_client, engine_state, engine_error
+    try:
+        async with reload_lock:
+            await asyncio.to_thread(load_policy_catalog, model)
+        ai_model = model
+        catalog_ready.set()
+
+        if FAST_START:
+            engine_state = "degraded"
+            print(f"Serving {model.policy_count} policies with {model.ranking_engine()} ranking - loading encoder...")
+            if GEMINI_API_KEY and gemini_client is None:
+                gemini_client = await asyncio.to_thread(create_gemini_client)
+            if await asyncio.to_thread(model.load_encoder):
+                async with reload_lock:
+                    await asyncio.to_thread(load_policy_catalog, model)
+
+        engine_state = "ready"
+        print(f"BERT Model Loaded: {model.policy_count} policies ({model.ranking_engine()} ranking)")
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print(f"[ERROR] Failed to fetch policy from backend: {e}")
+        engine_state = "failed"
+        engine_error = str(e)
+        if not FAST_START:
+            raise
+        # 카탈로그가 이미 올라갔으면 어휘 검색으로 계속 응답
+        logger.error("Engine startup failed (%s): %s", "serving degraded" if ai_model else "no catalog", e)
+
+
+def policy_file_signature():
+    """정책 CSV 변경 감지용 (수정 시각, 크기)"""
+    try:
+        stat = os.stat(POLICY_CSV_PATH)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+async def watch_policy_file():
+    """POLICY_RELOAD_INTERVAL마다 정책 CSV를 확인해 바뀌었으면 재로딩 (워커마다 실행)"""
+    await catalog_ready.wait()
+    signature = policy_file_signature()
+    while True:
+        await asyncio.sleep(POLICY_RELOAD_INTERVAL)
+        current = policy_file_signature()
+        if current is None or current == signature:
+            continue
+        logger.info("Policy file changed - reloading %s", POLICY_CSV_PATH)
+        try:
+            summary = await reload_policies()
+            logger.info("Policy reload finished: %s", summary)
+            signature = current
+        except Exception as e:
+            logger.error("Policy reload failed: %s", e)
+
+
+async def refresh_collaborative_periodically():
+    """CF_REFRESH_INTERVAL마다 상호작용 JSONL의 새 줄을 읽고 협업 필터링 요인 갱신 (워커마다 실행)"""
+    await catalog_ready.wait()
+    while True:
+        try:
+            added, reset = await asyncio.to_thread(ai_model.user_item_matrix.ingest_file, CF_EVENTS_PATH)
+            refreshed = await asyncio.to_thread(ai_model.refresh_collaborative, reset)
+            if refreshed:
+                logger.info("Collaborative factors refreshed (%d new events): %s", added, refreshed)
+        except Exception as e:
+            logger.error("Collaborative refresh failed: %s", e)
+        await asyncio.sleep(CF_REFRESH_INTERVAL)
+
+
+async def fetch_policy_from_backend(policy_id: str) -> Optional[Dict[str, Any]]:
+    """백엔드 API에서 정책 정보 가져오기 (연결 풀 + TTL 캐시)"""
+    if not backend_client:
         return None
+    return await backend_client.get_policy(policy_id)
 
 
 # API 엔드포인트
@@ -250,17 +733,37 @@ async def root():
     }
 
 
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
-    """헬스 체크"""
+def engine_status() -> Dict[str, Any]:
     return {
-        "status": "healthy" if ai_model else "unhealthy",
+        "status": "healthy" if ai_model else ("unhealthy" if engine_state == "failed" else "starting"),
         "model_loaded": ai_model is not None,
-        "total_policies": len(ai_model.policies_data) if ai_model else 0,
-        "timestamp": datetime.now().isoformat()
+        "total_policies": ai_model.policy_count if ai_model else 0,
+        "timestamp": datetime.now().isoformat(),
+        "engine_state": engine_state,
+        "ranking_engine": ai_model.ranking_engine() if ai_model else None
     }
 
 
+@app.get("/health", response_model=HealthResponse, tags=["Health"])
+async def health_check():
+    """헬스 체크 (liveness: 프로세스가 응답하면 항상 200, 엔진 로딩 중에도 즉시 응답)"""
+    return engine_status()
+
+
+@app.get("/ready", response_model=HealthResponse, tags=["Health"])
+async def readiness_check(
+    full: bool = Query(False, description="true면 문장 인코더/정책 임베딩까지 준비된 경우에만 200")
+):
+    """
+    준비 상태 (readiness): 추천 요청을 처리할 수 있으면 200, 아니면 503
+    - 기본: 정책 카탈로그가 올라가면 200 (빠른 시작 중에는 BM25 어휘 검색으로 응답)
+    - **full=true**: 엔진 로딩이 끝나야 200
+    """
+    status = engine_status()
+    ready = ai_model is not None and (not full or engine_state == "ready")
+    return JSONResponse(status_code=200 if ready else 503, content=status)
+
+
 @app.post("/api/recommendations", response_model=RecommendationResponse, tags=["Recommendations"])
 async def get_recommendations(
     user_profile: UserProfile,
@@ -280,50 +783,170 @@ async def get_recommendations(
         raise HTTPException(status_code=503, detail="AI model not loaded")
 
     try:
-        # 캐시 확인
-        cache_key = get_cache_key(user_profile, top_k)
-        if cache_key in recommendation_cache:
-            cached_result = recommendation_cache[cache_key]
-            return RecommendationResponse(
-                success=True,
-                user_id=user_profile.user_id,
-                timestamp=datetime.now().isoformat(),
-                total_recommendations=len(cached_result),
-                data=cached_result,
-                cached=True
-            )
+        with trace('recommendations') as request_trace:
+            # 캐시 확인
+            catalog = ai_model.catalog
+            cache_key = get_cache_key(user_profile, top_k, catalog)
+            cached_result = recommendation_cache.get(cache_key)
+            if cached_result is not None:
+                return finish_trace(request_trace, 'recommendations', 'hit', Response(
+                    content=recommendation_json(user_profile.user_id, datetime.now().isoformat(), cached_result, True),
+                    media_type="application/json"
+                ))
+
+            # AI 추천 실행 (추천 정책은 직렬화된 JSON 배열로 받음)
+            user_dict = to_user_dict(user_profile)
+
+            result = ai_model.get_recommendations(user_dict, top_k=top_k, serialized=True)
+
+            if not result.get('success'):
+                raise HTTPException(
+                    status_code=500,
+                    detail=result.get('message', 'Recommendation failed')
+                )
 
-        # AI 추천 실행
-        user_dict = {
-            "user_id": user_profile.user_id,
-            "age": user_profile.age,
-            "major": user_profile.major or "",
-            "interests": user_profile.interests,
-            "location": user_profile.location or ""
-        }
+            recommendations = {"total": result['total'], "data": result['data']}
 
-        result = ai_model.get_recommendations(user_dict, top_k=top_k)
+            # 캐시 저장 (추천된 정책이 바뀌면 policy 태그로 무효화, 계산 중 카탈로그가 교체됐으면 저장하지 않음)
+            if ai_model.catalog is catalog:
+                recommendation_cache.set(cache_key, recommendations,
+                                         tags=[f"policy:{policy_id}" for policy_id in result['policy_ids']])
 
-        if not result.get('success'):
-            raise HTTPException(
-                status_code=500,
-                detail=result.get('message', 'Recommendation failed')
-            )
+            return finish_trace(request_trace, 'recommendations', 'miss', Response(
+                content=recommendation_json(user_profile.user_id, datetime.now().isoformat(), recommendations, False),
+                media_type="application/json"
+            ))
 
-        recommendations = result['data']
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
-        # 캐시 저장
-        recommendation_cache[cache_key] = recommendations
-        clean_cache()
 
-        return RecommendationResponse(
-            success=True,
-            user_id=user_profile.user_id,
-            timestamp=datetime.now().isoformat(),
-            total_recommendations=len(recommendations),
-            data=recommendations,
-            cached=False
-        )
+@app.post("/api/recommendations/page", response_model=RecommendationPageResponse, tags=["Recommendations"])
+async def get_recommendation_page(
+    request: RecommendationPageRequest,
+    page_size: int = Query(5, ge=1, le=20, description="페이지당 추천 개수 (1-20)"),
+    shuffle: bool = Query(False, description="상위 후보에서 이전에 보여준 정책을 빼고 다시 뽑기")
+):
+    """
+    저장된 전체 후보 순위에서 페이지 조회 / 다시 뽑기
+
+    - 첫 요청(순위 캐시 만료, 순위에 영향을 주는 정책 변경 후 포함)만 인코딩/점수 계산을 하고
+      자격 조건을 만족하는 후보 전체 순위를 RANKING_CACHE_TTL 동안 저장
+    - **shuffle=false**: 순위 순서대로 page_size개씩 ("더 보기"), 마지막 페이지면 next_cursor가 null
+    - **shuffle=true**: 상위 RANKING_SHUFFLE_POOL개 중 이전에 보여준 정책을 빼고 무작위 page_size개 ("새로고침")
+    - 프로필이 바뀌면 이전 커서는 무시하고 처음부터
+    """
+    if not ai_model:
+        raise HTTPException(status_code=503, detail="AI model not loaded")
+    try:
+        cursor = decode_cursor(request.cursor) if request.cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        with trace('recommendations_page') as request_trace:
+            profile = request.profile
+            catalog = ai_model.catalog
+            ranking_key = get_ranking_key(profile, catalog)
+            if cursor and cursor["k"] != ranking_key:
+                cursor = None
+
+            ranking = ranking_cache.get(ranking_key)
+            cached = ranking is not None
+            if not cached:
+                indices, scores = ai_model.rank_all(to_user_dict(profile), catalog)
+                ranking = {"indices": indices, "scores": scores}
+                ranking_cache.set(ranking_key, ranking)
+            total_candidates = len(ranking["indices"])
+
+            if shuffle:
+                previous = cursor.get("s", []) if cursor else []
+                result, positions = ai_model.ranked_sample(
+                    ranking["indices"], ranking["scores"], page_size, exclude=previous,
+                    pool=RANKING_SHUFFLE_POOL, serialized=True, catalog=catalog
+                )
+                # 남은 후보가 부족해 처음부터 다시 뽑았으면 이번에 뽑은 위치만 기억
+                seen = positions if set(positions) & set(previous) else previous + positions
+                next_cursor = encode_cursor(ranking_key, seen=seen) if total_candidates else None
+            else:
+                offset = cursor["o"] if cursor else 0
+                result = ai_model.ranked_page(
+                    ranking["indices"], ranking["scores"], offset, page_size, serialized=True, catalog=catalog
+                )
+                next_offset = offset + page_size
+                next_cursor = encode_cursor(ranking_key, next_offset) if next_offset < total_candidates else None
+
+            return finish_trace(request_trace, 'recommendations_page', 'hit' if cached else 'miss', Response(
+                content=recommendation_page_json(
+                    profile.user_id, datetime.now().isoformat(), result, cached, total_candidates, next_cursor
+                ),
+                media_type="application/json"
+            ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
+@app.post("/api/recommendations/batch", response_model=BatchRecommendationResponse, tags=["Recommendations"])
+async def get_recommendations_batch(
+    request: BatchRecommendationRequest,
+    top_k: int = Query(5, ge=1, le=20, description="사용자별 추천 개수 (1-20)")
+):
+    """
+    여러 사용자 프로필 일괄 추천 (홈 피드 사전 계산용)
+
+    - **profiles**: 사용자 프로필 리스트 (최대 5000개)
+    - **top_k**: 사용자별 추천 개수 (기본 5개)
+
+    캐시에 없는 프로필만 한 번의 배치로 인코딩/점수 계산하며, 사용자별 결과는 /api/recommendations와 같은 형식
+    """
+    if not ai_model:
+        raise HTTPException(status_code=503, detail="AI model not loaded")
+
+    try:
+        with trace('recommendations_batch') as request_trace:
+            timestamp = datetime.now().isoformat()
+            results: List[Optional[str]] = [None] * len(request.profiles)
+
+            # 캐시 확인 (캐시에 없는 프로필만 모아서 추천)
+            catalog = ai_model.catalog
+            missing = []
+            for i, user_profile in enumerate(request.profiles):
+                cache_key = get_cache_key(user_profile, top_k, catalog)
+                cached_result = recommendation_cache.get(cache_key)
+                if cached_result is not None:
+                    results[i] = recommendation_json(user_profile.user_id, timestamp, cached_result, True)
+                else:
+                    missing.append((i, cache_key))
+
+            if missing:
+                batch_results = ai_model.get_recommendations_batch(
+                    [to_user_dict(request.profiles[i]) for i, _ in missing],
+                    top_k=top_k,
+                    serialized=True
+                )
+
+                for (i, cache_key), result in zip(missing, batch_results):
+                    recommendations = {"total": result['total'], "data": result['data']}
+                    if ai_model.catalog is catalog:
+                        recommendation_cache.set(cache_key, recommendations,
+                                                 tags=[f"policy:{policy_id}" for policy_id in result['policy_ids']])
+                    results[i] = recommendation_json(request.profiles[i].user_id, timestamp, recommendations, False)
+
+            # BatchRecommendationResponse 형식 (사용자별 응답 JSON을 그대로 이어 붙임)
+            # 캐시 결과: 전부 적중 hit, 전부 계산 miss, 섞이면 partial
+            cache = 'miss' if len(missing) == len(results) else 'partial' if missing else 'hit'
+            return finish_trace(request_trace, 'recommendations_batch', cache, Response(
+                content=(
+                    f'{{"success":true,"timestamp":{json.dumps(timestamp)},"total_users":{len(results)},'
+                    f'"results":[{",".join(results)}]}}'
+                ),
+                media_type="application/json"
+            ))
 
     except HTTPException:
         raise
@@ -331,8 +954,73 @@ async def get_recommendations(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+async def call_gemini(prompt: str, policy_id: Optional[str] = None) -> str:
+    """Gemini 요약 호출 (동시 호출 수 제한 + 타임아웃, 요청 시 생성과 사전 생성이 함께 사용)"""
+    global summary_timeouts
+
+    async def generate():
+        async with gemini_semaphore:
+            return await gemini_client.aio.models.generate_content(
+                model=GEMINI_SUMMARY_MODEL,
+                contents=prompt
+            )
+
+    start = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(generate(), timeout=GEMINI_TIMEOUT)
+    except asyncio.TimeoutError:
+        summary_timeouts += 1
+        record(UPSTREAM_SECONDS, 'gemini', time.perf_counter() - start, upstream='gemini', outcome='timeout')
+        logger.warning("Gemini summary timed out after %ss (policy %s)", GEMINI_TIMEOUT, policy_id)
+        raise
+    except Exception:
+        record(UPSTREAM_SECONDS, 'gemini', time.perf_counter() - start, upstream='gemini', outcome='error')
+        raise
+    record(UPSTREAM_SECONDS, 'gemini', time.perf_counter() - start, upstream='gemini', outcome='ok')
+    return response.text.strip()
+
+
+async def generate_summary(cache_key: str, prompt: str, policy_id: str, segment: Optional[str] = None) -> str:
+    """Gemini 요약 생성 후 캐시 저장 (세그먼트 요약은 영속 저장소에도 저장)"""
+    summary_text = await call_gemini(prompt, policy_id)
+
+    # 캐시 저장 (정책이 바뀌면 policy 태그로 무효화)
+    summary_cache.set(cache_key, summary_text, tags=[f"policy:{policy_id}"])
+    if segment and summary_store:
+        summary_store.put(policy_id, segment, prompt_hash(prompt), summary_text)
+    return summary_text
+
+
+async def pregenerate_summaries_periodically():
+    """
+    SUMMARY_PREGEN_INTERVAL마다 조회수 상위 정책 x 세그먼트 요약 사전 생성
+    (잠금을 잡은 워커 하나만 실행, 이미 같은 프롬프트로 만든 요약은 건너뛰므로 바뀐 정책만 다시 생성)
+    """
+    global last_pregeneration
+    await catalog_ready.wait()
+    await asyncio.sleep(SUMMARY_PREGEN_DELAY)
+    while True:
+        try:
+            table = ai_model.catalog.policy_table
+            policies = await asyncio.to_thread(lambda: [table.record(i) for i in range(len(table))])
+            # 요청이 많은 세그먼트부터 (요청이 없으면 기본 순서)
+            segments = sorted(all_segments(), key=lambda segment: -segment_requests[segment])
+            stats = await run_pregeneration(
+                policies, summary_store, call_gemini,
+                segments=segments,
+                top_n=SUMMARY_PREGEN_TOP_N,
+                rate_per_minute=SUMMARY_PREGEN_RPM,
+                concurrency=SUMMARY_PREGEN_CONCURRENCY
+            )
+            if stats is not None:
+                last_pregeneration = {**stats, "finished_at": datetime.now().isoformat()}
+        except Exception as e:
+            logger.error("Summary pregeneration failed: %s", e)
+        await asyncio.sleep(SUMMARY_PREGEN_INTERVAL)
+
+
 @app.post("/api/summary", response_model=SummaryResponse, tags=["AI Summary"])
-async def get_policy_summary(request: SummaryRequest):
+async def get_policy_summary(request: SummaryRequest, response: Response):
     """
     정책 상세 AI 요약 (Gemini API 사용)
 
@@ -345,131 +1033,136 @@ async def get_policy_summary(request: SummaryRequest):
         raise HTTPException(status_code=503, detail="AI model not loaded")
 
     try:
-        # 캐시 키 생성
-        cache_key = f"{request.policy_id}_{request.user_age}_{request.user_major}_{'_'.join(request.user_interests or [])}"
-
-        # 캐시 확인
-        if cache_key in summary_cache:
-            # 캐시된 제목 가져오기 (CSV 또는 요청 데이터)
-            policy_df = ai_model.policies_data[ai_model.policies_data['id'] == request.policy_id]
-            if not policy_df.empty:
-                policy_title = policy_df.iloc[0]['plcyNm']
+        with trace('summary') as request_trace:
+            # 캐시 키 생성 (세그먼트 모드면 나이대 x 관심 분야로 정규화)
+            segment = None
+            if SUMMARY_SEGMENTS:
+                segment = persona_segment(request.user_age, request.user_interests)
+                segment_requests[segment] += 1
+                cache_key = f"{request.policy_id}_{segment}"
+            else:
+                cache_key = f"{request.policy_id}_{request.user_age}_{request.user_major}_{'_'.join(request.user_interests or [])}"
+
+            # 캐시 확인
+            cached_summary = summary_cache.get(cache_key)
+            if cached_summary is not None:
+                # 캐시된 제목 가져오기 (CSV 또는 요청 데이터)
+                policy = ai_model.get_policy(request.policy_id)
+                if policy is not None:
+                    policy_title = policy['plcyNm']
+                else:
+                    policy_title = request.policy_title or "정책"
+
+                finish_trace(request_trace, 'summary', 'hit', response)
+                return SummaryResponse(
+                    success=True,
+                    policy_id=request.policy_id,
+                    policy_title=policy_title,
+                    summary=cached_summary,
+                    timestamp=datetime.now().isoformat(),
+                    cached=True
+                )
+
+            # 정책 정보 조회 (CSV 우선, 없으면 백엔드 API 호출)
+            policy = ai_model.get_policy(request.policy_id)
+
+            if policy is not None:
+                # CSV에 정책이 있는 경우
+                fields = policy_summary_fields(policy)
             else:
-                policy_title = request.policy_title or "정책"
+                # CSV에 없는 경우 백엔드 API에서 가져오기
+                backend_policy = await fetch_policy_from_backend(request.policy_id)
+
+                if backend_policy:
+                    # 백엔드 응답에서 'data' 키 추출 (백엔드는 {success, message, data} 형식으로 응답)
+                    policy_data = backend_policy.get('data', backend_policy)
+
+                    # 백엔드에서 정책을 찾은 경우
+                    fields = {
+                        "title": policy_data.get('plcyNm', '정책'),
+                        "description": policy_data.get('plcyExplnCn', '정보 없음'),
+                        "category": policy_data.get('bscPlanPlcyWayNoNm', '정보 없음'),
+                        "support_content": policy_data.get('plcySprtCn', '정보 없음')
+                    }
+                    logger.debug("Using backend API data for policy ID: %s", request.policy_id)
+                elif request.policy_title:
+                    # 백엔드에도 없지만 요청 데이터가 있는 경우
+                    fields = {
+                        "title": request.policy_title,
+                        "description": request.policy_description or "정보 없음",
+                        "category": request.policy_category or "정보 없음",
+                        "support_content": request.support_content or "정보 없음"
+                    }
+                    logger.debug("Using request data for policy ID: %s", request.policy_id)
+                else:
+                    # 모든 곳에서 정책을 찾지 못한 경우
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Policy {request.policy_id} not found in CSV, backend, or request data"
+                    )
+            policy_title = fields["title"]
+
+            # Gemini 프롬프트 생성 (세그먼트 모드면 세그먼트 대표 페르소나 정보)
+            if segment:
+                user_info = segment_user_info(segment)
+            else:
+                user_info = ""
+                if request.user_age:
+                    user_info += f"나이: {request.user_age}세\n"
+                if request.user_major:
+                    user_info += f"전공: {request.user_major}\n"
+                if request.user_interests:
+                    user_info += f"관심사: {', '.join(request.user_interests)}\n"
+            prompt = build_summary_prompt(fields, user_info)
+
+            # 영속 저장소 확인 (사전 생성했거나 다른 워커/이전 실행에서 같은 프롬프트로 만든 요약)
+            if segment and summary_store:
+                stored_summary = summary_store.get(request.policy_id, segment, prompt_hash(prompt))
+                if stored_summary is not None:
+                    summary_cache.set(cache_key, stored_summary, tags=[f"policy:{request.policy_id}"])
+                    finish_trace(request_trace, 'summary', 'store', response)
+                    return SummaryResponse(
+                        success=True,
+                        policy_id=request.policy_id,
+                        policy_title=policy_title,
+                        summary=stored_summary,
+                        timestamp=datetime.now().isoformat(),
+                        cached=True
+                    )
+
+            # Gemini API 호출 (비동기, 같은 키로 진행 중인 호출이 있으면 결과 공유)
+            try:
+                summary_text = await summary_flight.do(
+                    cache_key,
+                    lambda: generate_summary(cache_key, prompt, request.policy_id, segment)
+                )
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=504, detail="Summary generation timed out")
 
+            finish_trace(request_trace, 'summary', 'miss', response)
             return SummaryResponse(
                 success=True,
                 policy_id=request.policy_id,
                 policy_title=policy_title,
-                summary=summary_cache[cache_key],
+                summary=summary_text,
                 timestamp=datetime.now().isoformat(),
-                cached=True
+                cached=False
             )
 
-        # 정책 정보 조회 (CSV 우선, 없으면 백엔드 API 호출)
-        policy_df = ai_model.policies_data[ai_model.policies_data['id'] == request.policy_id]
-
-        if not policy_df.empty:
-            # CSV에 정책이 있는 경우
-            policy = policy_df.iloc[0]
-            policy_title = policy['plcyNm']
-            policy_description = policy['plcyExplnCn']
-            policy_category = policy['bscPlanPlcyWayNoNm']
-            support_content = policy.get('support_content', '정보 없음')
-        else:
-            # CSV에 없는 경우 백엔드 API에서 가져오기
-            backend_policy = await fetch_policy_from_backend(request.policy_id)
-
-            if backend_policy:
-                # 백엔드 응답에서 'data' 키 추출 (백엔드는 {success, message, data} 형식으로 응답)
-                policy_data = backend_policy.get('data', backend_policy)
-
-                # 백엔드에서 정책을 찾은 경우
-                policy_title = policy_data.get('plcyNm', '정책')
-                policy_description = policy_data.get('plcyExplnCn', '정보 없음')
-                policy_category = policy_data.get('bscPlanPlcyWayNoNm', '정보 없음')
-                support_content = policy_data.get('plcySprtCn', '정보 없음')
-                print(f"[DEBUG] Policy data - Title: {policy_title}, Category: {policy_category}")
-                print(f"[DEBUG] Description length: {len(policy_description)}, Support content length: {len(support_content)}")
-                print(f"[INFO] Using backend API data for policy ID: {request.policy_id}")
-            elif request.policy_title:
-                # 백엔드에도 없지만 요청 데이터가 있는 경우
-                policy_title = request.policy_title
-                policy_description = request.policy_description or "정보 없음"
-                policy_category = request.policy_category or "정보 없음"
-                support_content = request.support_content or "정보 없음"
-                print(f"[INFO] Using request data for policy ID: {request.policy_id}")
-            else:
-                # 모든 곳에서 정책을 찾지 못한 경우
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Policy {request.policy_id} not found in CSV, backend, or request data"
-                )
-
-        # Gemini 프롬프트 생성
-        user_info = ""
-        if request.user_age:
-            user_info += f"나이: {request.user_age}세\n"
-        if request.user_major:
-            user_info += f"전공: {request.user_major}\n"
-        if request.user_interests:
-            user_info += f"관심사: {', '.join(request.user_interests)}\n"
-
-        user_info_section = f"사용자 정보:\n{user_info}" if user_info else ""
-
-        prompt = f"""당신은 청년 정책 전문가입니다. 아래 정책을 청년이 쉽게 이해할 수 있도록 친근하고 자연스럽게 요약해주세요.
-
-정책 정보:
-- 제목: {policy_title}
-- 설명: {policy_description}
-- 카테고리: {policy_category}
-- 지원 내용: {support_content}
-
-{user_info_section}
-
-3-4문장으로 다음을 포함해 요약하세요:
-1. 어떤 지원을 받을 수 있는지
-2. 신청 자격이 어떻게 되는지
-3. 사용자 정보가 있다면 이 사용자에게 어떤 도움이 될지
-
-주의: 메타 정보(##, 예시 등) 없이 바로 본론으로 시작하고, 이모지는 사용하지 마세요."""
-
-        # Gemini API 호출 (새 SDK)
-        response = gemini_client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt
-        )
-        summary_text = response.text.strip()
-
-        # 캐시 저장
-        summary_cache[cache_key] = summary_text
-
-        return SummaryResponse(
-            success=True,
-            policy_id=request.policy_id,
-            policy_title=policy_title,
-            summary=summary_text,
-            timestamp=datetime.now().isoformat(),
-            cached=False
-        )
-
     except HTTPException:
         raise
     except Exception as e:
         import traceback
         error_detail = f"Summary generation failed: {str(e)}\n{traceback.format_exc()}"
-        print(f"[ERROR] {error_detail}")
+        logger.error(error_detail)
         raise HTTPException(status_code=500, detail=error_detail)
 
 
 @app.delete("/api/cache", tags=["Admin"])
 async def clear_cache():
     """캐시 초기화 (관리자용)"""
-    global recommendation_cache, summary_cache
-    rec_cache_size = len(recommendation_cache)
-    sum_cache_size = len(summary_cache)
-    recommendation_cache = {}
-    summary_cache = {}
+    rec_cache_size = recommendation_cache.clear()
+    sum_cache_size = summary_cache.clear()
     return {
         "success": True,
         "message": f"Cache cleared (recommendations: {rec_cache_size}, summaries: {sum_cache_size})",
@@ -477,16 +1170,109 @@ async def clear_cache():
     }
 
 
+@app.post("/api/policies/reload", tags=["Admin"])
+async def reload_policy_catalog():
+    """
+    정책 CSV 재로딩 (관리자/백엔드 정책 동기화 후 호출)
+
+    바뀐 정책만 다시 인코딩하고 새 카탈로그로 교체하며, 바뀐 정책과 관련된 캐시만 무효화
+    멀티 워커에서는 요청을 받은 워커만 재로딩되므로 POLICY_RELOAD_INTERVAL 파일 감시 모드를 함께 사용
+    """
+    if not ai_model:
+        raise HTTPException(status_code=503, detail="AI model not loaded")
+
+    summary = await reload_policies()
+    if summary is None:
+        raise HTTPException(status_code=500, detail=f"Failed to read {POLICY_CSV_PATH} - keeping current catalogue")
+
+    return {
+        "success": True,
+        "reload": summary,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.post("/api/backend-policies/prefetch", tags=["Admin"])
+async def prefetch_backend_policies(request: PolicyPrefetchRequest):
+    """
+    CSV에 없는 백엔드 정책을 미리 가져와 캐시 (요약 요청 시 백엔드 왕복 생략)
+    """
+    if not backend_client:
+        raise HTTPException(status_code=503, detail="Backend client not ready")
+
+    # CSV에 있는 정책은 백엔드 조회가 필요 없음
+    policy_ids = [policy_id for policy_id in request.policy_ids
+                  if not ai_model or not ai_model.has_policy(policy_id)]
+    fetched = await backend_client.prefetch(policy_ids)
+    return {
+        "success": True,
+        "requested": len(request.policy_ids),
+        "fetched": fetched,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.post("/api/interactions", tags=["Admin"])
+async def add_interactions(request: InteractionBatchRequest):
+    """
+    사용자-정책 상호작용 이벤트 전송 (백엔드 북마크/조회 기록 직후 호출)
+
+    이벤트를 보낸 사용자만 바로 fold-in 하므로 다음 추천부터 반영
+    멀티 워커에서는 요청을 받은 워커에만 반영되므로 CF_EVENTS_PATH 파일 내보내기를 함께 사용
+    """
+    if not ai_model:
+        raise HTTPException(status_code=503, detail="AI model not loaded")
+    if not CF_ENABLED:
+        raise HTTPException(status_code=409, detail="Collaborative filtering is disabled (CF_ENABLED=false)")
+
+    accepted = ai_model.add_interactions([event.model_dump() for event in request.events])
+    refreshed = await asyncio.to_thread(ai_model.refresh_collaborative)
+    return {
+        "success": True,
+        "accepted": accepted,
+        "refresh": refreshed,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/metrics", tags=["Admin"])
+async def get_metrics():
+    """Prometheus 메트릭 (단계별/외부 호출/엔드포인트 지연시간 히스토그램, 캐시 적중률)"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/stats", tags=["Admin"])
 async def get_stats():
     """서버 통계"""
     return {
         "model_loaded": ai_model is not None,
         "gemini_configured": gemini_client is not None,
-        "total_policies": len(ai_model.policies_data) if ai_model else 0,
+        "total_policies": ai_model.policy_count if ai_model else 0,
+        "encoder": ai_model.encoder_id if ai_model else None,
+        "engine_state": engine_state,
+        "engine_error": engine_error,
+        "ranking_engine": ai_model.ranking_engine() if ai_model else None,
         "recommendation_cache_size": len(recommendation_cache),
         "summary_cache_size": len(summary_cache),
-        "max_cache_size": MAX_CACHE_SIZE,
+        "caches": {
+            "recommendations": recommendation_cache.stats(),
+            "rankings": ranking_cache.stats(),
+            "summaries": summary_cache.stats(),
+            "query_embeddings": query_embedding_cache.stats()
+        },
+        "backend_client": backend_client.stats() if backend_client else None,
+        "last_reload": ai_model.last_reload if ai_model else None,
+        "summary_generation": {
+            **summary_flight.stats(),
+            "max_concurrency": GEMINI_MAX_CONCURRENCY,
+            "timeouts": summary_timeouts,
+            "segments": SUMMARY_SEGMENTS,
+            "segment_requests": dict(segment_requests.most_common(10)),
+            "store": summary_store.stats() if summary_store else None,
+            "last_pregeneration": last_pregeneration
+        },
+        "application_window": ai_model.application_window_stats() if ai_model else None,
+        "collaborative": ai_model.collaborative_stats() if ai_model else None,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -0,0 +1,281 @@
+"""
+단계별 지연시간 계측 + Prometheus 텍스트 형식 메트릭
+- Histogram/Counter/Gauge: 프로세스 내 누적 (prometheus_client 의존성 없이 텍스트 형식 0.0.4로 출력)
+- span: 구간 시간을 히스토그램에 기록하고, 요청 추적(trace) 중이면 구간별 시간도 함께 수집
+  (응답의 Server-Timing 헤더, 느린 요청 로그에 사용)
+워커가 여러 개면 메트릭은 워커별로 집계됨 (Prometheus에서 워커별로 수집하거나 합산)
+"""
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연시간 히스토그램 버킷(초): 0.5ms ~ 30s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    """
+    callback이 있으면 출력할 때마다 호출해 {레이블 값 튜플: 값}을 받음
+    (캐시 적중 수처럼 다른 객체가 이미 세고 있는 값을 그대로 노출)
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._values = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        if self.callback is not None:
+            try:
+                values = {tuple(str(v) for v in key): value for key, value in self.callback().items()}
+            except Exception:
+                values = {}
+            with self._lock:
+                self._values = values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.extend(self._render_sample(labelvalues, value))
+        return lines
+
+    def _render_sample(self, labelvalues, value):
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (callback이면 다른 객체의 누적 값, 이름은 _total로 끝나게)"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """현재 값 게이지 (callback이면 캐시 적중률 등 다른 객체의 상태)"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (_bucket/_sum/_count)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 버킷별 개수 (+Inf 포함), 합계, 개수
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """{"count", "sum"} (테스트/통계용)"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return {"count": state[2], "sum": state[1]} if state else {"count": 0, "sum": 0.0}
+
+    def _render_sample(self, labelvalues, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def unregister(self, name):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self):
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+# ---------------------------------------------------------------------------
+# 요청 추적 (구간별 시간 수집)
+# ---------------------------------------------------------------------------
+
+_current_trace = contextvars.ContextVar('yuno_trace', default=None)
+
+
+class Trace:
+    """한 요청의 구간별 소요 시간 (같은 이름 구간은 합산)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = {}
+
+    def add(self, span_name, seconds):
+        self.spans[span_name] = self.spans.get(span_name, 0.0) + seconds
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (ms)"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()]
+        parts.append(f"total;dur={self.elapsed * 1000:.2f}")
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+
+@contextmanager
+def trace(name):
+    """요청 추적 시작 (with 블록 안의 span이 이 추적에 기록됨)"""
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(histogram, name, **labels):
+    """
+    구간 시간 측정: histogram에 기록하고 진행 중인 요청 추적에도 추가
+
+    Args:
+        histogram: 기록할 히스토그램 (None이면 추적에만 기록)
+        name: 구간 이름 (추적/Server-Timing용)
+        labels: 히스토그램 레이블
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(histogram, name, time.perf_counter() - start, **labels)
+
+
+def record(histogram, name, seconds, **labels):
+    """이미 측정한 구간 시간 기록 (결과에 따라 레이블이 달라지는 외부 호출 등)"""
+    if histogram is not None:
+        histogram.observe(seconds, **labels)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(name, seconds)
+
+
+# ---------------------------------------------------------------------------
+# 공통 메트릭
+# ---------------------------------------------------------------------------
+
+RECOMMENDATION_STAGE_SECONDS = Histogram(
+    'yuno_recommendation_stage_seconds',
+    'Recommendation pipeline stage latency (encode, filter, score, serialize)',
+    ['stage']
+)
+UPSTREAM_SECONDS = Histogram(
+    'yuno_upstream_seconds',
+    'Upstream call latency (gemini, backend)',
+    ['upstream', 'outcome']
+)
+REQUEST_SECONDS = Histogram(
+    'yuno_request_seconds',
+    'API handler latency by endpoint and cache result',
+    ['endpoint', 'cache']
+)
+
+
+def stage(name):
+    """추천 파이프라인 단계 구간 (yuno_recommendation_stage_seconds{stage=name})"""
+    return span(RECOMMENDATION_STAGE_SECONDS, name, stage=name)
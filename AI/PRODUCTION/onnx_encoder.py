@@ -0,0 +1,274 @@
+"""
+ONNX Runtime 문장 인코더
+sentence-transformers 모델을 ONNX 그래프로 내보내고 onnxruntime으로 실행 (SentenceTransformer.encode 대체)
+- 서빙 시 torch를 import하지 않음 (tokenizers + onnxruntime만 사용)
+- 선택적으로 동적 int8 양자화 모델 사용 (가중치 int8, 활성값은 실행 시 양자화)
+- intra-op 스레드 수 설정 (워커 수 x 스레드 수가 CPU 코어 수를 넘지 않도록)
+
+내보내기 (torch/sentence-transformers가 설치된 환경에서 1회, 서버 시작 시 모델이 없으면 자동 실행):
+    python onnx_encoder.py --output cache/onnx --quantize
+"""
+
+import argparse
+import inspect
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 (잠금 없이 동작)
+    fcntl = None
+
+ONNX_MODEL_FILE = 'model.onnx'
+ONNX_QUANTIZED_MODEL_FILE = 'model_int8.onnx'
+TOKENIZER_FILE = 'tokenizer.json'
+ENCODER_CONFIG_FILE = 'encoder_config.json'
+
+ONNX_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime 문장 인코더 (SentenceTransformer.encode와 같은 출력: 토큰 임베딩 pooling, float32)
+
+    Args:
+        model_dir: export_onnx로 내보낸 디렉토리
+        quantized: True면 동적 int8 양자화 모델 사용
+        threads: intra-op 스레드 수 (0이면 onnxruntime 기본값 = 물리 코어 수)
+        batch_size: 인코딩 배치 크기
+    """
+
+    def __init__(self, model_dir, quantized=False, threads=0, batch_size=32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ENCODER_CONFIG_FILE), encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.batch_size = batch_size
+        self.pooling = self.config.get('pooling', 'mean')
+        self.normalize = self.config.get('normalize', False)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config['max_seq_length'])
+        self.tokenizer.no_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # 요청당 짧은 문장 하나라 연산자 간 병렬화 이득이 없음
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=['CPUExecutionProvider']
+        )
+        self._input_names = [inp.name for inp in self.session.get_inputs()]
+
+    def encode(self, sentences, show_progress_bar=False, batch_size=None):
+        """
+        문장 리스트 -> (n, dim) float32 임베딩 (문자열 하나면 (dim,))
+        길이순으로 묶어 배치별로 필요한 만큼만 패딩
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        if len(sentences) == 0:
+            return np.zeros((0, self.config.get('dimension', 0)), dtype=np.float32)
+
+        batch_size = batch_size or self.batch_size
+        encodings = self.tokenizer.encode_batch(list(sentences))
+        order = np.argsort([-len(encoding.ids) for encoding in encodings], kind='stable')
+
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(order), batch_size):
+            batch = [encodings[i] for i in order[start:start + batch_size]]
+            for i, embedding in zip(order[start:start + batch_size], self._run(batch)):
+                embeddings[i] = embedding
+
+        embeddings = np.stack(embeddings).astype(np.float32, copy=False)
+        return embeddings[0] if single else embeddings
+
+    def _run(self, encodings):
+        length = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.full((len(encodings), length), self.config.get('pad_token_id', 0), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, :len(encoding.ids)] = encoding.ids
+            attention_mask[row, :len(encoding.ids)] = 1
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask,
+                 'token_type_ids': np.zeros_like(input_ids)}
+        token_embeddings = self.session.run(None, {name: feeds[name] for name in self._input_names})[0]
+
+        if self.pooling == 'cls':
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.maximum(norms, 1e-12)
+        return pooled
+
+
+def onnx_model_exists(model_dir, quantized=False):
+    model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+    return all(
+        os.path.exists(os.path.join(model_dir, name))
+        for name in (model_file, TOKENIZER_FILE, ENCODER_CONFIG_FILE)
+    )
+
+
+def export_onnx(model_name, output_dir, quantize=False, opset=14):
+    """
+    sentence-transformers 모델 -> ONNX 그래프 + tokenizer.json + 인코더 설정 (torch 필요)
+
+    Args:
+        model_name: SentenceTransformer 모델명 또는 경로
+        output_dir: 저장 디렉토리 (임시 디렉토리에 쓴 뒤 원자적으로 교체)
+        quantize: True면 동적 int8 양자화 모델(model_int8.onnx)도 생성
+    """
+    import shutil
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    print(f"ONNX 인코더 내보내는 중: {model_name} -> {output_dir}")
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    auto_model = transformer.auto_model.eval()
+
+    pooling = 'mean'
+    normalize = False
+    for module in list(model)[1:]:
+        if hasattr(module, 'get_pooling_mode_str'):
+            pooling = module.get_pooling_mode_str()
+        elif type(module).__name__ == 'Normalize':
+            normalize = True
+    if pooling not in ('mean', 'cls'):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling}")
+
+    sample = tokenizer(['청년 정책을 찾고 있습니다.'], return_tensors='pt')
+    forward_params = inspect.signature(auto_model.forward).parameters
+    input_names = [name for name in ONNX_INPUT_NAMES if name in sample and name in forward_params]
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs)))[0]
+
+    tmp_dir = f"{output_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # dynamic_axes를 쓰는 TorchScript 기반 내보내기
+        export_kwargs['dynamo'] = False
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['token_embeddings'] = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(auto_model),
+            tuple(sample[name] for name in input_names),
+            os.path.join(tmp_dir, ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=['token_embeddings'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+            **export_kwargs
+        )
+
+    tokenizer.backend_tokenizer.save(os.path.join(tmp_dir, TOKENIZER_FILE))
+    config = {
+        "model_name": model_name,
+        "max_seq_length": int(transformer.max_seq_length),
+        "dimension": int(model.get_sentence_embedding_dimension()),
+        "pooling": pooling,
+        "normalize": normalize,
+        "pad_token_id": int(tokenizer.pad_token_id or 0),
+        "input_names": input_names
+    }
+    with open(os.path.join(tmp_dir, ENCODER_CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            os.path.join(tmp_dir, ONNX_MODEL_FILE),
+            os.path.join(tmp_dir, ONNX_QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    print(f"ONNX 인코더 내보내기 완료: {output_dir}")
+    return output_dir
+
+
+@contextmanager
+def _export_lock(model_dir):
+    """내보내기/로딩용 프로세스 간 배타 잠금 (<model_dir>.lock, fcntl.flock)"""
+    parent = os.path.dirname(os.path.abspath(model_dir))
+    os.makedirs(parent, exist_ok=True)
+    with open(f"{os.path.abspath(model_dir)}.lock", 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _exported_model_name(model_dir, quantized):
+    """내보낸 모델명 (모델 파일이 없으면 None)"""
+    if not onnx_model_exists(model_dir, quantized):
+        return None
+    with open(os.path.join(model_dir, ENCODER_CONFIG_FILE), encoding='utf-8') as f:
+        return json.load(f).get('model_name')
+
+
+def load_onnx_encoder(model_name, model_dir, quantized=False, threads=0):
+    """
+    ONNX 인코더 로딩 (모델 파일이 없거나 다른 모델에서 내보낸 파일이면 먼저 내보내기)
+    여러 워커가 동시에 시작해도 한 워커만 내보내고, 나머지는 잠금을 기다린 뒤 내보낸 파일을 로딩
+    (다른 워커가 로딩 중인 디렉토리를 지우거나 교체하지 않도록 로딩까지 잠금 안에서)
+    """
+    with _export_lock(model_dir):
+        if _exported_model_name(model_dir, quantized) != model_name:
+            export_onnx(model_name, model_dir, quantize=quantized)
+        return OnnxSentenceEncoder(model_dir, quantized=quantized, threads=threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sentence-transformers 모델 ONNX 내보내기")
+    parser.add_argument('--model', default='paraphrase-multilingual-MiniLM-L12-v2', help="SentenceTransformer 모델명")
+    parser.add_argument('--output', default=os.path.join('cache', 'onnx'), help="저장 디렉토리")
+    parser.add_argument('--quantize', action='store_true', help="동적 int8 양자화 모델도 생성")
+    parser.add_argument('--opset', type=int, default=14, help="ONNX opset 버전")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with _export_lock(args.output):
+        export_onnx(args.model, args.output, quantize=args.quantize, opset=args.opset)
+    print(f"소요 시간: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+정책 CSV 수집 (열 단위 벡터화)
+온통청년 CSV -> 팀 백엔드 API 형식 정책 레코드 + 나이 조건 + 임베딩 입력 텍스트
+행마다 파이썬 루프를 돌지 않고 pandas 문자열 연산/NumPy로 열 전체를 한 번에 변환하며,
+큰 파일은 chunk_rows 행씩 나눠 읽어 원본 DataFrame 전체를 메모리에 올리지 않음
+"""
+
+import numpy as np
+import pandas as pd
+
+# 변환에 쓰는 열 (나머지 열은 읽지 않음)
+TEXT_COLUMNS = (
+    'id', 'title', 'category_major', 'category_minor', 'description', 'support_content', 'keywords',
+    'application_period', 'reference_url', 'supervisor', 'qualification'
+)
+NUMERIC_COLUMNS = ('age_min', 'age_max', 'view_count')
+POLICY_CSV_COLUMNS = TEXT_COLUMNS + NUMERIC_COLUMNS
+
+QUALIFICATION_CHARS = 50  # 요건에 넣는 자격 조건 앞부분 길이
+SUPPORT_TEXT_CHARS = 200  # 임베딩 텍스트에 넣는 지원내용 앞부분 길이
+DEFAULT_REQUIREMENTS = ("청년 대상",)
+
+
+def read_policy_csv(csv_path, chunk_rows=0):
+    """
+    정책 CSV -> DataFrame 청크 이터레이터 (chunk_rows가 0이면 파일 전체를 한 청크로)
+    텍스트 열은 문자열로 읽어 청크마다 타입 추론이 달라지지 않도록 함 (빈 칸은 NaN)
+    """
+    options = dict(
+        encoding='utf-8-sig',
+        usecols=lambda column: column in POLICY_CSV_COLUMNS,
+        dtype={column: str for column in TEXT_COLUMNS}
+    )
+    if chunk_rows and chunk_rows > 0:
+        yield from pd.read_csv(csv_path, chunksize=chunk_rows, **options)
+    else:
+        yield pd.read_csv(csv_path, **options)
+
+
+def _text(df, column, default=''):
+    """열 -> 문자열 Series (결측은 'nan', 열이 없으면 default)"""
+    if column not in df:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].astype(str)
+
+
+def _numeric(df, column):
+    """열 -> float64 Series (숫자가 아니거나 열이 없으면 NaN)"""
+    if column not in df:
+        return pd.Series(np.nan, index=df.index, dtype=np.float64)
+    return pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+
+
+def _where(mask, values):
+    """mask가 False인 자리는 None인 object 배열 (Series.where는 None을 NaN으로 바꿀 수 있음)"""
+    return np.where(np.asarray(mask, dtype=bool), np.asarray(values, dtype=object), None)
+
+
+def _ymd(part):
+    """날짜 문자열 -> YYYYMMDD ('.', '-' 제거 후 앞 8자가 숫자 8자리가 아니면 None)"""
+    digits = part.str.strip().str.replace('.', '', regex=False).str.replace('-', '', regex=False).str[:8]
+    return _where(digits.str.isdigit() & (digits.str.len() == 8), digits)
+
+
+def _application_period(period):
+    """
+    신청기간 '시작 ~ 종료' -> (신청기간 구분, 시작일, 종료일)
+    '~'가 정확히 하나인 행만 날짜를 파싱 (대부분 비어 있으므로 해당 행만 문자열 연산)
+    """
+    se_cd = np.where(period.str.contains('상시', regex=False), '상시', '기간').astype(object)
+    start = np.full(len(period), None, dtype=object)
+    end = np.full(len(period), None, dtype=object)
+
+    single_range = (period.str.count('~') == 1).to_numpy()
+    if single_range.any():
+        parts = period[single_range].str.partition('~')
+        start[single_range] = _ymd(parts[0])
+        end[single_range] = _ymd(parts[2])
+    return se_cd, start, end
+
+
+def _requirements(age_min, age_max, qualification):
+    """정책별 요건 리스트: 나이 조건 + 자격 조건 앞부분 (둘 다 없으면 '청년 대상')"""
+    has_age = (age_min.notna() & age_max.notna()).to_numpy()
+    age_text = np.full(len(age_min), None, dtype=object)
+    if has_age.any():
+        age_text[has_age] = (
+            "만 " + np.trunc(age_min[has_age]).astype(np.int64).astype(str)
+            + "세~" + np.trunc(age_max[has_age]).astype(np.int64).astype(str) + "세"
+        ).to_numpy()
+
+    qualification = qualification.astype(str).where(qualification.notna(), '')
+    qual_text = _where(qualification.str.strip() != '', qualification.str[:QUALIFICATION_CHARS])
+
+    return [
+        [text for text in pair if text is not None] or list(DEFAULT_REQUIREMENTS)
+        for pair in zip(age_text.tolist(), qual_text.tolist())
+    ]
+
+
+def _embedding_texts(columns):
+    """
+    정책 임베딩 텍스트: 빈 값/'nan'을 뺀 나머지를 공백으로 연결 (YunoAI._policy_text와 같은 결과)
+    포함되는 조각마다 앞에 공백을 붙여 이어 붙인 뒤 맨 앞 공백만 제거
+    """
+    joined = None
+    for column in columns:
+        piece = (' ' + column).where((column != '') & (column != 'nan'), '')
+        joined = piece if joined is None else joined + piece
+    return joined.str[1:].tolist()
+
+
+def convert_policy_frame(df):
+    """
+    정책 DataFrame -> (팀 백엔드 API 형식 정책 리스트, (n, 2) 나이 조건 배열, 임베딩 텍스트 리스트)
+    나이 조건이 없으면 NaN
+    """
+    title = _text(df, 'title')
+    category_major = _text(df, 'category_major')
+    category_minor = _text(df, 'category_minor')
+    description = _text(df, 'description')
+    support_content = _text(df, 'support_content')
+    keywords = _text(df, 'keywords')
+
+    age_min = _numeric(df, 'age_min')
+    age_max = _numeric(df, 'age_max')
+    qualification = df['qualification'] if 'qualification' in df else pd.Series(np.nan, index=df.index, dtype=object)
+    se_cd, start, end = _application_period(_text(df, 'application_period'))
+    saves = _numeric(df, 'view_count').fillna(0)
+
+    columns = {
+        "id": df['id'].astype(str).tolist(),
+        "plcyNm": title.tolist(),
+        "bscPlanPlcyWayNoNm": category_major.tolist(),
+        "plcyExplnCn": description.tolist(),
+        "rgtrupInstCdNm": _text(df, 'supervisor', '전국').tolist(),
+        "aplyPrdSeCd": se_cd.tolist(),
+        "aplyPrdEndYmd": end.tolist(),
+        "bizPrdBgngYmd": start.tolist(),
+        "bizPrdEndYmd": end.tolist(),
+        "applicationUrl": _text(df, 'reference_url').tolist(),
+        "requirements": _requirements(age_min, age_max, qualification),
+        "saves": np.trunc(saves.to_numpy()).astype(np.int64).tolist(),
+        "isBookmarked": [False] * len(df),
+        # 추가 정보 (검색에 활용)
+        "support_content": support_content.tolist(),
+        "keywords": keywords.tolist(),
+        "category_minor": category_minor.tolist()
+    }
+    keys = list(columns)
+    policies = [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+    age_bounds = np.column_stack([age_min.to_numpy(), age_max.to_numpy()]).reshape(-1, 2)
+    policy_texts = _embedding_texts([
+        title, description, category_major, category_minor, support_content.str[:SUPPORT_TEXT_CHARS], keywords
+    ])
+    return policies, age_bounds, policy_texts
+
+
+def load_policy_csv(csv_path, chunk_rows=0):
+    """
+    정책 CSV 전체 변환 (chunk_rows > 0이면 청크 단위로 읽고 변환해 이어 붙임)
+
+    Returns:
+        (정책 리스트, (n, 2) 나이 조건 배열, 임베딩 텍스트 리스트)
+    """
+    policies, age_bounds, policy_texts = [], [], []
+    for chunk in read_policy_csv(csv_path, chunk_rows):
+        chunk_policies, chunk_bounds, chunk_texts = convert_policy_frame(chunk)
+        policies.extend(chunk_policies)
+        age_bounds.append(chunk_bounds)
+        policy_texts.extend(chunk_texts)
+    age_bounds = np.concatenate(age_bounds) if age_bounds else np.zeros((0, 2))
+    return policies, age_bounds, policy_texts
@@ -0,0 +1,94 @@
+"""
+정책 레코드 테이블
+정책별 JSON 레코드를 하나의 바이트 블롭 + 오프셋 배열로 보관 (파일로 저장 후 memory-map 가능)
+레코드는 로딩 시 한 번만 직렬화하고, API 응답은 직렬화된 레코드를 그대로 이어 붙여 생성
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+RECORDS_FILE = 'records.bin'
+OFFSETS_FILE = 'offsets.npy'
+
+
+def serialize_record(record):
+    """정책 레코드 -> 압축 JSON 바이트 (레코드 필드 순서 유지)"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class PolicyTable:
+    """
+    JSON 직렬화 정책 레코드 테이블
+
+    Args:
+        blob: 레코드 JSON을 이어 붙인 바이트 (bytes 또는 np.memmap)
+        offsets: 레코드 경계 (len = 정책 수 + 1)
+    """
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_records(cls, records):
+        chunks = [serialize_record(record) for record in records]
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        if chunks:
+            np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        return cls(b''.join(chunks), offsets)
+
+    @classmethod
+    def open(cls, directory):
+        """저장된 테이블을 읽기 전용 memory-map으로 열기"""
+        offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode='r')
+        records_path = os.path.join(directory, RECORDS_FILE)
+        if os.path.getsize(records_path) > 0:
+            blob = np.memmap(records_path, dtype=np.uint8, mode='r')
+        else:
+            blob = b''
+        return cls(blob, offsets)
+
+    def save(self, directory):
+        with open(os.path.join(directory, RECORDS_FILE), 'wb') as f:
+            f.write(bytes(self._blob))
+        with open(os.path.join(directory, OFFSETS_FILE), 'wb') as f:
+            np.save(f, self._offsets)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def record_bytes(self, idx):
+        """직렬화된 레코드 JSON 바이트"""
+        return bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]])
+
+    def record(self, idx):
+        """정책 레코드 dict (호출할 때마다 새 객체)"""
+        return json.loads(self.record_bytes(idx))
+
+    def records_json(self, indices, field, values):
+        """
+        레코드 JSON 배열 바이트 - 각 레코드 끝에 field 값만 추가해 이어 붙임 (역직렬화 없음)
+
+        Args:
+            indices: 레코드 인덱스 리스트
+            field: 추가할 필드명 (예: recommendationScore)
+            values: 레코드별 추가 값 (JSON 직렬화 가능)
+        """
+        key = json.dumps(field).encode('utf-8') + b':'
+        parts = []
+        for idx, value in zip(indices, values):
+            record = self.record_bytes(idx)
+            separator = b'' if record == b'{}' else b','
+            parts.append(record[:-1] + separator + key + json.dumps(value).encode('utf-8') + b'}')
+        return b'[' + b','.join(parts) + b']'
+
+    def records(self):
+        for idx in range(len(self)):
+            yield self.record(idx)
+
+    def content_hash(self, idx):
+        """레코드 내용 해시 (정책 변경 감지용)"""
+        return hashlib.sha1(self.record_bytes(idx)).hexdigest()
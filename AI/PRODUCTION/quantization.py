@@ -0,0 +1,142 @@
+"""
+정책 임베딩 양자화
+정규화된 float32 임베딩을 float16 또는 int8(벡터별 스케일)로 저장해 메모리를 줄이고,
+양자화된 형태 그대로 청크 단위로 float32 변환 후 내적을 계산 (전체 float32 복사본을 만들지 않음)
+"""
+
+import numpy as np
+
+EMBEDDING_PRECISIONS = ('float32', 'float16', 'int8')
+
+# 내적 계산 시 한 번에 float32로 변환할 행 수 (임시 메모리 = 행 수 x 차원 x 4바이트)
+DOT_CHUNK_ROWS = 8192
+
+
+class QuantizedEmbeddings:
+    """
+    양자화된 정규화 임베딩 행렬
+
+    Args:
+        data: (n, dim) float16 또는 int8 배열 (np.memmap 가능)
+        scales: int8일 때 벡터별 스케일 (n,) float32 - 원래 값 = data * scale
+    """
+
+    def __init__(self, data, scales=None):
+        self.data = data
+        self.scales = scales
+
+    @classmethod
+    def from_float32(cls, embeddings, precision):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if precision == 'float16':
+            return cls(embeddings.astype(np.float16))
+        if precision == 'int8':
+            # 벡터별 대칭 스케일: 절댓값 최대 성분이 127
+            scales = np.abs(embeddings).max(axis=1) / 127.0 if len(embeddings) else np.zeros(0)
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            data = np.clip(np.rint(embeddings / scales[:, None]), -127, 127).astype(np.int8)
+            return cls(data, scales)
+        raise ValueError(f"Unknown embedding precision: {precision} (choose from {EMBEDDING_PRECISIONS})")
+
+    @property
+    def precision(self):
+        return 'int8' if self.data.dtype == np.int8 else 'float16'
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self):
+        return self.data.ndim
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self):
+        return len(self.data)
+
+    def rows(self, indices=None):
+        """float32로 복원한 행 (indices가 None이면 전체)"""
+        data = self.data if indices is None else self.data[indices]
+        rows = np.asarray(data, dtype=np.float32)
+        if self.scales is not None:
+            scales = self.scales if indices is None else self.scales[indices]
+            rows *= np.asarray(scales, dtype=np.float32)[:, None]
+        return rows
+
+    def dot(self, queries, indices=None):
+        """
+        양자화된 행렬과 쿼리 내적
+
+        Args:
+            queries: (dim,) 쿼리 벡터 또는 (m, dim) 쿼리 행렬
+            indices: 계산할 행 (None이면 전체)
+
+        Returns:
+            (k,) 또는 (k, m) float32 - k는 계산한 행 수
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        data = self.data if indices is None else self.data[indices]
+        scales = None
+        if self.scales is not None:
+            scales = self.scales if indices is None else self.scales[indices]
+
+        out = np.empty((len(data),) + queries.shape[:-1][::-1], dtype=np.float32)
+        transposed = queries.T
+        for start in range(0, len(data), DOT_CHUNK_ROWS):
+            end = min(start + DOT_CHUNK_ROWS, len(data))
+            chunk = np.asarray(data[start:end], dtype=np.float32) @ transposed
+            if scales is not None:
+                chunk *= np.asarray(scales[start:end], dtype=np.float32).reshape((-1,) + (1,) * (chunk.ndim - 1))
+            out[start:end] = chunk
+        return out
+
+    def save(self, data_path, scales_path=None):
+        np.save(data_path, np.ascontiguousarray(self.data))
+        if self.scales is not None and scales_path:
+            np.save(scales_path, np.ascontiguousarray(self.scales, dtype=np.float32))
+
+    @classmethod
+    def open(cls, data_path, scales_path=None):
+        """저장된 양자화 행렬을 읽기 전용 memory-map으로 열기"""
+        data = np.load(data_path, mmap_mode='r')
+        scales = np.load(scales_path, mmap_mode='r') if data.dtype == np.int8 else None
+        return cls(data, scales)
+
+
+def quantize_embeddings(embeddings, precision='float32'):
+    """정규화된 float32 임베딩 -> 지정한 정밀도의 점수 계산용 행렬 (float32는 그대로)"""
+    if precision not in EMBEDDING_PRECISIONS:
+        raise ValueError(f"Unknown embedding precision: {precision} (choose from {EMBEDDING_PRECISIONS})")
+    if precision == 'float32' or embeddings is None:
+        return embeddings
+    return QuantizedEmbeddings.from_float32(embeddings, precision)
+
+
+def embedding_nbytes(embeddings):
+    return 0 if embeddings is None else int(embeddings.nbytes)
+
+
+def as_float32(embeddings):
+    """float32 배열로 변환 (양자화 행렬은 복원)"""
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return embeddings.rows()
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def similarities(embeddings, query, indices=None):
+    """임베딩 행렬(float32 또는 양자화)과 쿼리의 내적 (indices가 None이면 전체 행)"""
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return embeddings.dot(query, indices)
+    if indices is None:
+        return embeddings @ query
+    return embeddings[indices] @ query
+
+
+def batch_similarities(embeddings, queries):
+    """(m, dim) 쿼리 행렬 -> (m, n) 유사도 행렬"""
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return embeddings.dot(queries).T
+    return queries @ embeddings.T
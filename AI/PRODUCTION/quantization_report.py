@@ -0,0 +1,131 @@
+"""
+정책 임베딩 양자화 리포트
+float32 상위 10개 후보를 기준으로 float16/int8 저장 시 메모리 절감량, 상위 10개 일치율, 지연시간 비교
+(재정렬 후보 수별로 float32 재정렬 효과도 함께 측정)
+
+사용법:
+    python quantization_report.py
+    python quantization_report.py --precisions float16,int8 --rerank 0,20,50 --output quantization_report.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from quantization import embedding_nbytes, quantize_embeddings
+from retrieval_report import build_profiles, percentile_ms
+from yuno_ai_system_clean import YunoAI, CANDIDATE_COUNT
+
+
+def run_report(ai, precisions=('float16', 'int8'), reranks=(0, 50), repeat=3):
+    profiles = build_profiles()
+    queries = [(profile, ai._encode_query(ai._build_user_query(profile))) for profile in profiles]
+
+    base = ai.catalog
+    float_embeddings = np.asarray(base.normalized_embeddings, dtype=np.float32)
+
+    def measure(catalog, rerank_candidates):
+        ai.rerank_candidates = rerank_candidates
+        results, latencies = [], []
+        for profile, query in queries:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                indices, _ = ai._rank_candidates(profile, query, catalog=catalog)
+                latencies.append(time.perf_counter() - start)
+            results.append(set(indices.tolist()))
+        return results, latencies
+
+    baseline_results, baseline_latencies = measure(base, 0)
+    baseline_bytes = embedding_nbytes(float_embeddings)
+
+    report = {
+        "catalogue_size": int(len(float_embeddings)),
+        "dimension": int(float_embeddings.shape[1]) if float_embeddings.ndim == 2 else 0,
+        "queries": len(queries),
+        "candidate_count": CANDIDATE_COUNT,
+        "float32": {
+            "bytes": baseline_bytes,
+            "p50_ms": percentile_ms(baseline_latencies, 50),
+            "p95_ms": percentile_ms(baseline_latencies, 95)
+        },
+        "quantized": []
+    }
+
+    for precision in precisions:
+        quantized = quantize_embeddings(float_embeddings, precision)
+        catalog = ai._build_catalog(
+            base.policy_table, base.policy_ids, base.category_codes, base.category_names,
+            base.region_codes, base.region_names, base.age_bounds, None, quantized, base.ranking_hashes,
+            float_embeddings, application_windows=base.application_windows
+        )
+        quantized_bytes = embedding_nbytes(quantized)
+
+        for rerank_candidates in reranks:
+            results, latencies = measure(catalog, rerank_candidates)
+            overlaps = [
+                len(expected & found) / len(expected) if expected else 1.0
+                for expected, found in zip(baseline_results, results)
+            ]
+            report["quantized"].append({
+                "precision": precision,
+                "rerank_candidates": rerank_candidates,
+                "bytes": quantized_bytes,
+                "memory_saved": 1 - quantized_bytes / baseline_bytes if baseline_bytes else 0.0,
+                "overlap_at_10": float(np.mean(overlaps)),
+                "min_overlap_at_10": float(np.min(overlaps)),
+                "exact_match": float(np.mean([expected == found for expected, found in zip(baseline_results, results)])),
+                "p50_ms": percentile_ms(latencies, 50),
+                "p95_ms": percentile_ms(latencies, 95)
+            })
+
+    ai.rerank_candidates = 0
+    return report
+
+
+def print_report(report):
+    mib = 1024 * 1024
+    print("=" * 78)
+    print(f"정책 수: {report['catalogue_size']}, 차원: {report['dimension']}, 쿼리: {report['queries']}")
+    print(f"float32: {report['float32']['bytes'] / mib:.2f}MiB, "
+          f"p50 {report['float32']['p50_ms']:.3f}ms, p95 {report['float32']['p95_ms']:.3f}ms")
+    print("-" * 78)
+    print(f"{'precision':>9} {'rerank':>6} {'MiB':>7} {'saved':>6} {'overlap@10':>10} {'min':>5} "
+          f"{'exact':>6} {'p50(ms)':>8} {'p95(ms)':>8}")
+    for row in report['quantized']:
+        print(f"{row['precision']:>9} {row['rerank_candidates']:>6} {row['bytes'] / mib:>7.2f} "
+              f"{row['memory_saved']:>6.1%} {row['overlap_at_10']:>10.3f} {row['min_overlap_at_10']:>5.2f} "
+              f"{row['exact_match']:>6.1%} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정책 임베딩 양자화 메모리/정확도 리포트")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로")
+    parser.add_argument('--cache-dir', default='cache', help="임베딩 캐시 디렉토리")
+    parser.add_argument('--precisions', default='float16,int8', help="비교할 정밀도 목록 (쉼표 구분)")
+    parser.add_argument('--rerank', default='0,50', help="비교할 float32 재정렬 후보 수 목록 (쉼표 구분, 0은 재정렬 없음)")
+    parser.add_argument('--repeat', type=int, default=3, help="쿼리당 반복 측정 횟수")
+    parser.add_argument('--output', default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    ai = YunoAI(cache_dir=args.cache_dir)
+    ai.load_real_data(args.csv)
+    if ai.catalog.normalized_embeddings is None:
+        print("[ERROR] BERT 임베딩이 없어 리포트를 생성할 수 없습니다")
+        return
+
+    precisions = [p.strip() for p in args.precisions.split(',') if p.strip()]
+    reranks = [int(r) for r in args.rerank.split(',') if r.strip()]
+    report = run_report(ai, precisions=precisions, reranks=reranks, repeat=args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
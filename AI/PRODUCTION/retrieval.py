@@ -0,0 +1,208 @@
+"""
+정책 후보 검색 백엔드
+- exact: 전체 정규화 임베딩과 내적 (기존 방식)
+- ivf: NumPy k-means 기반 IVF(inverted file) 근사 최근접 이웃 인덱스
+두 백엔드 모두 자격(지역/나이) 마스크를 받아 조건을 만족하는 정책만 후보로 반환
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from quantization import QuantizedEmbeddings, as_float32, similarities
+
+RETRIEVAL_BACKENDS = ('exact', 'ivf')
+
+
+def embeddings_fingerprint(embeddings):
+    """임베딩 행렬 내용 해시 (인덱스 파일 재사용 여부 판단용, 양자화 행렬은 저장된 값 + 스케일)"""
+    if isinstance(embeddings, QuantizedEmbeddings):
+        data = np.ascontiguousarray(embeddings.data)
+        digest = hashlib.sha1(f"{data.shape}{data.dtype}".encode())
+        digest.update(data.tobytes())
+        if embeddings.scales is not None:
+            digest.update(np.ascontiguousarray(embeddings.scales, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    digest = hashlib.sha1(str(embeddings.shape).encode())
+    digest.update(embeddings.tobytes())
+    return digest.hexdigest()
+
+
+class ExactRetriever:
+    """전수 검색 (정규화 임베딩 내적 = 코사인 유사도, 양자화 임베딩은 양자화된 형태로 계산)"""
+
+    name = 'exact'
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def search(self, query, mask, min_candidates=0):
+        """
+        Args:
+            query: 정규화된 쿼리 벡터 (dim,)
+            mask: 자격 조건 bool 배열 (n,)
+            min_candidates: 최소 후보 수 (전수 검색에서는 무시)
+
+        Returns:
+            (후보 인덱스 오름차순, 코사인 유사도)
+        """
+        indices = np.flatnonzero(mask)
+        if len(indices) * 2 < len(mask):
+            # 후보가 적으면 해당 행만 계산
+            return indices, similarities(self.embeddings, query, indices)
+        return indices, similarities(self.embeddings, query)[indices]
+
+
+class IVFRetriever:
+    """
+    IVF 근사 검색 인덱스
+
+    k-means로 정책 임베딩을 n_lists개 클러스터로 나누고, 쿼리와 가까운 n_probe개 클러스터의 정책만 계산
+    n_probe를 키우면 재현율(recall)이 올라가고 n_probe == n_lists이면 전수 검색과 동일
+    자격 조건을 만족하는 후보가 min_candidates개 미만이면 다음으로 가까운 클러스터를 계속 탐색
+    """
+
+    name = 'ivf'
+
+    def __init__(self, embeddings, n_lists=None, n_probe=8, iterations=10, seed=0):
+        self.embeddings = embeddings
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.seed = seed
+
+        n = len(embeddings)
+        if n_lists is None:
+            n_lists = int(np.sqrt(n)) if n > 0 else 1
+        self.n_lists = max(1, min(n_lists, n))
+
+        self.centroids = None
+        self.assignments = None
+        self._list_order = None
+        self._list_offsets = None
+
+    def build(self):
+        """구면(spherical) k-means로 클러스터 생성 (양자화 임베딩은 생성하는 동안만 float32로 복원)"""
+        embeddings = as_float32(self.embeddings)
+        n = len(embeddings)
+        if n == 0:
+            dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+            self._set_assignments(np.zeros((1, dim), dtype=np.float32), np.zeros(0, dtype=np.int32))
+            return self
+
+        rng = np.random.default_rng(self.seed)
+        centroids = np.array(embeddings[rng.choice(n, self.n_lists, replace=False)], dtype=np.float32)
+
+        assignments = np.zeros(n, dtype=np.int32)
+        for _ in range(self.iterations):
+            assignments = np.argmax(embeddings @ centroids.T, axis=1).astype(np.int32)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, embeddings)
+            counts = np.bincount(assignments, minlength=self.n_lists)
+
+            # 빈 클러스터는 임의의 정책으로 다시 시작
+            empty = np.flatnonzero(counts == 0)
+            if len(empty) > 0:
+                sums[empty] = embeddings[rng.choice(n, len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+
+        assignments = np.argmax(embeddings @ centroids.T, axis=1).astype(np.int32)
+        self._set_assignments(centroids, assignments)
+        return self
+
+    def _set_assignments(self, centroids, assignments):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int32)
+        self._list_order = np.argsort(self.assignments, kind='stable')
+        self._list_offsets = np.searchsorted(
+            self.assignments[self._list_order], np.arange(len(self.centroids) + 1)
+        )
+
+    def search(self, query, mask, min_candidates=0):
+        """
+        Returns:
+            (후보 인덱스 오름차순, 코사인 유사도) - 탐색한 클러스터 중 자격 조건을 만족하는 정책만
+        """
+        probe_order = np.argsort(-(self.centroids @ query), kind='stable')
+
+        members = []
+        eligible_count = 0
+        for probed, list_id in enumerate(probe_order):
+            if probed >= self.n_probe and eligible_count >= min_candidates:
+                break
+            start, end = self._list_offsets[list_id], self._list_offsets[list_id + 1]
+            list_members = self._list_order[start:end]
+            list_members = list_members[mask[list_members]]
+            if len(list_members) > 0:
+                members.append(list_members)
+                eligible_count += len(list_members)
+
+        if not members:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        indices = np.sort(np.concatenate(members))
+        return indices, similarities(self.embeddings, query, indices)
+
+    def save(self, path):
+        """클러스터 중심/할당 저장 (임시 파일 후 원자적 교체)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, centroids=self.centroids, assignments=self.assignments)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """저장된 인덱스 로딩 (정책 수가 다르면 False)"""
+        with np.load(path) as data:
+            centroids = data['centroids']
+            assignments = data['assignments']
+        if len(assignments) != len(self.embeddings) or len(centroids) != self.n_lists:
+            return False
+        self._set_assignments(centroids, assignments)
+        return True
+
+
+def build_retriever(embeddings, backend='exact', cache_dir=None, n_lists=None, n_probe=8):
+    """
+    검색 백엔드 생성 (ivf는 임베딩 캐시 옆에 저장된 인덱스가 있으면 재사용)
+    """
+    if backend not in RETRIEVAL_BACKENDS:
+        raise ValueError(f"Unknown retrieval backend: {backend} (choose from {RETRIEVAL_BACKENDS})")
+
+    if backend == 'exact':
+        return ExactRetriever(embeddings)
+
+    retriever = IVFRetriever(embeddings, n_lists=n_lists, n_probe=n_probe)
+    path = None
+    if cache_dir:
+        fingerprint = embeddings_fingerprint(embeddings)
+        path = os.path.join(cache_dir, f"ivf_{fingerprint[:16]}_{retriever.n_lists}.npz")
+        if os.path.exists(path):
+            try:
+                if retriever.load(path):
+                    print(f"IVF 인덱스 로딩 완료: {path}")
+                    return retriever
+            except Exception as e:
+                print(f"[WARNING] IVF 인덱스 로딩 실패 - 다시 생성합니다: {e}")
+
+    start = time.perf_counter()
+    retriever.build()
+    print(f"IVF 인덱스 생성 완료: {retriever.n_lists}개 클러스터 ({time.perf_counter() - start:.2f}s)")
+
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            retriever.save(path)
+            # 이전 카탈로그의 인덱스 정리
+            for name in os.listdir(cache_dir):
+                if name.startswith('ivf_') and name.endswith('.npz') and name != os.path.basename(path):
+                    os.remove(os.path.join(cache_dir, name))
+        except Exception as e:
+            print(f"[WARNING] IVF 인덱스 저장 실패: {e}")
+
+    return retriever
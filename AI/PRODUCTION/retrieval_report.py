@@ -0,0 +1,130 @@
+"""
+검색 백엔드 재현율/지연시간 리포트
+exact(전수 검색) 상위 10개 후보를 기준으로 IVF 근사 검색의 n_probe별 재현율과 지연시간 비교
+
+사용법:
+    python retrieval_report.py
+    python retrieval_report.py --lists 64 --probes 1,2,4,8,16 --output retrieval_report.json
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+import numpy as np
+
+from retrieval import ExactRetriever, IVFRetriever
+from yuno_ai_system_clean import YunoAI, CANDIDATE_COUNT
+
+AGES = [19, 23, 27, 31, 35]
+LOCATIONS = ['', '서울', '부산', '경기', '대구']
+INTERESTS = [[], ['취업', '창업'], ['주거'], ['장학금', '교육'], ['대출', '금융'], ['문화', '복지']]
+MAJORS = ['', '컴퓨터공학', '경영학']
+
+
+def build_profiles():
+    """리포트용 사용자 프로필 (나이 x 지역 x 관심사 x 전공)"""
+    return [
+        {"age": age, "location": location, "interests": interests, "major": major}
+        for age, location, interests, major in itertools.product(AGES, LOCATIONS, INTERESTS, MAJORS)
+    ]
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000) if latencies else 0.0
+
+
+def run_report(ai, n_lists=None, probes=(1, 2, 4, 8, 16), repeat=3):
+    profiles = build_profiles()
+    queries = [(profile, ai._encode_query(ai._build_user_query(profile))) for profile in profiles]
+
+    exact = ExactRetriever(ai.catalog.normalized_embeddings)
+    ivf = IVFRetriever(ai.catalog.normalized_embeddings, n_lists=n_lists).build()
+
+    def measure(retriever):
+        results, latencies = [], []
+        for profile, query in queries:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                indices, _ = ai._rank_candidates(profile, query, retriever)
+                latencies.append(time.perf_counter() - start)
+            results.append(set(indices.tolist()))
+        return results, latencies
+
+    exact_results, exact_latencies = measure(exact)
+    exact_p50 = percentile_ms(exact_latencies, 50)
+
+    report = {
+        "catalogue_size": int(len(ai.catalog.normalized_embeddings)),
+        "n_lists": ivf.n_lists,
+        "queries": len(queries),
+        "candidate_count": CANDIDATE_COUNT,
+        "exact": {
+            "p50_ms": exact_p50,
+            "p95_ms": percentile_ms(exact_latencies, 95)
+        },
+        "ivf": []
+    }
+
+    for n_probe in probes:
+        ivf.n_probe = n_probe
+        ivf_results, ivf_latencies = measure(ivf)
+        recalls = [
+            len(expected & found) / len(expected) if expected else 1.0
+            for expected, found in zip(exact_results, ivf_results)
+        ]
+        p50 = percentile_ms(ivf_latencies, 50)
+        report["ivf"].append({
+            "n_probe": n_probe,
+            "recall_at_10": float(np.mean(recalls)),
+            "min_recall_at_10": float(np.min(recalls)),
+            "p50_ms": p50,
+            "p95_ms": percentile_ms(ivf_latencies, 95),
+            "speedup_p50": exact_p50 / p50 if p50 > 0 else None
+        })
+
+    return report
+
+
+def print_report(report):
+    print("=" * 70)
+    print(f"정책 수: {report['catalogue_size']}, IVF 클러스터: {report['n_lists']}, 쿼리: {report['queries']}")
+    print(f"exact: p50 {report['exact']['p50_ms']:.3f}ms, p95 {report['exact']['p95_ms']:.3f}ms")
+    print("-" * 70)
+    print(f"{'n_probe':>8} {'recall@10':>10} {'min':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'speedup':>8}")
+    for row in report['ivf']:
+        speedup = f"{row['speedup_p50']:.2f}x" if row['speedup_p50'] else '-'
+        print(f"{row['n_probe']:>8} {row['recall_at_10']:>10.3f} {row['min_recall_at_10']:>6.2f} "
+              f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {speedup:>8}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 백엔드 재현율/지연시간 리포트")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로")
+    parser.add_argument('--cache-dir', default='cache', help="임베딩 캐시 디렉토리")
+    parser.add_argument('--lists', type=int, default=None, help="IVF 클러스터 수 (기본 sqrt(정책 수))")
+    parser.add_argument('--probes', default='1,2,4,8,16', help="비교할 n_probe 목록 (쉼표 구분)")
+    parser.add_argument('--repeat', type=int, default=3, help="쿼리당 반복 측정 횟수")
+    parser.add_argument('--output', default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    ai = YunoAI(cache_dir=args.cache_dir)
+    ai.load_real_data(args.csv)
+    if ai.catalog.normalized_embeddings is None:
+        print("[ERROR] BERT 임베딩이 없어 리포트를 생성할 수 없습니다")
+        return
+
+    probes = [int(p) for p in args.probes.split(',') if p.strip()]
+    report = run_report(ai, n_lists=args.lists, probes=probes, repeat=args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
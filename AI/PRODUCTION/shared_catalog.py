@@ -0,0 +1,103 @@
+"""
+멀티 워커용 공유 정책 카탈로그
+정책 테이블과 정규화 임베딩 행렬을 한 번만 파일로 만들고, 모든 uvicorn 워커가 읽기 전용 memory-map으로 연결
+- 카탈로그 디렉토리: <catalog_dir>/<CSV 내용 + 모델명(인코더 포함) 해시>/
+- 처음 시작하는 워커 하나만 파일 잠금을 잡고 생성, 나머지 워커는 완성된 카탈로그를 기다렸다가 연결
+- 워커별로는 쿼리 인코더(BERT 모델)와 작은 자격 인덱스만 메모리에 보유
+"""
+
+import hashlib
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 (잠금 없이 동작)
+    fcntl = None
+
+# 카탈로그 파일 형식이 바뀌면 올려서 기존 카탈로그를 다시 생성
+CATALOG_VERSION = 4
+
+LOCK_FILE = '.lock'
+
+
+def catalog_key(csv_path, model_name):
+    """CSV 내용 + 모델명 해시 (데이터나 모델이 바뀌면 새 카탈로그)"""
+    digest = hashlib.sha1(f"{CATALOG_VERSION}\0{model_name}\0".encode('utf-8'))
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class _CatalogLock:
+    """카탈로그 생성용 프로세스 간 배타 잠금 (fcntl.flock)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _remove_stale_catalogs(catalog_dir, current_name):
+    """이전 데이터/모델의 카탈로그 삭제 (이미 연결한 워커의 memory-map은 파일 삭제 후에도 유효)"""
+    for name in os.listdir(catalog_dir):
+        path = os.path.join(catalog_dir, name)
+        if name != current_name and name != LOCK_FILE and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_shared_catalog(ai, csv_path, catalog_dir):
+    """
+    공유 카탈로그 연결 (없으면 생성), 재로딩에도 사용
+
+    Args:
+        ai: YunoAI 인스턴스
+        csv_path: 정책 CSV 경로
+        catalog_dir: 카탈로그 루트 디렉토리 (워커들이 같은 경로를 사용해야 함)
+
+    Returns:
+        이전 카탈로그 대비 변경 요약 (YunoAI.load_real_data와 동일)
+    """
+    try:
+        key = catalog_key(csv_path, ai.encoder_id)
+    except FileNotFoundError:
+        print(f"[ERROR] {csv_path} 파일을 찾을 수 없습니다!")
+        return ai.load_real_data(csv_path)
+
+    os.makedirs(catalog_dir, exist_ok=True)
+    directory = os.path.join(catalog_dir, key)
+
+    if not os.path.isdir(directory):
+        with _CatalogLock(os.path.join(catalog_dir, LOCK_FILE)):
+            # 잠금을 기다리는 동안 다른 워커가 만들었으면 그대로 사용
+            if not os.path.isdir(directory):
+                print(f"공유 카탈로그 생성 중: {directory}")
+                catalog = ai.prepare_catalog(csv_path)
+                if catalog is None:
+                    return None
+                if catalog.size == 0 or catalog.normalized_embeddings is None:
+                    # 임베딩 없는 카탈로그가 남으면 이후 워커도 키워드 매칭만 하게 되므로 저장하지 않음
+                    print("[WARNING] 정책 데이터 또는 BERT 임베딩이 없어 공유 카탈로그를 만들지 않습니다")
+                    return ai.install_catalog(catalog)
+
+                # 임시 디렉토리에 모두 쓴 뒤 원자적으로 이름 변경 (다른 워커가 반쯤 쓴 파일을 보지 않도록)
+                tmp_directory = f"{directory}.{os.getpid()}.tmp"
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+                ai.save_catalog(tmp_directory, catalog)
+                os.replace(tmp_directory, directory)
+                _remove_stale_catalogs(catalog_dir, key)
+
+    # 생성한 워커도 프로세스 메모리의 복사본 대신 memory-map으로 연결
+    return ai.attach_catalog(directory)
@@ -0,0 +1,47 @@
+"""
+동일 키 동시 요청 병합 (single-flight)
+같은 키로 진행 중인 작업이 있으면 새로 시작하지 않고 그 결과를 함께 기다림
+(예: 같은 정책/사용자 조건의 요약 요청이 동시에 여러 개 와도 Gemini 호출은 한 번)
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """asyncio 단일 이벤트 루프용 요청 병합"""
+
+    def __init__(self):
+        self._tasks = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self):
+        return len(self._tasks)
+
+    async def do(self, key, fn):
+        """
+        Args:
+            key: 병합 키
+            fn: 코루틴을 반환하는 함수 (키별로 진행 중인 작업이 없을 때만 호출)
+
+        Returns:
+            fn() 결과 (예외도 기다리던 모든 요청에 그대로 전달)
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.shared += 1
+
+        # 기다리던 요청 하나가 취소(클라이언트 연결 종료)되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._tasks),
+            "calls": self.calls,
+            "shared": self.shared
+        }
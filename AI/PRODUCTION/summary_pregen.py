@@ -0,0 +1,434 @@
+"""
+페르소나 세그먼트별 Gemini 정책 요약 사전 생성
+- 사용자를 나이대 x 관심 분야의 굵은 세그먼트로 묶어 요약 캐시 키를 정규화 (전공/관심사 조합별로 흩어지지 않음)
+- 조회수(saves) 상위 정책 x 세그먼트 요약을 요청 속도 예산(분당 호출 수) 안에서 백그라운드로 미리 생성
+- 결과는 SQLite 파일(캐시 볼륨)에 영속 저장, 온라인 요청은 Gemini 호출 전에 저장소를 먼저 조회
+- 저장된 요약은 생성에 쓴 프롬프트 해시와 함께 보관해 정책 내용/프롬프트가 바뀌면 자동으로 다시 생성
+
+단독 실행 (로컬 LLM 스텁으로 파이프라인 확인, GEMINI_API_KEY가 있고 --stub이 없으면 Gemini 사용):
+    python summary_pregen.py --stub --top 50 --rpm 600
+    python summary_pregen.py --top 200 --rpm 30 --store cache/summaries.db
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import types
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 (잠금 없이 동작)
+    fcntl = None
+
+from yuno_ai_system_clean import INTEREST_CATEGORY_BONUS
+
+logger = logging.getLogger(__name__)
+
+GEMINI_SUMMARY_MODEL = 'gemini-2.0-flash-exp'
+
+# 나이대 (요약 요청 나이 범위 15~39세), 나이가 없으면 'all'
+AGE_BANDS = ((15, 19), (20, 24), (25, 29), (30, 34), (35, 39))
+ANY_AGE = 'all'
+# 관심사가 보너스 카테고리에 해당하지 않으면 'general'
+GENERAL_INTEREST = 'general'
+
+# 사전 생성 중 연속 실패가 이 횟수를 넘으면 이번 회차 중단 (할당량 초과/장애 시 예산 낭비 방지)
+MAX_CONSECUTIVE_FAILURES = 5
+
+SUMMARY_PROMPT = """당신은 청년 정책 전문가입니다. 아래 정책을 청년이 쉽게 이해할 수 있도록 친근하고 자연스럽게 요약해주세요.
+
+정책 정보:
+- 제목: {title}
+- 설명: {description}
+- 카테고리: {category}
+- 지원 내용: {support_content}
+
+{user_info_section}
+
+3-4문장으로 다음을 포함해 요약하세요:
+1. 어떤 지원을 받을 수 있는지
+2. 신청 자격이 어떻게 되는지
+3. 사용자 정보가 있다면 이 사용자에게 어떤 도움이 될지
+
+주의: 메타 정보(##, 예시 등) 없이 바로 본론으로 시작하고, 이모지는 사용하지 마세요."""
+
+
+# ---------------------------------------------------------------------------
+# 페르소나 세그먼트
+# ---------------------------------------------------------------------------
+
+def age_band(age):
+    """나이 -> 나이대 라벨 ('25-29', 범위 밖이면 가장 가까운 나이대, 없으면 'all')"""
+    if age is None:
+        return ANY_AGE
+    for low, high in AGE_BANDS:
+        if age <= high:
+            return f"{low}-{high}"
+    low, high = AGE_BANDS[-1]
+    return f"{low}-{high}"
+
+
+def interest_category(interests):
+    """관심사 -> 대표 관심 분야 (추천 보너스 카테고리 순서상 처음 해당하는 분야, 없으면 'general')"""
+    interests = interests or []
+    for keywords, category in INTEREST_CATEGORY_BONUS:
+        if any(keyword in interests for keyword in keywords):
+            return category
+    return GENERAL_INTEREST
+
+
+def persona_segment(age, interests):
+    """사용자 조건 -> 세그먼트 키 ('25-29:일자리')"""
+    return f"{age_band(age)}:{interest_category(interests)}"
+
+
+def all_segments():
+    """모든 세그먼트 (나이 없음/관심 분야 없음 포함)"""
+    bands = [f"{low}-{high}" for low, high in AGE_BANDS] + [ANY_AGE]
+    categories = [category for _, category in INTEREST_CATEGORY_BONUS] + [GENERAL_INTEREST]
+    return [f"{band}:{category}" for band in bands for category in categories]
+
+
+def segment_user_info(segment):
+    """세그먼트 -> 프롬프트 사용자 정보 줄 (세그먼트 대표 페르소나)"""
+    band, category = segment.split(':', 1)
+    user_info = ""
+    if band != ANY_AGE:
+        user_info += f"나이: {band}세\n"
+    if category != GENERAL_INTEREST:
+        user_info += f"관심 분야: {category}\n"
+    return user_info
+
+
+# ---------------------------------------------------------------------------
+# 프롬프트
+# ---------------------------------------------------------------------------
+
+def policy_summary_fields(policy):
+    """정책 레코드(팀 백엔드 API 형식) -> 요약 프롬프트 필드"""
+    return {
+        "title": policy['plcyNm'],
+        "description": policy['plcyExplnCn'],
+        "category": policy['bscPlanPlcyWayNoNm'],
+        "support_content": policy.get('support_content', '정보 없음')
+    }
+
+
+def build_summary_prompt(fields, user_info):
+    """요약 프롬프트 (user_info: '나이: ...\\n' 형식 줄, 없으면 빈 문자열)"""
+    return SUMMARY_PROMPT.format(
+        user_info_section=f"사용자 정보:\n{user_info}" if user_info else "",
+        **fields
+    )
+
+
+def prompt_hash(prompt):
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# 영속 저장소
+# ---------------------------------------------------------------------------
+
+class SummaryStore:
+    """
+    (정책 ID, 세그먼트)별 요약 SQLite 저장소 (WAL 모드, 같은 노드의 워커들이 공유)
+    조회 시 프롬프트 해시가 다르면(정책 내용/프롬프트 변경) 없는 것으로 처리
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS policy_summaries (
+                    policy_id TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (policy_id, segment)
+                )
+            """)
+
+    def _conn(self):
+        """스레드별 연결"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, policy_id, segment, expected_hash):
+        """저장된 요약 (없거나 다른 프롬프트로 만든 요약이면 None)"""
+        row = self._conn().execute(
+            "SELECT prompt_hash, summary FROM policy_summaries WHERE policy_id = ? AND segment = ?",
+            (policy_id, segment)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        if row[0] != expected_hash:
+            self.stale += 1
+            return None
+        self.hits += 1
+        return row[1]
+
+    def has(self, policy_id, segment, expected_hash):
+        """통계에 넣지 않는 존재 확인 (사전 생성 건너뛰기용)"""
+        row = self._conn().execute(
+            "SELECT 1 FROM policy_summaries WHERE policy_id = ? AND segment = ? AND prompt_hash = ?",
+            (policy_id, segment, expected_hash)
+        ).fetchone()
+        return row is not None
+
+    def put(self, policy_id, segment, expected_hash, summary, source='online'):
+        """
+        Args:
+            source: 'pregen' (사전 생성) 또는 'online' (요청 시 생성)
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO policy_summaries "
+                "(policy_id, segment, prompt_hash, summary, source, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (policy_id, segment, expected_hash, summary, source, time.time())
+            )
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM policy_summaries").fetchone()[0]
+
+    def stats(self):
+        by_source = dict(self._conn().execute(
+            "SELECT source, COUNT(*) FROM policy_summaries GROUP BY source"
+        ).fetchall())
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "path": self.path,
+            "entries": sum(by_source.values()),
+            "by_source": by_source,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# ---------------------------------------------------------------------------
+# 사전 생성 파이프라인
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """분당 호출 수 예산 (호출 간격을 60/rate초로 고르게 분산, 0이면 제한 없음)"""
+
+    def __init__(self, rate_per_minute):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = time.monotonic()
+            self._next = max(now, self._next) + self.interval
+
+
+def top_policies(policies, count):
+    """조회수(saves) 상위 정책 (같으면 원래 순서)"""
+    ranked = sorted(enumerate(policies), key=lambda item: (-int(item[1].get('saves') or 0), item[0]))
+    return [policy for _, policy in ranked[:count]]
+
+
+class _PregenLock:
+    """사전 생성 회차 프로세스 간 잠금 (여러 워커 중 하나만 실행, 잡지 못하면 acquired=False)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.acquired = False
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is None:
+            self.acquired = True
+            return self
+        self._file = open(self.path, 'a')
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.acquired = True
+        except OSError:
+            self.acquired = False
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            if self.acquired:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+        return False
+
+
+async def pregenerate_summaries(policies, store, generate, segments=None, top_n=100, rate_per_minute=30,
+                                concurrency=2):
+    """
+    조회수 상위 정책 x 세그먼트 요약 사전 생성 (이미 같은 프롬프트로 만든 요약은 건너뜀)
+
+    Args:
+        policies: 정책 레코드 리스트 (팀 백엔드 API 형식, saves 포함)
+        store: SummaryStore
+        generate: 프롬프트 -> 요약 문자열 코루틴 함수 (Gemini 또는 스텁)
+        segments: 생성할 세그먼트 (앞에 있을수록 먼저, None이면 전체)
+        top_n: 조회수 상위 정책 수
+        rate_per_minute: 생성 호출 예산 (분당)
+        concurrency: 동시 생성 호출 수
+
+    Returns:
+        회차 통계 dict
+    """
+    segments = list(segments or all_segments())
+    jobs = []
+    skipped = 0
+    for policy in top_policies(policies, top_n):
+        fields = policy_summary_fields(policy)
+        for segment in segments:
+            prompt = build_summary_prompt(fields, segment_user_info(segment))
+            digest = prompt_hash(prompt)
+            if store.has(policy['id'], segment, digest):
+                skipped += 1
+            else:
+                jobs.append((policy['id'], segment, prompt, digest))
+
+    stats = {"planned": len(jobs), "generated": 0, "failed": 0, "skipped": skipped, "aborted": False}
+    limiter = RateLimiter(rate_per_minute)
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    consecutive_failures = 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal consecutive_failures
+        while not stats["aborted"]:
+            try:
+                policy_id, segment, prompt, digest = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await limiter.acquire()
+            try:
+                summary = await generate(prompt)
+            except Exception as e:
+                stats["failed"] += 1
+                consecutive_failures += 1
+                logger.warning("Summary pregeneration failed for %s (%s): %s", policy_id, segment, e)
+                if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    stats["aborted"] = True
+                    logger.error("Summary pregeneration aborted after %d consecutive failures", consecutive_failures)
+                continue
+            consecutive_failures = 0
+            store.put(policy_id, segment, digest, summary, source='pregen')
+            stats["generated"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+async def run_pregeneration(policies, store, generate, lock_path=None, **kwargs):
+    """
+    잠금을 잡은 프로세스에서만 사전 생성 (다른 워커가 실행 중이면 None)
+    """
+    with _PregenLock(lock_path or f"{store.path}.lock") as lock:
+        if not lock.acquired:
+            logger.info("Summary pregeneration already running in another worker - skipped")
+            return None
+        stats = await pregenerate_summaries(policies, store, generate, **kwargs)
+        logger.info("Summary pregeneration finished: %s", stats)
+        return stats
+
+
+class StubSummaryClient:
+    """
+    로컬 LLM 스텁 (google-genai 비동기 클라이언트와 같은 client.aio.models.generate_content 인터페이스)
+    고정 지연 후 프롬프트에서 정책 제목을 뽑아 결정적인 요약을 반환
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.aio = types.SimpleNamespace(models=self)
+
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        title = next((line[len('- 제목: '):] for line in contents.splitlines() if line.startswith('- 제목: ')), '정책')
+        return types.SimpleNamespace(text=f"{title} 요약 (스텁 {prompt_hash(contents)[:8]})")
+
+
+def gemini_generator(client, model=GEMINI_SUMMARY_MODEL):
+    """genai 클라이언트 -> 프롬프트 -> 요약 문자열 코루틴 함수"""
+    async def generate(prompt):
+        response = await client.aio.models.generate_content(model=model, contents=prompt)
+        return response.text.strip()
+    return generate
+
+
+def main():
+    from dotenv import load_dotenv
+
+    from policy_ingest import load_policy_csv
+
+    parser = argparse.ArgumentParser(description="페르소나 세그먼트별 정책 요약 사전 생성")
+    parser.add_argument('--csv', default='real_policies_final.csv', help="정책 CSV 경로")
+    parser.add_argument('--store', default=os.path.join('cache', 'summaries.db'), help="요약 저장소 SQLite 경로")
+    parser.add_argument('--top', type=int, default=100, help="조회수 상위 정책 수")
+    parser.add_argument('--rpm', type=float, default=30, help="분당 생성 호출 예산 (0이면 제한 없음)")
+    parser.add_argument('--concurrency', type=int, default=2, help="동시 생성 호출 수")
+    parser.add_argument('--segments', default=None, help="생성할 세그먼트 목록 (쉼표 구분, 기본 전체)")
+    parser.add_argument('--stub', action='store_true', help="Gemini 대신 로컬 LLM 스텁 사용")
+    parser.add_argument('--stub-delay', type=float, default=0.05, help="스텁 응답 지연(초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    load_dotenv()
+
+    if args.stub:
+        client = StubSummaryClient(args.stub_delay)
+    else:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            print("[ERROR] GEMINI_API_KEY가 없습니다 (--stub으로 로컬 스텁 사용 가능)")
+            return
+        from google import genai
+        client = genai.Client(api_key=api_key)
+
+    policies, _, _ = load_policy_csv(args.csv)
+    segments = [s.strip() for s in args.segments.split(',')] if args.segments else None
+    store = SummaryStore(args.store)
+    stats = asyncio.run(run_pregeneration(
+        policies, store, gemini_generator(client),
+        segments=segments, top_n=args.top, rate_per_minute=args.rpm, concurrency=args.concurrency
+    ))
+    print(f"사전 생성 결과: {stats}")
+    print(f"저장소: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+테스트 공통 설정
+PRODUCTION 디렉터리의 모듈을 그대로 import 하도록 경로 추가
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,171 @@
+"""
+backend_client 테스트
+로컬 HTTP 스텁 서버(/api/policies/<id>)에 붙여 캐시/동시 조회 병합/오류 응답 처리 확인
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend_client import BackendPolicyClient
+from cache import TTLCache
+
+
+class PolicyStubServer:
+    """
+    /api/policies/<id> 스텁
+    - 'missing': 404
+    - 'html': 200이지만 JSON이 아닌 본문
+    - 그 외: {"id": <id>, "title": ...} (delay초 뒤 응답)
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.hits = Counter()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                policy_id = self.path.rsplit('/', 1)[-1]
+                stub.hits[policy_id] += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if policy_id == 'missing':
+                    self._reply(404, 'application/json', b'{"error": "not found"}')
+                elif policy_id == 'html':
+                    self._reply(200, 'text/html', b'<html>maintenance</html>')
+                else:
+                    body = json.dumps({"id": policy_id, "title": f"정책 {policy_id}"}, ensure_ascii=False)
+                    self._reply(200, 'application/json', body.encode('utf-8'))
+
+            def _reply(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = PolicyStubServer()
+    yield server
+    server.close()
+
+
+def run_with_client(url, body, **kwargs):
+    async def main():
+        client = await BackendPolicyClient(url, **kwargs).start()
+        try:
+            return await body(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_cached_policy_is_not_refetched_until_ttl(stub):
+    cache = TTLCache('backend_policies', max_entries=100, default_ttl=0.2)
+
+    async def body(client):
+        first = await client.get_policy('1')
+        second = await client.get_policy(1)
+        await asyncio.sleep(0.3)
+        third = await client.get_policy('1')
+        return first, second, third
+
+    first, second, third = run_with_client(stub.url, body, cache=cache)
+    assert first == second == third == {"id": "1", "title": "정책 1"}
+    assert stub.hits['1'] == 2
+
+
+def test_concurrent_prefetch_and_lookup_share_one_request(stub):
+    stub.delay = 0.1
+
+    async def body(client):
+        fetched, policy = await asyncio.gather(
+            client.prefetch(['1', '2', '1', 2]),
+            client.get_policy('1')
+        )
+        again = await client.prefetch(['1', '2'])
+        return fetched, policy, again, client.stats()
+
+    fetched, policy, again, stats = run_with_client(stub.url, body)
+    assert fetched == 2
+    assert policy["id"] == '1'
+    assert again == 0
+    assert stub.hits == Counter({'1': 1, '2': 1})
+    assert stats["requests"] == 2
+    assert stats["coalesced"] == 1
+
+
+def test_missing_policy_returns_none_and_is_not_cached(stub):
+    async def body(client):
+        results = [await client.get_policy('missing') for _ in range(2)]
+        return results, client.stats()
+
+    results, stats = run_with_client(stub.url, body)
+    assert results == [None, None]
+    assert stub.hits['missing'] == 2
+    assert stats["errors"] == 0
+    assert stats["cache"]["entries"] == 0
+
+
+def test_non_json_response_returns_none_and_counts_error(stub):
+    async def body(client):
+        policy = await client.get_policy('html')
+        return policy, client.stats()
+
+    policy, stats = run_with_client(stub.url, body)
+    assert policy is None
+    assert stats["errors"] == 1
+    assert stats["cache"]["entries"] == 0
+
+
+def test_unreachable_backend_returns_none():
+    async def body(client):
+        return await client.get_policy('1'), client.stats()
+
+    policy, stats = run_with_client('http://127.0.0.1:9', body, timeout=0.5)
+    assert policy is None
+    assert stats["errors"] == 1
+
+
+def test_lifespan_opens_and_closes_client(stub, monkeypatch, tmp_path):
+    import main
+
+    async def skip_engine(model):
+        pass
+
+    monkeypatch.setattr(main, 'FAST_START', True)
+    monkeypatch.setattr(main, 'load_engine', skip_engine)
+    monkeypatch.setattr(main, 'AI_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(main, 'SUMMARY_SEGMENTS', False)
+    monkeypatch.setattr(main, 'BACKEND_API_URL', stub.url)
+    monkeypatch.setattr(main, 'backend_policy_cache', TTLCache('backend_policies', max_entries=100))
+
+    async def run():
+        async with main.lifespan(main.app):
+            client = main.backend_client
+            assert client._client is not None
+            assert await main.fetch_policy_from_backend('7') == {"id": "7", "title": "정책 7"}
+        return client
+
+    client = asyncio.run(run())
+    assert client._client is None
+    assert stub.hits['7'] == 1
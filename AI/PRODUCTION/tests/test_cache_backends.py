@@ -0,0 +1,315 @@
+"""
+cache_backends 테스트
+- RESP 프로토콜을 흉내 내는 프로세스 내 서버로 RedisClient/RedisStore/SharedCache 확인
+- 임시 파일 SQLite 저장소로 만료/태그 정리 확인
+"""
+
+import fnmatch
+import socket
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import cache_backends
+from cache_backends import RedisClient, RedisStore, SharedCache, SQLiteStore, create_cache
+
+
+class FakeRedisServer:
+    """GET/SET/DEL/SADD/SMEMBERS/EXPIRE/SCAN만 지원하는 최소 RESP2 서버"""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.data = {}
+        self.expires = {}
+        self.commands = []
+        self._lock = threading.Lock()
+        self._clients = []
+        self._server = socket.create_server(('127.0.0.1', 0))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/0"
+
+    def close(self):
+        self._server.close()
+        self.drop_clients()
+
+    def drop_clients(self):
+        """열린 연결을 모두 끊음 (서버 재시작 흉내)"""
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        reader = conn.makefile('rb')
+        try:
+            while True:
+                line = reader.readline()
+                if not line:
+                    return
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(reader.readline()[1:-2])
+                    args.append(reader.read(length + 2)[:-2])
+                conn.sendall(self._handle(args))
+        except OSError:
+            return
+        finally:
+            reader.close()
+
+    def _alive(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _handle(self, args):
+        command = args[0].decode().upper()
+        with self._lock:
+            self.commands.append(command)
+            if command == 'AUTH':
+                if args[1].decode() != self.password:
+                    return b"-ERR invalid password\r\n"
+                return b"+OK\r\n"
+            if command == 'SELECT':
+                return b"+OK\r\n"
+            if command == 'GET':
+                if not self._alive(args[1]):
+                    return b"$-1\r\n"
+                return _bulk(self.data[args[1]])
+            if command == 'SET':
+                self.data[args[1]] = args[2]
+                self.expires.pop(args[1], None)
+                if len(args) > 3 and args[3].upper() == b'PX':
+                    self.expires[args[1]] = time.time() + int(args[4]) / 1000
+                return b"+OK\r\n"
+            if command == 'DEL':
+                count = 0
+                for key in args[1:]:
+                    if self._alive(key):
+                        count += 1
+                    self.data.pop(key, None)
+                    self.expires.pop(key, None)
+                return f":{count}\r\n".encode()
+            if command == 'SADD':
+                members = self.data.setdefault(args[1], set())
+                before = len(members)
+                members.update(args[2:])
+                return f":{len(members) - before}\r\n".encode()
+            if command == 'SMEMBERS':
+                members = self.data.get(args[1], set()) if self._alive(args[1]) else set()
+                return f"*{len(members)}\r\n".encode() + b"".join(_bulk(m) for m in sorted(members))
+            if command == 'EXPIRE':
+                if not self._alive(args[1]):
+                    return b":0\r\n"
+                self.expires[args[1]] = time.time() + int(args[2])
+                return b":1\r\n"
+            if command == 'SCAN':
+                pattern = args[args.index(b'MATCH') + 1].decode()
+                keys = [k for k in list(self.data) if self._alive(k) and fnmatch.fnmatchcase(k.decode(), pattern)]
+                return b"*2\r\n" + _bulk(b"0") + f"*{len(keys)}\r\n".encode() + b"".join(_bulk(k) for k in keys)
+        return f"-ERR unknown command '{command}'\r\n".encode()
+
+
+def _bulk(data):
+    return f"${len(data)}\r\n".encode() + data + b"\r\n"
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer(password='secret')
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    client = RedisClient(redis_server.url, timeout=1.0)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+# Redis
+
+def test_redis_get_set_and_ttl(redis_client):
+    cache = create_cache('summary', backend='redis', redis_client=redis_client, default_ttl=0.2)
+
+    vector = np.arange(4, dtype=np.float32)
+    cache.set('vec', {"vector": vector, "label": "청년"})
+    cached = cache.get('vec')
+    assert cached["label"] == "청년"
+    np.testing.assert_array_equal(cached["vector"], vector)
+
+    time.sleep(0.3)
+    assert cache.get('vec') is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_redis_auth_is_sent_on_connect(redis_server, redis_client):
+    redis_client.execute('GET', 'missing')
+    assert redis_server.commands[0] == 'AUTH'
+
+
+def test_redis_invalidate_tag(redis_client):
+    cache = create_cache('recommendations', backend='redis', redis_client=redis_client)
+    cache.set('a', 1, tags=('policy:1',))
+    cache.set('b', 2, tags=('policy:1', 'policy:2'))
+    cache.set('c', 3, tags=('policy:2',))
+
+    assert cache.invalidate_tag('policy:1') == 2
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.invalidate_tag('policy:1') == 0
+
+
+def test_redis_clear_keeps_other_namespaces(redis_client):
+    summaries = create_cache('summary', backend='redis', redis_client=redis_client)
+    rankings = create_cache('ranking', backend='redis', redis_client=redis_client)
+    summaries.set('k1', 'x', tags=('policy:1',))
+    summaries.set('k2', 'y')
+    rankings.set('k1', 'z')
+
+    assert summaries.clear() == 2
+    assert len(summaries) == 0
+    assert rankings.get('k1') == 'z'
+    assert len(rankings) == 1
+
+
+def test_redis_client_reconnects_after_disconnect(redis_server, redis_client):
+    store = RedisStore(redis_client, 'yuno:test')
+    store.set('k', b'v', None, ())
+    redis_server.drop_clients()
+
+    assert store.get('k') == b'v'
+    assert redis_server.commands.count('AUTH') == 2
+
+
+def test_shared_cache_treats_unreachable_redis_as_miss():
+    with socket.create_server(('127.0.0.1', 0)) as probe:
+        port = probe.getsockname()[1]
+    client = RedisClient(f"redis://127.0.0.1:{port}/0", timeout=0.2)
+    cache = create_cache('summary', backend='redis', redis_client=client)
+
+    cache.set('k', 'v')
+    assert cache.get('k', 'default') == 'default'
+    stats = cache.stats()
+    assert stats["errors"] == 2
+    assert stats["misses"] == 1
+
+
+def test_shared_cache_drops_corrupt_entries(redis_client):
+    store = RedisStore(redis_client, 'yuno:summary')
+    cache = SharedCache('summary', store)
+    store.set('k', b'{not json', None, ())
+
+    assert cache.get('k', 'default') == 'default'
+    assert store.get('k') is None
+    assert cache.stats()["errors"] == 1
+
+
+# SQLite
+
+def test_sqlite_get_set_and_expiry(sqlite_path):
+    cache = create_cache('summary', backend='sqlite', sqlite_path=sqlite_path, default_ttl=0.2)
+    cache.set('k', {"summary": "요약"})
+    assert cache.get('k') == {"summary": "요약"}
+
+    time.sleep(0.3)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+
+
+def test_sqlite_is_shared_between_connections(sqlite_path):
+    writer = create_cache('summary', backend='sqlite', sqlite_path=sqlite_path)
+    reader = create_cache('summary', backend='sqlite', sqlite_path=sqlite_path)
+    other = create_cache('ranking', backend='sqlite', sqlite_path=sqlite_path)
+    writer.set('k', [1, 2, 3])
+
+    assert reader.get('k') == [1, 2, 3]
+    assert other.get('k') is None
+
+
+def test_sqlite_invalidate_tag_and_clear(sqlite_path):
+    cache = create_cache('recommendations', backend='sqlite', sqlite_path=sqlite_path)
+    other = create_cache('ranking', backend='sqlite', sqlite_path=sqlite_path)
+    cache.set('a', 1, tags=('policy:1',))
+    cache.set('b', 2, tags=('policy:2',))
+    other.set('a', 3, tags=('policy:1',))
+
+    assert cache.invalidate_tag('policy:1') == 1
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert other.get('a') == 3
+
+    assert cache.clear() == 1
+    assert other.get('a') == 3
+
+
+def test_sqlite_expired_entries_release_their_tags(sqlite_path):
+    store = SQLiteStore(sqlite_path, 'yuno:summary')
+    store.set('old', b'1', 0.05, ('policy:1', 'policy:2'))
+    time.sleep(0.1)
+    store.set('new', b'2', None, ('policy:1',))
+
+    conn = sqlite3.connect(sqlite_path)
+    keys = {key for (key,) in conn.execute("SELECT key FROM cache_tags WHERE namespace = 'yuno:summary'")}
+    conn.close()
+    assert keys == {'new'}
+
+
+def test_sqlite_evicts_least_recently_used(sqlite_path):
+    store = SQLiteStore(sqlite_path, 'yuno:summary', max_entries=2)
+    store.set('a', b'1', None, ())
+    store.set('b', b'2', None, ())
+    with sqlite3.connect(sqlite_path) as conn:
+        conn.execute("UPDATE cache_entries SET accessed_at = accessed_at - 3600 WHERE key = 'a'")
+    assert store.get('a') == b'1'
+    store.set('c', b'3', None, ())
+
+    assert store.get('a') == b'1'
+    assert store.get('b') is None
+    assert store.evictions == 1
+
+
+def test_sqlite_hits_skip_recent_access_update(sqlite_path, monkeypatch):
+    store = SQLiteStore(sqlite_path, 'yuno:summary')
+    store.set('k', b'v', 600, ())
+    statements = []
+    store._conn().set_trace_callback(statements.append)
+
+    assert store.get('k') == b'v'
+    assert not any(s.lstrip().upper().startswith('UPDATE') for s in statements)
+
+    monkeypatch.setattr(cache_backends, 'ACCESS_TOUCH_INTERVAL', 0.0)
+    assert store.get('k') == b'v'
+    assert any(s.lstrip().upper().startswith('UPDATE') for s in statements)
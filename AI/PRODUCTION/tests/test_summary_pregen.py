@@ -0,0 +1,170 @@
+"""
+summary_pregen 테스트
+StubSummaryClient로 사전 생성을 돌려 세그먼트 정규화, 호출 예산, /api/summary 저장소 조회를 확인
+"""
+
+import asyncio
+import time
+import types
+
+import httpx
+import pytest
+
+from cache import TTLCache
+from summary_pregen import (
+    RateLimiter, StubSummaryClient, SummaryStore, build_summary_prompt, gemini_generator,
+    persona_segment, policy_summary_fields, prompt_hash, run_pregeneration, segment_user_info
+)
+
+
+def make_policy(policy_id, saves, description="청년 지원 정책"):
+    return {
+        "id": policy_id,
+        "plcyNm": f"정책 {policy_id}",
+        "plcyExplnCn": description,
+        "bscPlanPlcyWayNoNm": "일자리",
+        "saves": saves
+    }
+
+
+@pytest.fixture
+def policies():
+    return [make_policy('p1', 10), make_policy('p2', 50), make_policy('p3', 0)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SummaryStore(str(tmp_path / 'summaries.db'))
+
+
+def test_equivalent_profiles_share_a_segment():
+    # 같은 나이대 + 같은 대표 관심 분야면 전공/관심사 조합이 달라도 같은 키
+    assert persona_segment(20, ['창업']) == persona_segment(24, ['일자리', '주거']) == '20-24:일자리'
+    assert persona_segment(25, ['학비']) == persona_segment(29, ['장학금', '문화']) == '25-29:교육'
+    assert persona_segment(None, []) == persona_segment(None, ['게임']) == 'all:general'
+    assert persona_segment(24, ['취업']) != persona_segment(25, ['취업'])
+    assert persona_segment(24, ['취업']) != persona_segment(24, ['주거'])
+
+
+def test_pregeneration_covers_top_policies_once_per_segment(policies, store):
+    client = StubSummaryClient(delay=0)
+    segments = [persona_segment(22, ['취업']), persona_segment(31, ['대출'])]
+
+    stats = asyncio.run(run_pregeneration(
+        policies, store, gemini_generator(client), segments=segments, top_n=2, rate_per_minute=0
+    ))
+
+    assert stats["planned"] == stats["generated"] == 4
+    assert client.calls == 4
+    assert len(store) == 4
+    # 조회수 상위 2개만 생성, 세그먼트 안의 다른 프로필도 같은 저장 항목을 조회
+    prompt = build_summary_prompt(policy_summary_fields(policies[1]), segment_user_info(segments[0]))
+    assert store.get('p2', persona_segment(20, ['창업', '교육']), prompt_hash(prompt)).startswith('정책 p2 요약')
+    assert not store.has('p3', segments[0], prompt_hash(prompt))
+
+
+def test_rate_limiter_spaces_calls():
+    async def run():
+        limiter = RateLimiter(600)  # 0.1초 간격
+        times = []
+
+        async def call():
+            await limiter.acquire()
+            times.append(time.monotonic())
+
+        await asyncio.gather(*(call() for _ in range(5)))
+        return times
+
+    times = sorted(asyncio.run(run()))
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.09
+    assert times[-1] - times[0] >= 0.36
+
+
+def test_pregeneration_stays_within_budget(policies, store):
+    client = StubSummaryClient(delay=0)
+    calls = []
+    generate = gemini_generator(client)
+
+    async def timed(prompt):
+        calls.append(time.monotonic())
+        return await generate(prompt)
+
+    segments = [persona_segment(22, ['취업']), persona_segment(27, ['주거'])]
+    stats = asyncio.run(run_pregeneration(
+        policies, store, timed, segments=segments, top_n=3, rate_per_minute=1200, concurrency=4
+    ))
+
+    # 분당 1200회 = 0.05초 간격, 동시 호출 수와 상관없이 6회는 최소 0.25초에 걸쳐 분산
+    assert stats["generated"] == 6
+    assert calls[-1] - calls[0] >= 0.24
+    assert stats["seconds"] >= 0.24
+
+
+def test_rerun_skips_unchanged_prompts(policies, store):
+    client = StubSummaryClient(delay=0)
+    segments = [persona_segment(22, ['취업'])]
+
+    def run(items):
+        return asyncio.run(run_pregeneration(
+            items, store, gemini_generator(client), segments=segments, top_n=3, rate_per_minute=0
+        ))
+
+    assert run(policies)["generated"] == 3
+    rerun = run(policies)
+    assert rerun["generated"] == 0
+    assert rerun["skipped"] == 3
+    assert client.calls == 3
+
+    # 정책 내용이 바뀌면 프롬프트 해시가 달라져 그 정책만 다시 생성
+    changed = [make_policy('p1', 10, description="지원 내용 변경")] + policies[1:]
+    stats = run(changed)
+    assert stats["generated"] == 1
+    assert stats["skipped"] == 2
+    assert client.calls == 4
+
+
+def test_summary_endpoint_serves_pregenerated_summaries(policies, store, monkeypatch):
+    import main
+
+    client = StubSummaryClient(delay=0)
+    segment = persona_segment(22, ['취업'])
+    asyncio.run(run_pregeneration(
+        policies, store, gemini_generator(client), segments=[segment], top_n=3, rate_per_minute=0
+    ))
+    pregenerated_calls = client.calls
+    by_id = {policy['id']: policy for policy in policies}
+
+    monkeypatch.setattr(main, 'SUMMARY_SEGMENTS', True)
+    monkeypatch.setattr(main, 'summary_store', store)
+    monkeypatch.setattr(main, 'summary_cache', TTLCache('summaries', max_entries=100))
+    monkeypatch.setattr(main, 'gemini_client', client)
+    monkeypatch.setattr(main, 'ai_model', types.SimpleNamespace(get_policy=by_id.get))
+
+    async def post(payload):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as http:
+            response = await http.post('/api/summary', json=payload)
+        assert response.status_code == 200
+        return response.json()
+
+    # 같은 세그먼트의 다른 프로필: 저장소에서 응답 (Gemini 호출 없음)
+    stored = asyncio.run(post({"policy_id": "p2", "user_age": 20, "user_interests": ["창업"]}))
+    assert stored["cached"] is True
+    assert stored["summary"].startswith('정책 p2 요약')
+    assert client.calls == pregenerated_calls
+    assert store.stats()["hits"] == 1
+
+    # 사전 생성하지 않은 세그먼트: 생성 후 저장소에 'online'으로 저장
+    generated = asyncio.run(post({"policy_id": "p2", "user_age": 33, "user_interests": ["주거"]}))
+    assert generated["cached"] is False
+    assert client.calls == pregenerated_calls + 1
+    assert store.stats()["by_source"] == {"pregen": 3, "online": 1}
+
+    # 재실행: 저장소에 있는 요약은 건너뜀
+    rerun = asyncio.run(run_pregeneration(
+        policies, store, gemini_generator(client), segments=[segment, persona_segment(33, ['주거'])],
+        top_n=3, rate_per_minute=0
+    ))
+    assert rerun["skipped"] == 4
+    assert rerun["generated"] == 2
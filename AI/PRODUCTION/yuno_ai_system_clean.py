@@ -4,131 +4,817 @@ Yuno 팀과 완벽 호환되는 AI 추천 시스템 (이모지 제거)
 
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.decomposition import TruncatedSVD
 from datetime import datetime
+import hashlib
 import json
+import logging
+import os
 import random
+import threading
+import time
+
+from cache import TTLCache
+from collaborative import CollaborativeModel, InteractionLog
+from eligibility_index import ApplicationWindowIndex, EligibilityIndex, application_windows, today_kst
+from embedding_store import EmbeddingStore
+from lexical_index import LexicalIndex, lexical_text
+from metrics import stage
+from policy_ingest import load_policy_csv
+from policy_table import PolicyTable
+from quantization import EMBEDDING_PRECISIONS, QuantizedEmbeddings, as_float32, batch_similarities, quantize_embeddings
+from retrieval import build_retriever, embeddings_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# 관심사 -> 보너스 카테고리 (해당 카테고리 정책은 유사도 1.3배)
+INTEREST_CATEGORY_BONUS = [
+    (['취업', '창업', '일자리'], '일자리'),
+    (['장학금', '교육', '학비'], '교육'),
+    (['문화', '여가', '복지'], '복지문화'),
+    (['주거', '집', '청약', '임대'], '주거'),
+    (['대출', '금융', '자금', '융자'], '생활금융'),
+]
+CATEGORY_BONUS = 1.3
+
+# 마감 임박 정책 보너스 기본값 (deadline_boost_days일 안에 마감되는 정책 점수 배수)
+DEADLINE_BONUS = 1.1
+
+# 랜덤 선택 전 후보 개수
+CANDIDATE_COUNT = 10
+
+# 저장된 전체 순위에서 다시 뽑기(새로고침) 시 후보로 쓰는 상위 개수
+SAMPLE_POOL = 30
+
+# 근사 검색(ivf) 시 자격 조건을 만족하는 최소 후보 수 (카테고리 보너스 재정렬 여유분)
+MIN_RETRIEVAL_CANDIDATES = 100
+
+# 일괄 추천 시 한 번에 유사도 행렬을 계산할 사용자 수
+BATCH_CHUNK_SIZE = 256
+
+# 공유 카탈로그 파일 (policy_table의 records.bin/offsets.npy와 같은 디렉토리)
+CATALOG_META_FILE = 'meta.json'
+CATALOG_EMBEDDINGS_FILE = 'embeddings.npy'
+CATALOG_QUANTIZED_FILE = 'embeddings_quantized.npy'
+CATALOG_SCALES_FILE = 'embedding_scales.npy'
+CATALOG_CATEGORY_FILE = 'category_codes.npy'
+CATALOG_REGION_FILE = 'region_codes.npy'
+CATALOG_AGE_FILE = 'age_bounds.npy'
+CATALOG_WINDOW_FILE = 'application_windows.npy'
+
+# 문장 인코더 백엔드 (torch: SentenceTransformer, onnx: onnxruntime으로 내보낸 그래프 실행)
+ENCODER_BACKENDS = ('torch', 'onnx')
+
+# 어휘(BM25) 검색 사용 방식
+# off: 사용 안 함, fallback: 임베딩이 없을 때 카테고리 점수 대신 BM25, hybrid: 임베딩 유사도와 BM25 가중 합산
+LEXICAL_MODES = ('off', 'fallback', 'hybrid')
+
+
+def normalize_query(user_query):
+    """쿼리 임베딩 캐시 키용 정규화 (공백 정리)"""
+    return ' '.join(str(user_query).split())
+
+
+def ranking_hash(text, category, region, age_min, age_max, window_start=float('nan'), window_end=float('nan')):
+    """정책 순위 입력(임베딩 텍스트/카테고리/지역/나이 조건/신청기간) 해시 - 바뀌면 다른 사용자의 추천 순위도 바뀔 수 있음"""
+    payload = json.dumps(
+        [text, category, region, float(age_min), float(age_max), float(window_start), float(window_end)],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CatalogSnapshot:
+    """
+    로딩된 정책 카탈로그 (정책 테이블 + 추천 점수 계산용 배열/인덱스)
+    재로딩 시 새 스냅샷을 모두 만든 뒤 참조 하나만 교체하므로, 처리 중인 요청은 시작할 때 잡은 스냅샷을 끝까지 사용
+
+    Args:
+        policy_table: 정책 레코드 테이블
+        policy_ids: 정책 ID 리스트 (테이블 순서)
+        category_codes, category_names: 정책별 카테고리 정수 코드, 코드 -> 카테고리명
+        region_codes, region_names: 정책별 담당기관 정수 코드, 코드 -> 담당기관명
+        age_bounds: 정책별 (age_min, age_max), 조건 없으면 NaN
+        embeddings: 정책 임베딩 (공유 카탈로그에서는 정규화된 memory-map, 양자화 저장 시 None)
+        normalized_embeddings: 점수 계산용 정규화 임베딩 - float32 배열 또는 QuantizedEmbeddings
+                               (None이면 키워드 기반 점수)
+        ranking_hashes: 정책별 ranking_hash
+        eligibility_index: 지역/나이 자격 인덱스
+        retriever: 후보 검색 백엔드 (임베딩 없으면 None)
+        float_embeddings: 정규화된 float32 임베딩 (양자화 시 재정렬/공유 카탈로그 저장용, 가능하면 memory-map)
+        lexical_index: 정책 텍스트 BM25 역색인 (어휘 검색을 쓰지 않으면 None)
+        application_windows: 정책별 (신청 시작일, 마감일) 1970-01-01부터의 일수, 조건 없으면 NaN
+        window_index: 신청기간 인덱스
+    """
+
+    def __init__(self, policy_table, policy_ids, category_codes, category_names, region_codes, region_names,
+                 age_bounds, embeddings, normalized_embeddings, ranking_hashes, eligibility_index, retriever,
+                 float_embeddings=None, lexical_index=None, application_windows=None, window_index=None):
+        self.policy_table = policy_table
+        self.policy_ids = list(policy_ids)
+        self.category_codes = category_codes
+        self.category_names = list(category_names)
+        self.region_codes = region_codes
+        self.region_names = list(region_names)
+        self.age_bounds = age_bounds
+        self.embeddings = embeddings
+        self.normalized_embeddings = normalized_embeddings
+        self.ranking_hashes = list(ranking_hashes)
+        self.eligibility_index = eligibility_index
+        self.retriever = retriever
+        if float_embeddings is None and not isinstance(normalized_embeddings, QuantizedEmbeddings):
+            float_embeddings = normalized_embeddings
+        self.float_embeddings = float_embeddings
+        self.lexical_index = lexical_index
+        self.application_windows = application_windows
+        self.window_index = window_index
+
+        # 정책 ID -> 위치 (중복 ID는 먼저 나온 정책 사용)
+        self.positions = {}
+        for idx, policy_id in enumerate(self.policy_ids):
+            self.positions.setdefault(policy_id, idx)
+
+        self._content_hashes = None
+        self._fingerprint = None
+
+    @property
+    def size(self):
+        return len(self.policy_table)
+
+    @property
+    def rerank_embeddings(self):
+        """상위 후보 재정렬용 float32 임베딩 (양자화하지 않았거나 float32 원본이 없으면 None)"""
+        if isinstance(self.normalized_embeddings, QuantizedEmbeddings):
+            return self.float_embeddings
+        return None
+
+    @property
+    def fingerprint(self):
+        """정책 순서 + 순위 입력 해시 (저장된 순위 인덱스가 이 카탈로그에서 유효한지 확인용, 처음 호출 시 계산)"""
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for policy_id, ranking in zip(self.policy_ids, self.ranking_hashes):
+                digest.update(f"{policy_id}\0{ranking}\n".encode('utf-8'))
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def content_hashes(self):
+        """정책 ID -> 레코드 내용 해시 (정책 변경 감지용, 처음 호출 시 계산)"""
+        if self._content_hashes is None:
+            self._content_hashes = {
+                policy_id: self.policy_table.content_hash(idx)
+                for idx, policy_id in enumerate(self.policy_ids)
+            }
+        return self._content_hashes
+
 
 class YunoAI:
-    def __init__(self):
+    def __init__(self, model_name=MODEL_NAME, cache_dir=None, retrieval='exact', ivf_lists=None, ivf_probe=8,
+                 query_cache_size=4096, query_cache=None, embedding_precision='float32', rerank_candidates=0,
+                 encoder='torch', onnx_model_dir=None, onnx_quantized=False, onnx_threads=0, csv_chunk_rows=0,
+                 lexical='fallback', lexical_weight=0.3, cf_weight=0.2, cf_components=16, cf_refit_events=1000,
+                 application_window=True, deadline_boost_days=0, deadline_bonus=DEADLINE_BONUS, load_encoder=True):
+        """
+        Args:
+            model_name: SentenceTransformer 모델명
+            cache_dir: 정책 임베딩/검색 인덱스 캐시 디렉토리 (None이면 캐시 사용 안 함)
+            retrieval: 후보 검색 백엔드 ('exact' 전수 검색, 'ivf' 근사 검색)
+            ivf_lists: IVF 클러스터 수 (None이면 sqrt(정책 수))
+            ivf_probe: IVF 탐색 클러스터 수 (클수록 정확, 느림)
+            query_cache_size: 사용자 쿼리 임베딩 LRU 캐시 크기 (0이면 사용 안 함)
+            query_cache: 쿼리 임베딩 캐시 객체 (워커 간 공유 캐시 등, None이면 프로세스 내 LRU)
+            embedding_precision: 점수 계산용 정책 임베딩 저장 정밀도 ('float32', 'float16', 'int8' 벡터별 스케일)
+            rerank_candidates: 양자화 시 양자화 점수 상위 N개를 float32 임베딩으로 다시 계산 (0이면 사용 안 함)
+            encoder: 문장 인코더 백엔드 ('torch', 'onnx')
+            onnx_model_dir: ONNX 모델 디렉토리 (None이면 <cache_dir>/onnx, 없으면 시작 시 내보내기)
+            onnx_quantized: ONNX 동적 int8 양자화 모델 사용 여부
+            onnx_threads: ONNX Runtime intra-op 스레드 수 (0이면 물리 코어 수)
+            csv_chunk_rows: 정책 CSV를 이 행 수씩 나눠 읽고 변환 (0이면 파일 전체를 한 번에)
+            lexical: 어휘(BM25) 검색 사용 방식 ('off', 'fallback' 임베딩 없을 때만, 'hybrid' 임베딩 점수와 결합)
+            lexical_weight: hybrid에서 BM25 점수 가중치 (0~1, 나머지는 코사인 유사도)
+            cf_weight: 협업 필터링 점수(사용자-정책 요인 코사인) 가중치 (0이면 사용 안 함)
+            cf_components: 협업 필터링 요인 차원 수
+            cf_refit_events: 마지막 전체 학습 이후 이벤트가 이만큼 쌓이면 정책 요인까지 다시 학습
+            application_window: 신청 시작 전/마감된 정책을 후보에서 제외 (한국 시간 오늘 기준)
+            deadline_boost_days: 이 일수 안에 마감되는 정책에 deadline_bonus 배수 적용 (0이면 사용 안 함)
+            deadline_bonus: 마감 임박 정책 점수 배수
+            load_encoder: False면 문장 인코더(torch) 로딩을 미룸 - 카탈로그는 어휘 검색으로 먼저 서비스하고
+                          나중에 load_encoder() 후 load_real_data로 임베딩 준비 (빠른 시작)
+        """
         print("Yuno 호환 AI 시스템 초기화 중...")
 
-        try:
-            self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-            print("BERT 모델 로딩 완료")
-        except:
-            print("BERT 모델 로딩 실패 - 키워드 매칭으로 대체")
-            self.model = None
-
-        self.policies_data = None
-        self.policy_embeddings = None
-        self.user_item_matrix = None
+        if embedding_precision not in EMBEDDING_PRECISIONS:
+            raise ValueError(f"Unknown embedding precision: {embedding_precision} (choose from {EMBEDDING_PRECISIONS})")
+        if encoder not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder backend: {encoder} (choose from {ENCODER_BACKENDS})")
+        if lexical not in LEXICAL_MODES:
+            raise ValueError(f"Unknown lexical mode: {lexical} (choose from {LEXICAL_MODES})")
+        if not 0 <= lexical_weight <= 1:
+            raise ValueError(f"lexical_weight must be between 0 and 1: {lexical_weight}")
+
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.retrieval = retrieval
+        self.ivf_lists = ivf_lists
+        self.ivf_probe = ivf_probe
+        self.embedding_precision = embedding_precision
+        self.rerank_candidates = rerank_candidates
+        self.csv_chunk_rows = csv_chunk_rows
+        self.lexical = lexical
+        self.lexical_weight = lexical_weight
+        self.cf_weight = cf_weight
+        self.cf_components = cf_components
+        self.cf_refit_events = cf_refit_events
+        self.application_window = application_window
+        self.deadline_boost_days = deadline_boost_days
+        self.deadline_bonus = deadline_bonus
+        if query_cache is None:
+            query_cache = TTLCache('query_embeddings', max_entries=query_cache_size)
+        self.query_cache = query_cache
+
+        self.model = None
+        self._onnx_options = (onnx_model_dir or os.path.join(cache_dir or '.', 'onnx'), onnx_quantized, onnx_threads)
+        self._set_encoder(encoder)
+
+        # 협업 필터링: 사용자 x 정책 상호작용 로그, 학습된 요인 스냅샷 (refresh_collaborative에서 교체)
+        self.user_item_matrix = InteractionLog()
         self.svd_model = None
+        self._cf_lock = threading.Lock()
+        self.last_cf_refresh = None
+
+        # 정책 카탈로그 스냅샷 (load_real_data/attach_catalog에서 생성 후 교체)
+        self._catalog = self._build_catalog(
+            PolicyTable.from_records([]), [], [], [], [], [], np.zeros((0, 2)), None, None, []
+        )
+        # 로딩은 한 번에 하나만 (재로딩 스레드와 시작 로딩이 겹치지 않도록)
+        self._load_lock = threading.RLock()
+        self.last_reload = None
+
+        # 정책 데이터 재로딩 시 호출할 콜백
+        self._reload_listeners = []
+
+        if load_encoder:
+            self.load_encoder()
+
+    def load_encoder(self):
+        """
+        문장 인코더 로딩 (torch 인코더는 torch/sentence_transformers import 포함 수십 초)
+        실패하면 키워드(BM25) 매칭으로 계속 동작
+
+        Returns:
+            인코더 로딩 성공 여부
+        """
+        model = None
+        encoder = self.encoder
+        if encoder == 'onnx':
+            model = self._load_onnx_encoder(*self._onnx_options)
+        if model is None:
+            encoder = 'torch'
+            try:
+                # torch는 torch 인코더를 쓸 때만 import (ONNX 인코더는 시작 시간/메모리 절약)
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(self.model_name)
+                print("BERT 모델 로딩 완료")
+            except:
+                print("BERT 모델 로딩 실패 - 키워드 매칭으로 대체")
+                model = None
+        with self._load_lock:
+            self._set_encoder(encoder)
+            self.model = model
+        return model is not None
+
+    def _set_encoder(self, encoder):
+        """인코더 백엔드 설정 (인코더별로 임베딩 값이 조금씩 다르므로 정책 임베딩 캐시/공유 카탈로그를 인코더별로 구분)"""
+        self.encoder = encoder
+        self.encoder_id = self.model_name
+        if encoder == 'onnx':
+            self.encoder_id = f"{self.model_name}-onnx-int8" if self._onnx_options[1] else f"{self.model_name}-onnx"
+        self.embedding_store = EmbeddingStore(self.cache_dir, self.encoder_id) if self.cache_dir else None
+
+    def _load_onnx_encoder(self, model_dir, quantized, threads):
+        """ONNX 인코더 로딩 (실패하면 None - torch 인코더로 대체)"""
+        try:
+            from onnx_encoder import load_onnx_encoder
+            encoder = load_onnx_encoder(self.model_name, model_dir, quantized=quantized, threads=threads)
+            print(f"ONNX 인코더 로딩 완료: {model_dir} ({'int8' if quantized else 'float32'})")
+            return encoder
+        except Exception as e:
+            print(f"[WARNING] ONNX 인코더 로딩 실패 - torch 인코더로 대체: {e}")
+            return None
+
+    def add_reload_listener(self, listener):
+        """
+        정책 데이터 재로딩으로 바뀐 정책이 있을 때 호출할 콜백 등록 (캐시 무효화용)
+        listener(changed_ids, ranking_changed)
+            changed_ids: 추가/변경/삭제된 정책 ID 집합
+            ranking_changed: 정책 추가 또는 순위 입력(임베딩 텍스트/카테고리/지역/나이) 변경 여부
+                             False면 바뀐 정책이 포함된 결과만 무효화하면 됨
+        """
+        self._reload_listeners.append(listener)
+
+    @property
+    def catalog(self):
+        """현재 정책 카탈로그 스냅샷"""
+        return self._catalog
+
+    @property
+    def policy_table(self):
+        return self._catalog.policy_table
+
+    @property
+    def policy_embeddings(self):
+        return self._catalog.embeddings
+
+    @property
+    def policy_count(self):
+        return self._catalog.size
+
+    @property
+    def policies_data(self):
+        """정책 레코드 DataFrame (분석/디버깅용, 호출할 때마다 테이블에서 새로 생성)"""
+        return pd.DataFrame(list(self._catalog.policy_table.records()))
+
+    def has_policy(self, policy_id):
+        """정책 ID 존재 여부 (레코드를 역직렬화하지 않음)"""
+        return str(policy_id) in self._catalog.positions
+
+    def get_policy(self, policy_id):
+        """정책 ID -> 정책 레코드 dict (없으면 None), ID 해시 인덱스로 상수 시간 조회"""
+        catalog = self._catalog
+        idx = catalog.positions.get(str(policy_id))
+        return None if idx is None else catalog.policy_table.record(idx)
+
+    def add_interactions(self, events):
+        """사용자-정책 상호작용 이벤트 추가 (요인은 refresh_collaborative에서 갱신)"""
+        return self.user_item_matrix.add(events)
+
+    def refresh_collaborative(self, full=False):
+        """
+        협업 필터링 요인 갱신
+        처음이거나 full이거나 이벤트가 cf_refit_events 이상 쌓였으면 전체 재학습,
+        아니면 새 이벤트가 들어온 사용자만 fold-in (사용자당 희소 행 x 성분 행렬 곱 한 번)
+
+        Returns:
+            갱신 요약 (갱신할 것이 없으면 None)
+        """
+        with self._cf_lock:
+            log = self.user_item_matrix
+            model = self.svd_model
+            version = (model.version if model else 0) + 1
+            dirty_users = log.take_dirty_users()
+            start = time.perf_counter()
+
+            if model is None or full or log.pending_events >= self.cf_refit_events:
+                pending = log.reset_pending()
+                refreshed = CollaborativeModel.fit(log, self.cf_components, version)
+                mode, users = 'fit', log.shape[0]
+                if refreshed is None:
+                    # 학습할 데이터가 부족하면 다음 갱신 때 다시 시도
+                    log.restore_pending(pending)
+            elif dirty_users:
+                refreshed = model.fold_in(log, dirty_users, version)
+                mode, users = 'fold_in', len(dirty_users)
+            else:
+                return None
+
+            if refreshed is None:
+                return None
+            self.svd_model = refreshed
+            self.last_cf_refresh = {
+                "mode": mode,
+                "users": users,
+                "version": version,
+                "seconds": round(time.perf_counter() - start, 4),
+                "timestamp": datetime.now().isoformat()
+            }
+            return self.last_cf_refresh
+
+    def personalization_key(self, user_id):
+        """
+        사용자 요인 내용 해시 (추천 캐시 키용, 개인화 점수가 적용되지 않는 사용자는 None)
+        워커마다 갱신 시점이 달라도 같은 요인일 때만 키가 같아 공유 캐시에서 다른 워커의 이전 결과를 쓰지 않음
+        """
+        model = self.svd_model
+        if self.cf_weight <= 0 or model is None:
+            return None
+        factor_key = model.factor_key(user_id)
+        return None if factor_key is None else f"cf{factor_key}"
+
+    def ranking_engine(self, catalog=None):
+        """
+        현재 점수 계산 방식 ('embedding': BERT 임베딩, 'lexical': BM25 어휘 검색, 'keyword': 관심 카테고리 점수)
+        빠른 시작 중이거나 인코더 로딩에 실패하면 embedding이 아님 (캐시 키/준비 상태 표시용)
+        """
+        catalog = self._catalog if catalog is None else catalog
+        if self.model is not None and catalog.retriever is not None:
+            return 'embedding'
+        if self.lexical != 'off' and catalog.lexical_index is not None:
+            return 'lexical'
+        return 'keyword'
+
+    def ranking_day(self):
+        """추천 결과가 달라지는 기준 날짜 (한국 시간 오늘, 신청기간 필터/마감 보너스를 쓰지 않으면 None)"""
+        if self.application_window or self.deadline_boost_days > 0:
+            return today_kst()
+        return None
+
+    def application_window_stats(self):
+        catalog = self._catalog
+        day = today_kst()
+        return {
+            "filter": self.application_window,
+            "deadline_boost_days": self.deadline_boost_days,
+            "dated_policies": catalog.window_index.dated,
+            "open_today": int(np.count_nonzero(catalog.window_index.open_mask(day))),
+            "closing_soon": int(np.count_nonzero(catalog.window_index.closing_mask(day, self.deadline_boost_days)))
+            if self.deadline_boost_days > 0 else None
+        }
+
+    def collaborative_stats(self):
+        log = self.user_item_matrix
+        model = self.svd_model
+        users, policies = log.shape
+        return {
+            "weight": self.cf_weight,
+            "events": log.events,
+            "pending_events": log.pending_events,
+            "skipped_events": log.skipped_events,
+            "users": users,
+            "policies": policies,
+            "components": model.n_components if model else None,
+            "version": model.version if model else None,
+            "last_refresh": self.last_cf_refresh
+        }
+
+    def _notify_reload(self, previous, current):
+        """
+        이전 카탈로그와 비교해 바뀐 정책 ID를 콜백에 전달
+
+        Returns:
+            변경 요약 (추가/변경/삭제 정책 수, 순위 입력 변경 여부)
+        """
+        old_hashes = previous.content_hashes()
+        new_hashes = current.content_hashes()
+
+        added = new_hashes.keys() - old_hashes.keys()
+        removed = old_hashes.keys() - new_hashes.keys()
+        modified = {
+            policy_id for policy_id in new_hashes.keys() & old_hashes.keys()
+            if old_hashes[policy_id] != new_hashes[policy_id]
+        }
+
+        # 삭제된 정책은 그 정책이 포함된 결과만 무효화하면 되지만, 추가/순위 입력 변경은 모든 순위에 영향
+        old_ranking = dict(zip(previous.policy_ids, previous.ranking_hashes))
+        new_ranking = dict(zip(current.policy_ids, current.ranking_hashes))
+        ranking_changed = bool(added) or any(
+            old_ranking.get(policy_id) != new_ranking.get(policy_id) for policy_id in modified
+        )
+
+        summary = {
+            "total": current.size,
+            "added": len(added),
+            "removed": len(removed),
+            "modified": len(modified),
+            "ranking_changed": ranking_changed,
+            "loaded_at": datetime.now().isoformat()
+        }
+
+        changed_ids = added | removed | modified
+        # 최초 로딩은 무효화할 캐시가 없으므로 알리지 않음
+        if not old_hashes or not changed_ids:
+            return summary
+
+        print(f"정책 변경 감지: 추가 {len(added)}개, 변경 {len(modified)}개, 삭제 {len(removed)}개")
+        for listener in self._reload_listeners:
+            try:
+                listener(changed_ids, ranking_changed)
+            except Exception as e:
+                print(f"[WARNING] 정책 재로딩 콜백 실패: {e}")
+        return summary
 
     def load_real_data(self, csv_path='real_policies_final.csv'):
-        """실제 온통청년 API 데이터 로딩 및 팀 형식으로 변환"""
+        """
+        실제 온통청년 API 데이터 로딩 및 팀 형식으로 변환
+        재로딩 시에도 새 카탈로그를 모두 만든 뒤 교체하므로 처리 중인 요청을 막지 않음 (백그라운드 스레드에서 호출 가능)
+
+        Returns:
+            이전 카탈로그 대비 변경 요약 (재로딩 실패로 기존 카탈로그를 유지하면 None)
+        """
+        with self._load_lock:
+            catalog = self.prepare_catalog(csv_path)
+            return None if catalog is None else self.install_catalog(catalog)
+
+    def prepare_catalog(self, csv_path):
+        """
+        CSV -> 새 카탈로그 스냅샷 (현재 카탈로그는 그대로 둠, 임베딩 캐시에 없는 정책만 BERT 인코딩)
+        새 정책 데이터를 읽지 못했는데 이미 로딩된 카탈로그가 있으면 None (빈 카탈로그로 교체되지 않도록)
+        """
+        with self._load_lock:
+            policies, age_bounds, policy_texts = self._read_policies(csv_path)
+            if not policies and self._catalog.size > 0:
+                print("[WARNING] 새 정책 데이터를 읽지 못해 기존 카탈로그를 유지합니다")
+                return None
+            return self._build_loaded_catalog(policies, age_bounds, policy_texts)
+
+    def install_catalog(self, catalog):
+        """새 카탈로그 스냅샷으로 교체 (참조 하나만 바꾸므로 처리 중인 요청은 영향 없음) 후 변경 알림"""
+        with self._load_lock:
+            previous = self._catalog
+            self._catalog = catalog
+            self.last_reload = self._notify_reload(previous, catalog)
+            return self.last_reload
+
+    def _read_policies(self, csv_path):
+        """CSV -> 팀 백엔드 API 형식 정책 리스트, 정책별 (age_min, age_max), 정책 임베딩 텍스트"""
         try:
-            # CSV 로딩
-            df = pd.read_csv(csv_path, encoding='utf-8-sig')
-            df['id'] = df['id'].astype(str)
-            print(f"전체 데이터 로딩: {len(df)}개 정책")
-
-            # 팀 백엔드 API 형식으로 변환
-            policies = []
-            for _, row in df.iterrows():
-                # Requirements 생성
-                requirements = []
-                age_min = row.get('age_min', '')
-                age_max = row.get('age_max', '')
-                if pd.notna(age_min) and pd.notna(age_max):
-                    requirements.append(f"만 {int(age_min)}세~{int(age_max)}세")
-
-                qualification = row.get('qualification', '')
-                if pd.notna(qualification) and str(qualification).strip():
-                    qual_text = str(qualification)[:50]  # 첫 50자만
-                    requirements.append(qual_text)
-
-                # 신청기간 파싱
-                app_period = str(row.get('application_period', ''))
-                aply_prd_se_cd = "상시" if "상시" in app_period else "기간"
-                aply_prd_end_ymd = None
-                biz_prd_bgng_ymd = None
-                biz_prd_end_ymd = None
-
-                if '~' in app_period:
-                    parts = app_period.split('~')
-                    if len(parts) == 2:
-                        # 시작일 파싱
-                        start_date = parts[0].strip().replace('.', '').replace('-', '')[:8]
-                        if start_date.isdigit() and len(start_date) == 8:
-                            biz_prd_bgng_ymd = start_date
-
-                        # 종료일 파싱
-                        end_date = parts[1].strip().replace('.', '').replace('-', '')[:8]
-                        if end_date.isdigit() and len(end_date) == 8:
-                            aply_prd_end_ymd = end_date
-                            biz_prd_end_ymd = end_date
-
-                policy_dict = {
-                    "id": str(row.get('id', '')),
-                    "plcyNm": str(row.get('title', '')),
-                    "bscPlanPlcyWayNoNm": str(row.get('category_major', '')),
-                    "plcyExplnCn": str(row.get('description', '')),
-                    "rgtrupInstCdNm": str(row.get('supervisor', '전국')),
-                    "aplyPrdSeCd": aply_prd_se_cd,
-                    "aplyPrdEndYmd": aply_prd_end_ymd,
-                    "bizPrdBgngYmd": biz_prd_bgng_ymd,
-                    "bizPrdEndYmd": biz_prd_end_ymd,
-                    "applicationUrl": str(row.get('reference_url', '')),
-                    "requirements": requirements if requirements else ["청년 대상"],
-                    "saves": int(row.get('view_count', 0)) if pd.notna(row.get('view_count')) else 0,
-                    "isBookmarked": False,
-                    # 추가 정보 (검색에 활용)
-                    "support_content": str(row.get('support_content', '')),
-                    "keywords": str(row.get('keywords', '')),
-                    "category_minor": str(row.get('category_minor', ''))
-                }
-                policies.append(policy_dict)
-
-            self.policies_data = pd.DataFrame(policies)
-            print(f"{len(policies)}개 실제 정책 데이터 변환 완료")
+            # 열 단위 벡터화 변환 (csv_chunk_rows > 0이면 청크 단위로 읽음)
+            policies, age_bounds, policy_texts = load_policy_csv(csv_path, self.csv_chunk_rows)
+            print(f"전체 데이터 로딩: {len(policies)}개 정책 변환 완료")
 
         except FileNotFoundError:
             print(f"[ERROR] {csv_path} 파일을 찾을 수 없습니다!")
-            self.policies_data = pd.DataFrame()
+            policies, age_bounds, policy_texts = [], [], []
         except Exception as e:
             print(f"[ERROR] 데이터 로딩 실패: {e}")
-            self.policies_data = pd.DataFrame()
+            policies, age_bounds, policy_texts = [], [], []
+
+        return policies, age_bounds, policy_texts
+
+    @staticmethod
+    def _policy_text(policy):
+        """정책 임베딩용 텍스트: 정책명 + 설명 + 카테고리 + 지원내용 + 키워드"""
+        text_parts = [
+            str(policy.get('plcyNm', '')),
+            str(policy.get('plcyExplnCn', '')),
+            str(policy.get('bscPlanPlcyWayNoNm', '')),
+            str(policy.get('category_minor', '')),
+            str(policy.get('support_content', ''))[:200],  # 지원내용 앞부분
+            str(policy.get('keywords', ''))
+        ]
+        return ' '.join([t for t in text_parts if t and t != 'nan'])
+
+    def _build_loaded_catalog(self, policies, age_bounds, policy_texts=None):
+        """정책 리스트 -> 카탈로그 스냅샷 (임베딩 캐시에 없는 정책만 BERT 인코딩)"""
+        if policy_texts is None:
+            policy_texts = [self._policy_text(policy) for policy in policies]
 
         # BERT 임베딩 생성
-        if self.model and len(self.policies_data) > 0:
-            policy_texts = []
-            for _, policy in self.policies_data.iterrows():
-                # 정책명 + 설명 + 카테고리 + 지원내용 + 키워드
-                text_parts = [
-                    str(policy.get('plcyNm', '')),
-                    str(policy.get('plcyExplnCn', '')),
-                    str(policy.get('bscPlanPlcyWayNoNm', '')),
-                    str(policy.get('category_minor', '')),
-                    str(policy.get('support_content', ''))[:200],  # 지원내용 앞부분
-                    str(policy.get('keywords', ''))
-                ]
-                text = ' '.join([t for t in text_parts if t and t != 'nan'])
-                policy_texts.append(text)
-
-            print(f"BERT 임베딩 생성 중... ({len(policy_texts)}개 정책)")
-            self.policy_embeddings = self.model.encode(policy_texts, show_progress_bar=True)
-            print(f"BERT 임베딩 생성 완료: {self.policy_embeddings.shape}")
-
-    def get_recommendations(self, user_profile, top_k=3):
+        embeddings = None
+        if self.model and len(policies) > 0:
+            if self.embedding_store:
+                # 캐시에 없는(새로 추가/변경된) 정책만 인코딩
+                embeddings = self.embedding_store.encode(policy_texts, self._encode_policy_texts)
+            else:
+                embeddings = self._encode_policy_texts(policy_texts)
+            print(f"BERT 임베딩 준비 완료: {embeddings.shape}")
+
+        categories = [policy['bscPlanPlcyWayNoNm'] for policy in policies]
+        regions = [policy['rgtrupInstCdNm'] for policy in policies]
+        category_codes, category_names = pd.factorize(pd.Series(categories, dtype=object))
+        region_codes, region_names = pd.factorize(pd.Series(regions, dtype=object))
+        age_bounds = np.asarray(age_bounds, dtype=np.float64).reshape(-1, 2)
+        windows = application_windows(policies)
+
+        normalized_embeddings = self._normalize_embeddings(embeddings, len(policies))
+        float_embeddings = None
+        if self.embedding_precision != 'float32':
+            # 양자화 시 float32 원본은 프로세스 메모리에 두지 않음 (재정렬/공유 카탈로그 저장용으로만 유지)
+            float_embeddings = self._float32_source(normalized_embeddings)
+            embeddings = None
+            normalized_embeddings = quantize_embeddings(normalized_embeddings, self.embedding_precision)
+
+        lexical_index = None
+        if self._needs_lexical_index(normalized_embeddings is not None):
+            lexical_index = self._build_lexical_index(policies)
+
+        return self._build_catalog(
+            PolicyTable.from_records(policies),
+            [policy['id'] for policy in policies],
+            category_codes,
+            list(category_names),
+            region_codes,
+            list(region_names),
+            age_bounds,
+            embeddings,
+            normalized_embeddings,
+            [
+                ranking_hash(text, category, region, age_min, age_max, window_start, window_end)
+                for text, category, region, (age_min, age_max), (window_start, window_end)
+                in zip(policy_texts, categories, regions, age_bounds, windows)
+            ],
+            float_embeddings,
+            lexical_index,
+            windows
+        )
+
+    def _needs_lexical_index(self, has_embeddings):
         """
-        팀 백엔드 API 응답 형식과 100% 일치하는 추천
+        BM25 역색인이 필요한지 (hybrid는 항상, fallback은 임베딩이 없을 때만)
+        인코더가 아직 없으면 (빠른 시작 중 임베딩이 있는 공유 카탈로그에 연결) 쿼리를 인코딩할 수 없으므로 필요
         """
-        print(f"사용자 추천 생성 중: {user_profile}")
+        return self.lexical == 'hybrid' or (
+            self.lexical == 'fallback' and not (has_embeddings and self.model is not None)
+        )
 
-        # 사용자 쿼리 생성 - BERT 모델을 위한 자연어 문장 형식
+    @staticmethod
+    def _build_lexical_index(policies):
+        """정책 리스트 -> BM25 역색인 (실패하면 None, 어휘 점수 없이 동작)"""
+        try:
+            lexical_index = LexicalIndex.build([lexical_text(policy) for policy in policies])
+            print(f"BM25 역색인 생성 완료: {len(lexical_index.terms)}개 n-gram, {lexical_index.nbytes / 1e6:.1f}MB")
+            return lexical_index
+        except Exception as e:
+            print(f"[WARNING] BM25 역색인 생성 실패 - 어휘 점수 없이 동작합니다: {e}")
+            return None
+
+    def _float32_source(self, normalized_embeddings):
+        """
+        양자화 시 보관할 정규화 float32 임베딩
+        캐시 디렉토리가 있으면 파일로 저장 후 읽기 전용 memory-map (재정렬에서 읽는 행만 페이지 캐시에 올라옴),
+        없으면 재정렬을 사용할 때만 메모리에 보관
+        """
+        if normalized_embeddings is None:
+            return None
+        if not self.cache_dir:
+            return normalized_embeddings if self.rerank_candidates > 0 else None
+
+        name = f"normalized_{embeddings_fingerprint(normalized_embeddings)[:16]}.npy"
+        path = os.path.join(self.cache_dir, name)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, normalized_embeddings)
+                os.replace(tmp_path, path)
+                # 이전 카탈로그의 float32 임베딩 정리
+                for old_name in os.listdir(self.cache_dir):
+                    if old_name.startswith('normalized_') and old_name.endswith('.npy') and old_name != name:
+                        os.remove(os.path.join(self.cache_dir, old_name))
+            return np.load(path, mmap_mode='r')
+        except Exception as e:
+            print(f"[WARNING] float32 임베딩 저장 실패 - 메모리에 보관합니다: {e}")
+            return normalized_embeddings
+
+    def _encode_policy_texts(self, policy_texts):
+        """정책 텍스트 BERT 인코딩 (float32)"""
+        print(f"BERT 임베딩 생성 중... ({len(policy_texts)}개 정책)")
+        return np.asarray(self.model.encode(policy_texts, show_progress_bar=True), dtype=np.float32)
+
+    @staticmethod
+    def _normalize_embeddings(embeddings, n):
+        """정규화된 임베딩 (코사인 유사도 = 내적), 정책 수와 맞지 않으면 None"""
+        if embeddings is None or len(embeddings) != n:
+            return None
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def _build_catalog(self, policy_table, policy_ids, category_codes, category_names, region_codes, region_names,
+                       age_bounds, embeddings, normalized_embeddings, ranking_hashes, float_embeddings=None,
+                       lexical_index=None, application_windows=None):
+        """추천 점수 계산용 NumPy 배열과 자격 인덱스/검색 백엔드를 만들어 카탈로그 스냅샷 생성 (로딩 시 1회)"""
+        n = len(policy_ids)
+
+        if n == 0:
+            category_codes = np.zeros(0, dtype=np.int64)
+            region_codes = np.zeros(0, dtype=np.int64)
+
+        # 지역 포스팅 리스트 + 나이 구간 인덱스
+        age_bounds = np.asarray(age_bounds, dtype=np.float64).reshape(-1, 2)
+        if len(age_bounds) != n:
+            age_bounds = np.full((n, 2), np.nan)
+        regions = np.asarray(region_names, dtype=object)[region_codes] if n > 0 else []
+        eligibility_index = EligibilityIndex(regions, age_bounds[:, 0], age_bounds[:, 1])
+
+        # 신청기간 인덱스 (없으면 기간 제한 없음)
+        if application_windows is None or len(application_windows) != n:
+            application_windows = np.full((n, 2), np.nan)
+        application_windows = np.asarray(application_windows, dtype=np.float64).reshape(-1, 2)
+        window_index = ApplicationWindowIndex(application_windows[:, 0], application_windows[:, 1])
+
+        # 후보 검색 백엔드
+        retriever = None
+        if normalized_embeddings is not None:
+            retriever = build_retriever(
+                normalized_embeddings,
+                backend=self.retrieval,
+                cache_dir=self.cache_dir,
+                n_lists=self.ivf_lists,
+                n_probe=self.ivf_probe
+            )
+
+        return CatalogSnapshot(
+            policy_table, policy_ids, category_codes, category_names, region_codes, region_names, age_bounds,
+            embeddings, normalized_embeddings, ranking_hashes, eligibility_index, retriever, float_embeddings,
+            lexical_index, application_windows, window_index
+        )
+
+    def save_catalog(self, directory, catalog=None):
+        """
+        정책 테이블 + 정규화 임베딩 + 점수 계산 배열을 공유 카탈로그 디렉토리로 저장
+        (메타 파일은 마지막에 기록)
+
+        Args:
+            catalog: 저장할 카탈로그 스냅샷 (None이면 현재 카탈로그)
+        """
+        catalog = self._catalog if catalog is None else catalog
+        os.makedirs(directory, exist_ok=True)
+        catalog.policy_table.save(directory)
+
+        np.save(os.path.join(directory, CATALOG_CATEGORY_FILE), np.asarray(catalog.category_codes, dtype=np.int64))
+        np.save(os.path.join(directory, CATALOG_REGION_FILE), np.asarray(catalog.region_codes, dtype=np.int64))
+        np.save(os.path.join(directory, CATALOG_AGE_FILE), np.asarray(catalog.age_bounds, dtype=np.float64))
+        np.save(os.path.join(directory, CATALOG_WINDOW_FILE),
+                np.asarray(catalog.application_windows, dtype=np.float64))
+        precision = 'float32'
+        if catalog.normalized_embeddings is not None:
+            # float32 원본은 항상 저장 (재정렬, 다른 정밀도로 연결하는 워커용)
+            float_embeddings = catalog.float_embeddings
+            if float_embeddings is None:
+                float_embeddings = as_float32(catalog.normalized_embeddings)
+            np.save(os.path.join(directory, CATALOG_EMBEDDINGS_FILE),
+                    np.ascontiguousarray(float_embeddings, dtype=np.float32))
+            if isinstance(catalog.normalized_embeddings, QuantizedEmbeddings):
+                precision = catalog.normalized_embeddings.precision
+                catalog.normalized_embeddings.save(
+                    os.path.join(directory, CATALOG_QUANTIZED_FILE), os.path.join(directory, CATALOG_SCALES_FILE)
+                )
+        if catalog.lexical_index is not None:
+            catalog.lexical_index.save(directory)
+
+        meta = {
+            "model_name": self.model_name,
+            "encoder": self.encoder_id,
+            "count": catalog.size,
+            "has_embeddings": catalog.normalized_embeddings is not None,
+            "precision": precision,
+            "policy_ids": catalog.policy_ids,
+            "category_names": [str(name) for name in catalog.category_names],
+            "region_names": [str(name) for name in catalog.region_names],
+            "ranking_hashes": catalog.ranking_hashes
+        }
+        with open(os.path.join(directory, CATALOG_META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def attach_catalog(self, directory):
+        """
+        저장된 공유 카탈로그를 읽기 전용 memory-map으로 연결
+        임베딩 행렬/정책 테이블은 같은 파일을 여는 모든 워커가 페이지 캐시를 공유하고,
+        프로세스별로는 쿼리 인코더와 작은 자격 인덱스만 보유
+
+        Returns:
+            이전 카탈로그 대비 변경 요약
+        """
+        with open(os.path.join(directory, CATALOG_META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        float_embeddings = None
+        normalized_embeddings = None
+        if meta['has_embeddings']:
+            float_embeddings = np.load(os.path.join(directory, CATALOG_EMBEDDINGS_FILE), mmap_mode='r')
+            normalized_embeddings = float_embeddings
+            if self.embedding_precision != 'float32':
+                if meta.get('precision', 'float32') == self.embedding_precision:
+                    normalized_embeddings = QuantizedEmbeddings.open(
+                        os.path.join(directory, CATALOG_QUANTIZED_FILE), os.path.join(directory, CATALOG_SCALES_FILE)
+                    )
+                else:
+                    # 다른 정밀도로 만든 카탈로그: 워커 메모리에 양자화 (float32 원본은 공유 memory-map 유지)
+                    normalized_embeddings = quantize_embeddings(float_embeddings, self.embedding_precision)
+
+        policy_table = PolicyTable.open(directory)
+        lexical_index = None
+        if self._needs_lexical_index(normalized_embeddings is not None):
+            # 저장된 역색인 memory-map (다른 어휘 설정으로 만든 카탈로그면 이 워커에서 생성)
+            lexical_index = LexicalIndex.open(directory)
+            if lexical_index is None:
+                lexical_index = self._build_lexical_index(list(policy_table.records()))
+
+        with self._load_lock:
+            catalog = self._build_catalog(
+                policy_table,
+                meta['policy_ids'],
+                np.load(os.path.join(directory, CATALOG_CATEGORY_FILE), mmap_mode='r'),
+                meta['category_names'],
+                np.load(os.path.join(directory, CATALOG_REGION_FILE)),
+                meta['region_names'],
+                np.load(os.path.join(directory, CATALOG_AGE_FILE)),
+                float_embeddings if self.embedding_precision == 'float32' else None,
+                normalized_embeddings,
+                meta['ranking_hashes'],
+                float_embeddings,
+                lexical_index,
+                np.load(os.path.join(directory, CATALOG_WINDOW_FILE))
+            )
+            print(f"공유 카탈로그 연결 완료: {directory} ({catalog.size}개 정책)")
+            return self.install_catalog(catalog)
+
+    @staticmethod
+    def _build_user_query(user_profile):
+        """사용자 프로필 -> BERT 모델을 위한 자연어 문장"""
         age = user_profile.get('age', 25)
         gender = user_profile.get('gender', '')
         education = user_profile.get('education', '')
@@ -158,122 +844,351 @@ class YunoAI:
         if location:
             user_query += f" {location} 지역에서 지원 가능한 정책을 원합니다."
 
-        print(f"사용자 쿼리: {user_query}")
-
-        scores = []
-        user_location = user_profile.get('location', '')
-
-        if self.model and self.policy_embeddings is not None:
-            # BERT 기반 추천
-            user_embedding = self.model.encode([user_query])
-            similarities = cosine_similarity(user_embedding, self.policy_embeddings)[0]
-
-            for i, similarity in enumerate(similarities):
-                policy = self.policies_data.iloc[i].copy()
-
-                # 지역 필터링 (가장 중요!)
-                policy_region = str(policy.get('rgtrupInstCdNm', '전국'))
-                if user_location:
-                    # 사용자 지역이 있을 때: 해당 지역 OR 전국 정책만
-                    if user_location not in policy_region and '전국' not in policy_region:
-                        continue  # 다른 지역 정책은 제외
-
-                # 나이 필터링
-                user_age = user_profile.get('age')
-                if user_age and pd.notna(policy.get('age_min')) and pd.notna(policy.get('age_max')):
-                    age_min = int(policy['age_min'])
-                    age_max = int(policy['age_max'])
-                    if not (age_min <= user_age <= age_max):
-                        continue  # 나이 조건 불일치 정책 제외
-
-                # 카테고리 매칭 보너스 (모든 대분류 동일한 중요도)
-                interests = user_profile.get('interests', [])
-                policy_category = policy['bscPlanPlcyWayNoNm']
-
-                # 관심사에 해당하는 카테고리면 1.3배 보너스
-                if any(interest in interests for interest in ['취업', '창업', '일자리']) and policy_category == '일자리':
-                    similarity *= 1.3
-                elif any(interest in interests for interest in ['장학금', '교육', '학비']) and policy_category == '교육':
-                    similarity *= 1.3
-                elif any(interest in interests for interest in ['문화', '여가', '복지']) and policy_category == '복지문화':
-                    similarity *= 1.3
-                elif any(interest in interests for interest in ['주거', '집', '청약', '임대']) and policy_category == '주거':
-                    similarity *= 1.3
-                elif any(interest in interests for interest in ['대출', '금융', '자금', '융자']) and policy_category == '생활금융':
-                    similarity *= 1.3
-
-                scores.append((i, similarity))
+        return user_query
+
+    @staticmethod
+    def _build_lexical_query(user_profile):
+        """사용자 프로필 -> BM25 쿼리 (정책 텍스트와 겹칠 수 있는 전공 + 관심사만, 템플릿 문구 제외)"""
+        terms = [str(user_profile.get('major', '') or '')]
+        terms.extend(str(interest) for interest in user_profile.get('interests', []) or [])
+        return ' '.join(term for term in terms if term)
+
+    @staticmethod
+    def _lexical_scores(user_profile, indices, catalog):
+        """후보별 BM25 점수를 후보 중 최댓값으로 나눈 값 (0~1, 역색인이 없거나 일치하는 n-gram이 없으면 None)"""
+        if catalog.lexical_index is None or len(indices) == 0:
+            return None
+        query = YunoAI._build_lexical_query(user_profile)
+        if not query:
+            return None
+        scores = catalog.lexical_index.scores(query)[indices]
+        max_score = float(scores.max())
+        if max_score <= 0:
+            return None
+        return scores / max_score
+
+    def _fuse_lexical(self, similarities, lexical_scores):
+        """hybrid: (1 - w) * 코사인 유사도 + w * 정규화 BM25 (어휘 점수가 없으면 유사도 그대로)"""
+        if lexical_scores is None:
+            return similarities
+        return (1 - self.lexical_weight) * similarities.astype(np.float64) + self.lexical_weight * lexical_scores
+
+    def _eligibility_mask(self, user_profile, catalog=None, day=None):
+        """
+        지역(해당 지역 OR 전국)/나이 조건 + 오늘 신청 가능한 정책 마스크 - 사전 계산 비트셋 교집합
+
+        Args:
+            day: 기준 날짜 (1970-01-01부터의 일수, None이면 한국 시간 오늘)
+        """
+        catalog = self._catalog if catalog is None else catalog
+        mask = catalog.eligibility_index.mask(user_profile.get('location', ''), user_profile.get('age'))
+        if self.application_window:
+            mask &= catalog.window_index.open_mask(today_kst() if day is None else day)
+        return mask
+
+    def _category_bonus_mask(self, interests, catalog=None):
+        """관심사에 해당하는 카테고리 정책 마스크 (모든 대분류 동일한 중요도)"""
+        catalog = self._catalog if catalog is None else catalog
+        bonus_categories = {
+            category for keywords, category in INTEREST_CATEGORY_BONUS
+            if any(interest in interests for interest in keywords)
+        }
+        category_ok = np.array([name in bonus_categories for name in catalog.category_names], dtype=bool)
+        return category_ok[catalog.category_codes]
+
+    @staticmethod
+    def _top_candidates(indices, scores, count):
+        """
+        후보 중 점수 상위 count개 (점수 내림차순, 동점은 인덱스 순)
+        np.argpartition으로 전체 정렬 없이 선택
+
+        Args:
+            indices: 후보 정책 인덱스 (오름차순)
+            scores: 후보별 점수
+        """
+        if len(indices) > count:
+            # count번째 점수와 동점인 정책은 앞선 인덱스부터 채움 (안정 정렬과 동일한 결과)
+            kth_score = scores[np.argpartition(-scores, count - 1)[count - 1]]
+            above = np.flatnonzero(scores > kth_score)
+            ties = np.flatnonzero(scores == kth_score)[:count - len(above)]
+            keep = np.concatenate([above, ties])
+            indices = indices[keep]
+            scores = scores[keep]
+
+        order = np.lexsort((indices, -scores))
+        return indices[order], scores[order]
+
+    def _encode_queries(self, user_queries):
+        """
+        사용자 쿼리 리스트 -> 정규화된 임베딩 행렬 (BERT 없으면 None)
+        쿼리 임베딩 캐시에 없는 문장만 한 번의 배치로 인코딩
+        """
+        if not self.model or self._catalog.normalized_embeddings is None:
+            return None
+
+        keys = [normalize_query(user_query) for user_query in user_queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+
+        # 캐시 미스 문장 (정규화 키 -> 원문, 중복 제거)
+        missing = {}
+        for key, user_query, embedding in zip(keys, user_queries, embeddings):
+            if embedding is None:
+                missing.setdefault(key, user_query)
+
+        if missing:
+            encoded = np.asarray(self.model.encode(list(missing.values())), dtype=np.float32)
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            encoded = encoded / norms
+
+            new_embeddings = dict(zip(missing, encoded))
+            for key, embedding in new_embeddings.items():
+                self.query_cache.set(key, embedding)
+            embeddings = [new_embeddings[key] if embedding is None else embedding
+                          for key, embedding in zip(keys, embeddings)]
+
+        return np.stack(embeddings)
+
+    def _encode_query(self, user_query):
+        """사용자 쿼리 -> 정규화된 임베딩 (BERT 없으면 None)"""
+        user_embeddings = self._encode_queries([user_query])
+        return None if user_embeddings is None else user_embeddings[0]
+
+    def _rank_candidates(self, user_profile, query_embedding, retriever=None, similarities=None, catalog=None,
+                         day=None, limit=CANDIDATE_COUNT):
+        """
+        자격 조건 필터링 + 점수 계산 후 상위 후보 (인덱스, 점수)
+
+        Args:
+            query_embedding: 정규화된 쿼리 임베딩 (None이면 키워드 기반 점수)
+            retriever: 후보 검색 백엔드 (None이면 설정된 백엔드)
+            similarities: 전체 정책과의 코사인 유사도 (배치 추천에서 미리 계산한 경우)
+            catalog: 카탈로그 스냅샷 (None이면 현재 카탈로그)
+            day: 신청기간 기준 날짜 (None이면 한국 시간 오늘)
+            limit: 반환할 상위 후보 수 (None이면 후보 전체를 점수 순으로)
+        """
+        catalog = self._catalog if catalog is None else catalog
+        day = today_kst() if day is None else day
+        with stage('filter'):
+            mask = self._eligibility_mask(user_profile, catalog, day)
+            bonus = self._category_bonus_mask(user_profile.get('interests', []), catalog)
+
+        if query_embedding is not None and similarities is None and (retriever or catalog.retriever) is None:
+            # 인코더가 준비됐지만 이 카탈로그 스냅샷에는 아직 임베딩이 없음 (빠른 시작 중 교체 직전)
+            query_embedding = None
+
+        with stage('score'):
+            if query_embedding is not None:
+                # BERT 기반 추천: 코사인 유사도 + 관심 카테고리 1.3배 보너스
+                if similarities is not None:
+                    indices = np.flatnonzero(mask)
+                    similarities = similarities[indices]
+                else:
+                    retriever = retriever or catalog.retriever
+                    indices, similarities = retriever.search(query_embedding, mask, MIN_RETRIEVAL_CANDIDATES)
+                if self.lexical == 'hybrid':
+                    # 자격 조건을 통과한 후보에 한해 BM25 점수 결합
+                    lexical_scores = self._lexical_scores(user_profile, indices, catalog)
+                    similarities = self._fuse_lexical(similarities, lexical_scores)
+                scores = np.where(bonus[indices], similarities.astype(np.float64) * CATEGORY_BONUS, similarities)
+
+                rerank_embeddings = catalog.rerank_embeddings
+                if self.rerank_candidates > 0 and rerank_embeddings is not None:
+                    # 양자화 점수 상위 후보만 float32 임베딩으로 다시 계산 (양자화 오차로 인한 순위 뒤바뀜 보정)
+                    indices, _ = self._top_candidates(indices, scores, max(self.rerank_candidates, CANDIDATE_COUNT))
+                    indices = np.sort(indices)
+                    similarities = np.asarray(rerank_embeddings[indices], dtype=np.float32) @ query_embedding
+                    if self.lexical == 'hybrid':
+                        similarities = self._fuse_lexical(
+                            similarities, self._lexical_scores(user_profile, indices, catalog)
+                        )
+                    scores = np.where(bonus[indices], similarities.astype(np.float64) * CATEGORY_BONUS, similarities)
+            else:
+                # 키워드 기반 매칭 (BERT 없을 때): BM25 역색인이 있으면 정규화 BM25 + 관심 카테고리 1.3배 보너스,
+                # 없거나 일치하는 정책이 없으면 기본 0.1, 관심 카테고리 0.8
+                indices = np.flatnonzero(mask)
+                lexical_scores = None
+                if self.lexical != 'off':
+                    lexical_scores = self._lexical_scores(user_profile, indices, catalog)
+                if lexical_scores is not None:
+                    scores = np.where(bonus[indices], lexical_scores.astype(np.float64) * CATEGORY_BONUS, lexical_scores)
+                else:
+                    scores = np.where(bonus[indices], 0.8, 0.1)
+
+            if self.deadline_boost_days > 0:
+                # 마감 임박 정책 보너스
+                closing = catalog.window_index.closing_mask(day, self.deadline_boost_days)
+                scores = np.where(closing[indices], scores * self.deadline_bonus, scores)
+
+            model = self.svd_model
+            if self.cf_weight > 0 and model is not None:
+                # 협업 필터링: 미리 계산한 사용자 요인과 후보 정책 요인의 내적
+                personal_scores = model.scores(user_profile.get('user_id'), catalog.policy_ids, indices)
+                if personal_scores is not None:
+                    scores = scores + self.cf_weight * personal_scores
+
+            if limit is None:
+                order = np.lexsort((indices, -scores))
+                return indices[order], scores[order]
+            return self._top_candidates(indices, scores, limit)
+
+    @staticmethod
+    def _select_candidates(candidate_indices, candidate_scores, top_k):
+        """상위 후보 중 랜덤 top_k개 선택 (새로고침할 때마다 다른 추천), 추천 점수 내림차순 위치 리스트"""
+        num_to_select = min(top_k, len(candidate_indices))
+        selected = random.sample(range(len(candidate_indices)), num_to_select)
+        selected.sort(key=lambda i: float(candidate_scores[i]), reverse=True)
+        return selected
+
+    def _build_response(self, candidate_indices, candidate_scores, top_k, serialized=False, catalog=None):
+        """
+        상위 후보 중 랜덤 top_k개 선택 후 팀 백엔드 API 응답 형식으로 변환
+
+        Args:
+            serialized: True면 data를 JSON 배열 문자열로 반환 (로딩 시 직렬화한 레코드에 점수만 붙여 생성)
+                        이때 policy_ids(추천 정책 ID 리스트)도 함께 반환
+        """
+        selected = self._select_candidates(candidate_indices, candidate_scores, top_k)
+        return self._format_response(
+            [candidate_indices[i] for i in selected], [float(candidate_scores[i]) for i in selected],
+            top_k, serialized, catalog
+        )
+
+    def _format_response(self, indices, scores, limit, serialized=False, catalog=None, page=1):
+        """선택된 정책 인덱스/점수 -> 팀 백엔드 API 응답 형식"""
+        catalog = self._catalog if catalog is None else catalog
+        if serialized:
+            data = catalog.policy_table.records_json(indices, 'recommendationScore', scores).decode('utf-8')
         else:
-            # 키워드 기반 매칭 (BERT 없을 때)
-            for i, (_, policy) in enumerate(self.policies_data.iterrows()):
-                # 지역 필터링
-                policy_region = str(policy.get('rgtrupInstCdNm', '전국'))
-                if user_location:
-                    if user_location not in policy_region and '전국' not in policy_region:
-                        continue
-
-                # 나이 필터링
-                user_age = user_profile.get('age')
-                if user_age and pd.notna(policy.get('age_min')) and pd.notna(policy.get('age_max')):
-                    age_min = int(policy['age_min'])
-                    age_max = int(policy['age_max'])
-                    if not (age_min <= user_age <= age_max):
-                        continue  # 나이 조건 불일치 정책 제외
-
-                score = 0.1  # 기본 점수
-
-                # 카테고리 매칭 보너스 (모든 대분류 동일한 중요도)
-                interests = user_profile.get('interests', [])
-                policy_category = policy['bscPlanPlcyWayNoNm']
-
-                # 관심사에 해당하는 카테고리면 점수 상승
-                if any(interest in interests for interest in ['취업', '창업', '일자리']) and policy_category == '일자리':
-                    score = 0.8
-                elif any(interest in interests for interest in ['장학금', '교육', '학비']) and policy_category == '교육':
-                    score = 0.8
-                elif any(interest in interests for interest in ['문화', '여가', '복지']) and policy_category == '복지문화':
-                    score = 0.8
-                elif any(interest in interests for interest in ['주거', '집', '청약', '임대']) and policy_category == '주거':
-                    score = 0.8
-                elif any(interest in interests for interest in ['대출', '금융', '자금', '융자']) and policy_category == '생활금융':
-                    score = 0.8
-
-                scores.append((i, score))
-
-        # 상위 10개 중 랜덤으로 K개 선택 (새로고침할 때마다 다른 추천)
-        scores.sort(key=lambda x: x[1], reverse=True)
-
-        # 상위 10개 후보 선택
-        candidate_count = min(10, len(scores))
-        top_candidates = scores[:candidate_count]
-
-        # 랜덤으로 top_k개 선택
-        num_to_select = min(top_k, len(top_candidates))
-        selected_indices = random.sample(range(len(top_candidates)), num_to_select)
-
-        top_policies = []
-        for i in selected_indices:
-            idx, score = top_candidates[i]
-            policy = self.policies_data.iloc[idx].copy()
-            policy_dict = policy.to_dict()
-            policy_dict['recommendationScore'] = float(score)
-            top_policies.append(policy_dict)
-
-        # 추천 점수 순으로 정렬
-        top_policies.sort(key=lambda x: x['recommendationScore'], reverse=True)
+            data = []
+            for idx, score in zip(indices, scores):
+                policy_dict = catalog.policy_table.record(idx)
+                policy_dict['recommendationScore'] = score
+                data.append(policy_dict)
 
         # 팀 백엔드 API 응답 형식 (완전 일치)
         response = {
             "success": True,
             "message": "AI recommendations generated successfully",
-            "data": top_policies,
-            "total": len(top_policies),
-            "page": 1,
-            "limit": top_k
+            "data": data,
+            "total": len(indices),
+            "page": page,
+            "limit": limit
         }
+        if serialized:
+            response["policy_ids"] = [catalog.policy_ids[idx] for idx in indices]
 
         return response
 
+    def rank_all(self, user_profile, catalog=None):
+        """
+        자격 조건을 만족하는 후보 전체 순위 (페이지 조회/다시 뽑기용으로 한 번 계산해 저장)
+        근사 검색(ivf)에서는 탐색한 클러스터의 후보만 포함
+
+        Returns:
+            (정책 인덱스 int32, 점수 float32) 점수 내림차순
+        """
+        catalog = self._catalog if catalog is None else catalog
+        user_query = self._build_user_query(user_profile)
+        with stage('encode'):
+            query_embedding = self._encode_query(user_query)
+        indices, scores = self._rank_candidates(user_profile, query_embedding, catalog=catalog, limit=None)
+        return indices.astype(np.int32), scores.astype(np.float32)
+
+    def ranked_page(self, ranked_indices, ranked_scores, offset, limit, serialized=False, catalog=None):
+        """저장된 전체 순위의 offset번째부터 limit개 응답 (순위 순서, 재인코딩/재계산 없음)"""
+        positions = range(offset, min(offset + limit, len(ranked_indices)))
+        with stage('serialize'):
+            return self._format_response(
+                [int(ranked_indices[p]) for p in positions], [float(ranked_scores[p]) for p in positions],
+                limit, serialized, catalog, page=offset // limit + 1
+            )
+
+    def ranked_sample(self, ranked_indices, ranked_scores, limit, exclude=(), pool=SAMPLE_POOL, serialized=False,
+                      catalog=None):
+        """
+        저장된 전체 순위 상위 pool개 중 exclude(이미 보여준 순위 위치)를 뺀 나머지에서 무작위 limit개 (점수 내림차순)
+        남은 후보가 limit개보다 적으면 exclude를 비우고 다시 뽑음 (새로고침할 때마다 겹치지 않는 추천)
+
+        Returns:
+            (응답, 뽑은 순위 위치 리스트)
+        """
+        pool = min(max(pool, limit), len(ranked_indices))
+        excluded = set(exclude)
+        remaining = [p for p in range(pool) if p not in excluded]
+        if len(remaining) < min(limit, pool):
+            remaining = list(range(pool))
+        positions = sorted(random.sample(remaining, min(limit, len(remaining))))
+        with stage('serialize'):
+            response = self._format_response(
+                [int(ranked_indices[p]) for p in positions], [float(ranked_scores[p]) for p in positions],
+                limit, serialized, catalog
+            )
+        return response, positions
+
+    def get_recommendations(self, user_profile, top_k=3, serialized=False):
+        """
+        팀 백엔드 API 응답 형식과 100% 일치하는 추천
+
+        Args:
+            serialized: True면 data를 JSON 배열 문자열로 반환 (API 서버에서 그대로 응답 본문에 사용)
+        """
+        # 사용자 쿼리 생성 - BERT 모델을 위한 자연어 문장 형식
+        user_query = self._build_user_query(user_profile)
+        logger.debug("사용자 추천 생성: %s, 쿼리: %s", user_profile, user_query)
+
+        # 상위 10개 후보 선택 (재로딩 중에도 한 요청은 같은 카탈로그 스냅샷 사용)
+        catalog = self._catalog
+        with stage('encode'):
+            query_embedding = self._encode_query(user_query)
+        candidate_indices, candidate_scores = self._rank_candidates(user_profile, query_embedding, catalog=catalog)
+
+        with stage('serialize'):
+            return self._build_response(candidate_indices, candidate_scores, top_k, serialized, catalog)
+
+    def get_recommendations_batch(self, user_profiles, top_k=3, serialized=False):
+        """
+        여러 사용자 프로필 일괄 추천 (야간 배치용)
+        쿼리는 한 번의 배치로 인코딩하고, 전수 검색이면 유사도를 행렬-행렬 곱으로 계산
+
+        Returns:
+            사용자별 get_recommendations 응답 리스트 (입력 순서)
+        """
+        logger.debug("일괄 추천 생성: %d명", len(user_profiles))
+        if not user_profiles:
+            return []
+
+        catalog = self._catalog
+        user_queries = [self._build_user_query(profile) for profile in user_profiles]
+        with stage('encode'):
+            query_embeddings = self._encode_queries(user_queries)
+
+        use_matrix = query_embeddings is not None and catalog.retriever is not None and catalog.retriever.name == 'exact'
+
+        responses = []
+        # 유사도 행렬 메모리를 제한하기 위해 BATCH_CHUNK_SIZE명씩 계산
+        for chunk_start in range(0, len(user_profiles), BATCH_CHUNK_SIZE):
+            chunk_end = min(chunk_start + BATCH_CHUNK_SIZE, len(user_profiles))
+            similarity_matrix = None
+            if use_matrix:
+                with stage('score'):
+                    similarity_matrix = batch_similarities(
+                        catalog.normalized_embeddings, query_embeddings[chunk_start:chunk_end]
+                    )
+
+            for i in range(chunk_start, chunk_end):
+                query_embedding = None if query_embeddings is None else query_embeddings[i]
+                similarities = None if similarity_matrix is None else similarity_matrix[i - chunk_start]
+                candidate_indices, candidate_scores = self._rank_candidates(
+                    user_profiles[i], query_embedding, similarities=similarities, catalog=catalog
+                )
+                with stage('serialize'):
+                    responses.append(
+                        self._build_response(candidate_indices, candidate_scores, top_k, serialized, catalog)
+                    )
+
+        return responses
+
 def test_system():
     print("=" * 50)
     print("Yuno AI 시스템 테스트 (실제 데이터)")